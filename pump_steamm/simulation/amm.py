@@ -0,0 +1,320 @@
+import numpy as np
+
+from move_curve import (
+    DEFAULT_PARAMS,
+    EInvalidAmount,
+    U64_MAX,
+    BondingCurve,
+    MoveAbort,
+    Quotes,
+    _arithmetic_abort,
+    _check_u64,
+    _price_impact,
+)
+from multi_curve import ARITHMETIC_ABORT, OK, CurveStore, TradeResults, _rounds
+
+BPS = 10_000
+DEFAULT_FEE_BPS = 30  # 0.3%
+
+
+def seed_reserves(state, params=DEFAULT_PARAMS):
+    """
+    (token_reserves, sui_reserves) of the pool that takes over at transition
+
+    The pool gets the curve's real SUI reserves, paired with the token amount
+    that keeps the pool price equal to the curve's last marginal price
+    (k / (INITIAL_VIRTUAL_TOKENS - y)^2 = virtual_sui^2 / k), so trading
+    continues without a price jump.
+    """
+    sui = state.sui_reserves
+    tokens = sui * params.k // (state.virtual_sui_reserves**2)
+    return tokens, sui
+
+
+def _swap_out(reserve_in, reserve_out, amount_in, fee_bps):
+    """Constant-product output with the fee taken from the input (u128 math)"""
+    amount_in_after_fee = amount_in * (BPS - fee_bps) // BPS
+    return reserve_out * amount_in_after_fee // (reserve_in + amount_in_after_fee)
+
+
+class ConstantProductPool:
+    """
+    x * y = k pool in integer base units, with the fee kept in the pool
+
+    Like the curve model, a swap that cannot go through raises MoveAbort and
+    leaves the reserves untouched.
+    """
+
+    def __init__(self, token_reserves, sui_reserves, fee_bps=DEFAULT_FEE_BPS):
+        if not 0 <= fee_bps < BPS:
+            raise ValueError("fee_bps must be in [0, 10000)")
+        self.token_reserves = _check_u64(token_reserves, "token_reserves")
+        self.sui_reserves = _check_u64(sui_reserves, "sui_reserves")
+        self.fee_bps = fee_bps
+        self.fees_sui = 0
+        self.fees_tokens = 0
+
+    @classmethod
+    def from_curve(cls, curve, fee_bps=DEFAULT_FEE_BPS):
+        """Pool seeded from a transitioned curve (see seed_reserves)"""
+        return cls(*seed_reserves(curve.snapshot(), curve.params), fee_bps)
+
+    def calculate_price(self):
+        """Spot price in SUI per token"""
+        if self.token_reserves == 0:
+            return 0.0
+        return self.sui_reserves / self.token_reserves
+
+    def calculate_tokens_out(self, sui_amount):
+        if self.sui_reserves == 0 or self.token_reserves == 0:
+            return 0
+        return _swap_out(
+            self.sui_reserves, self.token_reserves, sui_amount, self.fee_bps
+        )
+
+    def calculate_sui_out(self, token_amount):
+        if self.sui_reserves == 0 or self.token_reserves == 0:
+            return 0
+        return _swap_out(
+            self.token_reserves, self.sui_reserves, token_amount, self.fee_bps
+        )
+
+    def buy(self, sui_amount):
+        """Swap SUI for tokens and return the tokens received"""
+        _check_u64(sui_amount, "sui_amount")
+        tokens = self.calculate_tokens_out(sui_amount)
+        if tokens <= 0:
+            raise MoveAbort(EInvalidAmount, "No tokens would be received")
+        if self.sui_reserves + sui_amount > U64_MAX:
+            raise _arithmetic_abort("u64 addition overflow")
+        self.sui_reserves += sui_amount
+        self.token_reserves -= tokens
+        self.fees_sui += sui_amount - sui_amount * (BPS - self.fee_bps) // BPS
+        return tokens
+
+    def sell(self, token_amount):
+        """Swap tokens for SUI and return the SUI received"""
+        _check_u64(token_amount, "token_amount")
+        sui = self.calculate_sui_out(token_amount)
+        if sui <= 0:
+            raise MoveAbort(EInvalidAmount, "No SUI would be received")
+        if self.token_reserves + token_amount > U64_MAX:
+            raise _arithmetic_abort("u64 addition overflow")
+        self.token_reserves += token_amount
+        self.sui_reserves -= sui
+        self.fees_tokens += token_amount - token_amount * (BPS - self.fee_bps) // BPS
+        return sui
+
+    def quote_buys(self, sui_amounts):
+        """Vectorized buy quotes against the current reserves"""
+        amounts = np.asarray(sui_amounts).astype(np.uint64).astype(object)
+        tokens = _swap_out_rows(
+            self.sui_reserves, self.token_reserves, amounts, self.fee_bps
+        )
+        post_price = _pool_price(
+            self.sui_reserves + amounts, self.token_reserves - tokens
+        )
+        return self._quotes(tokens, post_price)
+
+    def quote_sells(self, token_amounts):
+        """Vectorized sell quotes against the current reserves"""
+        amounts = np.asarray(token_amounts).astype(np.uint64).astype(object)
+        sui = _swap_out_rows(
+            self.token_reserves, self.sui_reserves, amounts, self.fee_bps
+        )
+        post_price = _pool_price(self.sui_reserves - sui, self.token_reserves + amounts)
+        return self._quotes(sui, post_price)
+
+    def _quotes(self, out, post_price):
+        impact = _price_impact(self.calculate_price(), post_price)
+        return Quotes(out.astype(np.uint64), impact, post_price)
+
+    def get_stats(self):
+        return {
+            "token_reserves": self.token_reserves,
+            "sui_reserves": self.sui_reserves,
+            "fee_bps": self.fee_bps,
+            "fees_sui": self.fees_sui,
+            "fees_tokens": self.fees_tokens,
+            "current_price": self.calculate_price(),
+        }
+
+
+def _swap_out_rows(reserve_in, reserve_out, amount_in, fee_bps):
+    """Object-array _swap_out; rows against an empty pool give 0"""
+    amount_in_after_fee = amount_in * (BPS - fee_bps) // BPS
+    denominator = reserve_in + amount_in_after_fee
+    empty = (reserve_out == 0) | (denominator == 0)
+    out = reserve_out * amount_in_after_fee // np.where(empty, 1, denominator)
+    return np.where(empty, 0, out)
+
+
+def _pool_price(sui_reserves, token_reserves):
+    sui = np.asarray(sui_reserves, dtype=np.float64)
+    tokens = np.asarray(token_reserves, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(tokens > 0, sui / tokens, 0.0)
+
+
+class Launch:
+    """
+    Full lifecycle of one launch: bonding curve, then constant-product pool
+
+    Trades go to the curve until it transitions; the transitioning buy fills
+    entirely on the curve (as in the Move code), after which the pool is seeded
+    from the curve's reserves and every later trade swaps against it.
+    """
+
+    def __init__(self, curve=None, fee_bps=DEFAULT_FEE_BPS):
+        self.curve = curve if curve is not None else BondingCurve()
+        self.fee_bps = fee_bps
+        self.pool = None
+        if self.curve.transitioned:
+            self.pool = ConstantProductPool.from_curve(self.curve, fee_bps)
+
+    @property
+    def listed(self):
+        return self.pool is not None
+
+    def buy(self, sui_amount):
+        if self.pool is not None:
+            return self.pool.buy(sui_amount)
+        tokens = self.curve.buy(sui_amount)
+        if self.curve.transitioned:
+            self.pool = ConstantProductPool.from_curve(self.curve, self.fee_bps)
+        return tokens
+
+    def sell(self, token_amount):
+        if self.pool is not None:
+            return self.pool.sell(token_amount)
+        return self.curve.sell(token_amount)
+
+    def calculate_price(self):
+        if self.pool is not None:
+            return self.pool.calculate_price()
+        return self.curve.calculate_price()
+
+
+class PoolStore:
+    """
+    Struct-of-arrays counterpart of CurveStore for post-listing pools
+
+    Rows line up with the CurveStore rows of the same launches; ``seeded``
+    marks the rows whose pool exists.
+    """
+
+    def __init__(self, capacity=1024, fee_bps=DEFAULT_FEE_BPS):
+        self.fee_bps = fee_bps
+        self.token_reserves = np.zeros(capacity, dtype=np.uint64)
+        self.sui_reserves = np.zeros(capacity, dtype=np.uint64)
+        self.seeded = np.zeros(capacity, dtype=bool)
+
+    def ensure_capacity(self, capacity):
+        if capacity > len(self.seeded):
+            size = max(capacity, 2 * len(self.seeded))
+            for name in ("token_reserves", "sui_reserves", "seeded"):
+                column = getattr(self, name)
+                grown = np.zeros(size, dtype=column.dtype)
+                grown[: len(column)] = column
+                setattr(self, name, grown)
+
+    def seed(self, rows, curves):
+        """Seed pools for ``rows`` from the matching rows of a CurveStore"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return
+        self.ensure_capacity(int(rows.max()) + 1)
+        sui = curves.sui_reserves[rows].astype(object)
+        virtual_sui = curves.virtual_sui_reserves[rows].astype(object)
+        self.token_reserves[rows] = (
+            sui * curves.params.k // (virtual_sui * virtual_sui)
+        ).astype(np.uint64)
+        self.sui_reserves[rows] = sui.astype(np.uint64)
+        self.seeded[rows] = True
+
+    def _swap(self, rows, amounts, sui_in):
+        """One trade per row; returns (out, code)"""
+        sui = self.sui_reserves[rows].astype(object)
+        tokens = self.token_reserves[rows].astype(object)
+        amount = amounts.astype(object)
+        if sui_in:
+            out = _swap_out_rows(sui, tokens, amount, self.fee_bps)
+            new_sui, new_tokens = sui + amount, tokens - out
+        else:
+            out = _swap_out_rows(tokens, sui, amount, self.fee_bps)
+            new_sui, new_tokens = sui - out, tokens + amount
+
+        code = np.full(len(rows), OK, dtype=np.int16)
+        code[(new_sui > U64_MAX) | (new_tokens > U64_MAX)] = ARITHMETIC_ABORT
+        code[out <= 0] = EInvalidAmount
+        ok = code == OK
+        self.sui_reserves[rows[ok]] = new_sui[ok].astype(np.uint64)
+        self.token_reserves[rows[ok]] = new_tokens[ok].astype(np.uint64)
+        return np.where(ok, out, 0).astype(np.uint64), code
+
+    def prices(self, rows):
+        return _pool_price(self.sui_reserves[rows], self.token_reserves[rows])
+
+
+class LaunchStore:
+    """
+    Batch lifecycle engine: a CurveStore plus the pools that replace its curves
+
+    ``buy``/``sell`` take any number of (row, amount) trades like CurveStore.
+    Trades on the same launch apply in batch order, so a batch can move a
+    launch through its transition and keep trading on the new pool.
+    """
+
+    def __init__(self, capacity=1024, params=DEFAULT_PARAMS, fee_bps=DEFAULT_FEE_BPS):
+        self.curves = CurveStore(capacity, params)
+        self.pools = PoolStore(capacity, fee_bps)
+
+    def __len__(self):
+        return len(self.curves)
+
+    def register_many(self, coin_types, state=None):
+        rows = self.curves.register_many(coin_types, state)
+        self.pools.ensure_capacity(self.curves.capacity)
+        # Curves registered in a transitioned state start on their pool
+        self.pools.seed(rows[self.curves.transitioned[rows]], self.curves)
+        return rows
+
+    def buy(self, rows, sui_amounts):
+        return self._trade(rows, sui_amounts, buy=True)
+
+    def sell(self, rows, token_amounts):
+        return self._trade(rows, token_amounts, buy=False)
+
+    def _trade(self, rows, amounts, buy):
+        rows, amounts = self.curves._prepare(rows, amounts)
+        out = np.zeros(len(rows), dtype=np.uint64)
+        code = np.full(len(rows), OK, dtype=np.int16)
+        curve_trade = self.curves.buy if buy else self.curves.sell
+
+        for batch in _rounds(rows):
+            r = rows[batch]
+            listed = self.pools.seeded[r]
+
+            on_curve = batch[~listed]
+            if len(on_curve):
+                result = curve_trade(rows[on_curve], amounts[on_curve])
+                out[on_curve], code[on_curve] = result
+                moved = rows[on_curve][self.curves.transitioned[rows[on_curve]]]
+                self.pools.seed(moved, self.curves)
+
+            on_pool = batch[listed]
+            if len(on_pool):
+                out[on_pool], code[on_pool] = self.pools._swap(
+                    rows[on_pool], amounts[on_pool], sui_in=buy
+                )
+
+        return TradeResults(out, code)
+
+    def prices(self, rows=None):
+        """Current price of every launch, from its pool once listed"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        return np.where(
+            self.pools.seeded[rows],
+            self.pools.prices(rows),
+            self.curves.prices(rows),
+        )
@@ -0,0 +1,255 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+import bonding_curve_sim
+import move_curve
+import working_bonding_curve
+from multi_curve import CurveStore
+from replay import BUY, SELL, TradeRecord, replay
+
+SUI = 1_000_000_000
+
+
+class Benchmark(NamedTuple):
+    """A named workload; ``setup(scale)`` returns the zero-argument callable to time"""
+
+    name: str
+    scales: tuple
+    setup: Callable
+    ops: Callable = lambda scale: scale  # Operations performed per call
+
+
+def _decimal_trades(scale):
+    curve = bonding_curve_sim.BondingCurve()
+
+    def run():
+        for _ in range(scale):
+            # Reset to a state where both trades go through
+            curve.virtual_sui_reserves = Decimal("30")
+            curve.virtual_token_reserves = Decimal("500000000")
+            curve.sui_reserves = Decimal("1000")
+            curve.buy(1)
+            curve.sell(1000)
+
+    return run
+
+
+def _exact_trades(scale):
+    def run():
+        curve = move_curve.BondingCurve()
+        for _ in range(scale):
+            tokens = curve.buy(SUI)
+            curve.sell(tokens // 2)
+
+    return run
+
+
+def _sim_quotes(scale):
+    state = bonding_curve_sim.BondingCurve().snapshot()
+    amounts = np.linspace(0.1, 100, scale)
+    return lambda: bonding_curve_sim.quote_buys(state, amounts)
+
+
+def _exact_quotes(scale):
+    state = move_curve.CurveState()
+    amounts = np.linspace(SUI, 100 * SUI, scale).astype(np.uint64)
+    return lambda: move_curve.quote_buys(state, amounts)
+
+
+def _plot_data(module):
+    def setup(scale):
+        sui_range = np.linspace(0, 100, scale)
+        return lambda: module.curve_arrays(sui_range)
+
+    return setup
+
+
+def _simulate_transactions(scale):
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(scale):
+                        bonding_curve_sim.simulate_transactions()
+            finally:
+                os.chdir(cwd)
+
+    return run
+
+
+def synthetic_trade_log(n, seed=0):
+    """Lazily generate ``n`` valid trade records by running a reference curve"""
+    rng = np.random.default_rng(seed)
+    curve = move_curve.BondingCurve()
+    produced = 0
+    while produced < n:
+        for is_sell, size in zip(rng.random(1024) < 0.3, rng.integers(1, 50, 1024)):
+            try:
+                if is_sell:
+                    amount = curve.total_minted // 1000
+                    yield TradeRecord(SELL, amount, curve.sell(amount))
+                else:
+                    amount = int(size) * SUI // 10
+                    yield TradeRecord(BUY, amount, curve.buy(amount))
+            except move_curve.MoveAbort:
+                continue
+            produced += 1
+            if produced == n:
+                return
+            if curve.transitioned:
+                curve = move_curve.BondingCurve()
+
+
+def _replay_log(scale):
+    # Generated once in setup, so only the replay itself is timed
+    records = list(synthetic_trade_log(scale))
+
+    def run():
+        for _ in replay(records, follow_log=False):
+            pass
+
+    return run
+
+
+def _store_buys(scale):
+    rng = np.random.default_rng(0)
+    rows = rng.integers(0, max(1, scale // 10), scale)
+    amounts = rng.integers(SUI, 10 * SUI, scale).astype(np.uint64)
+
+    def run():
+        store = CurveStore(capacity=scale // 10 + 1)
+        store.register_many(range(max(1, scale // 10)))
+        store.buy(rows, amounts)
+
+    return run
+
+
+BENCHMARKS = (
+    Benchmark("decimal_buy_sell", (100, 1_000), _decimal_trades, lambda s: 2 * s),
+    Benchmark("exact_buy_sell", (1_000, 10_000), _exact_trades, lambda s: 2 * s),
+    Benchmark("sim_quote_buys", (1_000, 100_000, 1_000_000), _sim_quotes),
+    Benchmark("exact_quote_buys", (1_000, 100_000), _exact_quotes),
+    Benchmark(
+        "sim_plot_data", (1_000, 100_000, 1_000_000), _plot_data(bonding_curve_sim)
+    ),
+    Benchmark(
+        "working_plot_data",
+        (1_000, 100_000, 1_000_000),
+        _plot_data(working_bonding_curve),
+    ),
+    Benchmark("simulate_transactions", (1, 5), _simulate_transactions),
+    Benchmark("replay_log", (10_000, 100_000), _replay_log),
+    Benchmark("store_batch_buys", (10_000, 1_000_000), _store_buys),
+)
+
+
+def measure(benchmark, scale, repeat=3):
+    """Best-of-``repeat`` throughput, plus peak traced memory of one extra run"""
+    best = float("inf")
+    for _ in range(repeat):
+        run = benchmark.setup(scale)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    run = benchmark.setup(scale)
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": best,
+        "ops_per_sec": benchmark.ops(scale) / best if best > 0 else float("inf"),
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(selected=None, max_scale=None, repeat=3, log=print):
+    results = {}
+    for benchmark in BENCHMARKS:
+        if selected and not any(name in benchmark.name for name in selected):
+            continue
+        for scale in benchmark.scales:
+            if max_scale is not None and scale > max_scale:
+                continue
+            key = f"{benchmark.name}@{scale}"
+            results[key] = measure(benchmark, scale, repeat)
+            log(
+                f"{key:36s} {results[key]['ops_per_sec']:>14,.0f} ops/s "
+                f"{results[key]['peak_bytes'] / 2**20:>9.1f} MiB peak"
+            )
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """List regressions: throughput or peak memory worse than baseline by tolerance"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current["ops_per_sec"] < previous["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: {current['ops_per_sec']:,.0f} ops/s "
+                f"(baseline {previous['ops_per_sec']:,.0f})"
+            )
+        if current["peak_bytes"] > previous["peak_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: {current['peak_bytes']:,} peak bytes "
+                f"(baseline {previous['peak_bytes']:,})"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation engine benchmarks")
+    parser.add_argument("--only", nargs="*", help="Run benchmarks matching names")
+    parser.add_argument("--max-scale", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="Write results to this JSON baseline file")
+    parser.add_argument("--baseline", help="Compare against this JSON baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.max_scale, args.repeat)
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(
+                {
+                    "meta": {
+                        "python": platform.python_version(),
+                        "numpy": np.__version__,
+                        "machine": platform.machine(),
+                        "timestamp": time.time(),
+                    },
+                    "results": results,
+                },
+                handle,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(results, json.load(handle)["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
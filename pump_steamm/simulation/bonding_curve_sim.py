@@ -1,9 +1,14 @@
+import argparse
+import logging
+import sys
+from typing import NamedTuple
+
 import numpy as np
-import matplotlib.pyplot as plt
-from decimal import Decimal, getcontext
+from decimal import Decimal
 
-# Set high precision for decimal calculations
-getcontext().prec = 40
+from instrumentation import INSTRUMENTATION, print_trace
+from plotting import plot_transaction_history, pyplot
+from precision import decimal_context
 
 # Constants from Move module (normalized for readability)
 # Note: In the Move code, these values include 9 decimal places
@@ -13,7 +18,33 @@ INITIAL_VIRTUAL_TOKENS = Decimal("1073000191")  # ~1.07B tokens
 K = Decimal("32190005730")  # Constant product k
 LISTING_THRESHOLD = Decimal("69")  # 69 SUI for transition to AMM
 
-DEBUG = True
+logger = logging.getLogger(__name__)
+
+
+class CurveState(NamedTuple):
+    """Immutable snapshot of a BondingCurve's reserves, used for batch quoting"""
+
+    total_minted: Decimal
+    virtual_sui_reserves: Decimal
+    virtual_token_reserves: Decimal
+    sui_reserves: Decimal
+    transitioned: bool
+
+
+class Quotes(NamedTuple):
+    """Batch quote results, one entry per requested trade size"""
+
+    amount_out: np.ndarray
+    price_impact: np.ndarray
+    post_price: np.ndarray
+
+
+def _reject(op, reason):
+    """Report a rejected trade and return the zero amount it yields"""
+    logger.info(reason)
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.count(f"BondingCurve.{op}.rejected")
+    return Decimal("0")
 
 
 class BondingCurve:
@@ -24,23 +55,16 @@ class BondingCurve:
         self.sui_reserves = Decimal("0")
         self.transitioned = False
 
-        if DEBUG:
-            print(f"Initial state:")
-            print(f"  K: {K}")
-            print(f"  Virtual SUI reserves: {self.virtual_sui_reserves}")
-            print(f"  Virtual token reserves: {self.virtual_token_reserves}")
-            print(
-                f"  Product: {self.virtual_sui_reserves * self.virtual_token_reserves}"
-            )
+        logger.debug(
+            "Initial state: K=%s, virtual SUI=%s, virtual tokens=%s",
+            K,
+            self.virtual_sui_reserves,
+            self.virtual_token_reserves,
+        )
 
+    @decimal_context
     def calculate_tokens_to_mint(self, sui_amount):
         """Calculate how many tokens will be minted for a given SUI amount"""
-        if DEBUG:
-            print(f"\nCalculating tokens for {sui_amount} SUI:")
-            print(
-                f"  Before: Virtual SUI={self.virtual_sui_reserves}, Virtual Tokens={self.virtual_token_reserves}"
-            )
-
         # From Move code:
         # let x = (bonding_curve.virtual_sui_reserves as u128) + (sui_amount as u128);
         # let y = INITIAL_VIRTUAL_TOKENS as u128 - (K / (INITIAL_VIRTUAL_SUI as u128 + x));
@@ -57,22 +81,12 @@ class BondingCurve:
         # Tokens to mint is the difference between new token supply and current virtual reserves
         tokens_to_mint = y - self.virtual_token_reserves
 
-        if DEBUG:
-            print(f"  New virtual SUI would be: {x}")
-            print(f"  New token supply would be: {y}")
-            print(f"  Tokens to mint: {tokens_to_mint}")
-
         # Ensure we don't return negative tokens
         return max(Decimal("0"), tokens_to_mint)
 
+    @decimal_context
     def calculate_sui_to_receive(self, token_amount):
         """Calculate how much SUI will be received for a given token amount"""
-        if DEBUG:
-            print(f"\nCalculating SUI for {token_amount} tokens:")
-            print(
-                f"  Before: Virtual SUI={self.virtual_sui_reserves}, Virtual Tokens={self.virtual_token_reserves}"
-            )
-
         # From the Move code:
         # let y = (bonding_curve.virtual_token_reserves as u128) + (token_amount as u128);
         # let x = (K / (INITIAL_VIRTUAL_TOKENS as u128 - y)) - (INITIAL_VIRTUAL_SUI as u128);
@@ -90,14 +104,10 @@ class BondingCurve:
         # SUI to receive is the difference between current virtual SUI and new SUI amount
         sui_to_receive = self.virtual_sui_reserves - x
 
-        if DEBUG:
-            print(f"  New virtual tokens would be: {y}")
-            print(f"  New SUI reserves would be: {x}")
-            print(f"  SUI to receive: {sui_to_receive}")
-
         # Ensure we don't return negative SUI
         return max(Decimal("0"), sui_to_receive)
 
+    @decimal_context
     def calculate_price(self, sui_amount=Decimal("0")):
         """Calculate token price in SUI at current point (or after hypothetical purchase)"""
         # The price at any point is the derivative of the bonding curve
@@ -110,22 +120,20 @@ class BondingCurve:
         price = K / (denominator * denominator)
         return price
 
+    @decimal_context
     def buy(self, sui_amount):
         """Simulate buying tokens with SUI"""
         if self.transitioned:
-            print("Bonding curve has transitioned to AMM")
-            return Decimal("0")
+            return _reject("buy", "Bonding curve has transitioned to AMM")
 
         sui_amount = Decimal(str(sui_amount))
         tokens_to_mint = self.calculate_tokens_to_mint(sui_amount)
 
         if tokens_to_mint <= Decimal("0"):
-            print("No tokens would be minted for this amount")
-            return Decimal("0")
+            return _reject("buy", "No tokens would be minted for this amount")
 
         if self.total_minted + tokens_to_mint > MAX_SUPPLY:
-            print("Exceeds max supply")
-            return Decimal("0")
+            return _reject("buy", "Exceeds max supply")
 
         self.total_minted += tokens_to_mint
         self.sui_reserves += sui_amount
@@ -137,22 +145,20 @@ class BondingCurve:
 
         return tokens_to_mint
 
+    @decimal_context
     def sell(self, token_amount):
         """Simulate selling tokens for SUI"""
         if self.transitioned:
-            print("Bonding curve has transitioned to AMM")
-            return Decimal("0")
+            return _reject("sell", "Bonding curve has transitioned to AMM")
 
         token_amount = Decimal(str(token_amount))
         sui_to_receive = self.calculate_sui_to_receive(token_amount)
 
         if sui_to_receive <= Decimal("0"):
-            print("No SUI would be received for this amount")
-            return Decimal("0")
+            return _reject("sell", "No SUI would be received for this amount")
 
         if sui_to_receive > self.sui_reserves:
-            print("Insufficient liquidity")
-            return Decimal("0")
+            return _reject("sell", "Insufficient liquidity")
 
         self.total_minted -= token_amount
         self.sui_reserves -= sui_to_receive
@@ -165,7 +171,9 @@ class BondingCurve:
     def check_transition(self):
         """Check if bonding curve should transition to AMM"""
         if self.virtual_sui_reserves >= LISTING_THRESHOLD and not self.transitioned:
-            print(f"Transition triggered at {self.virtual_sui_reserves} SUI reserves")
+            logger.info(
+                "Transition triggered at %s SUI reserves", self.virtual_sui_reserves
+            )
             self.transitioned = True
             # In a real implementation, would set up AMM pools here
 
@@ -185,17 +193,115 @@ class BondingCurve:
             ),
         }
 
+    def snapshot(self):
+        """Capture the current reserves as an immutable CurveState"""
+        return CurveState(
+            self.total_minted,
+            self.virtual_sui_reserves,
+            self.virtual_token_reserves,
+            self.sui_reserves,
+            self.transitioned,
+        )
+
+
+INSTRUMENTATION.register(
+    BondingCurve,
+    "calculate_tokens_to_mint",
+    "calculate_sui_to_receive",
+    "buy",
+    "sell",
+    "check_transition",
+)
+
+
+def _price_array(virtual_token_reserves):
+    """Vectorized calculate_price for an array of virtual token reserves"""
+    denominator = float(INITIAL_VIRTUAL_TOKENS) - np.asarray(
+        virtual_token_reserves, dtype=np.float64
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, float(K) / (denominator * denominator), 0.0)
+
+
+def _price_impact(spot_price, post_price):
+    """Relative move of the spot price caused by each trade"""
+    if spot_price <= 0:
+        return np.zeros_like(post_price)
+    return post_price / spot_price - 1.0
+
+
+def quote_buys(state, sui_amounts):
+    """
+    Quote many buys against one CurveState without mutating anything
+
+    Mirrors calculate_tokens_to_mint and the checks in buy() in float64 for every
+    entry of ``sui_amounts``. Rejected trades (transitioned curve, nothing minted,
+    max supply exceeded) quote zero tokens and leave the price unchanged.
+    """
+    sui = np.asarray(sui_amounts, dtype=np.float64)
+    virtual_sui = float(state.virtual_sui_reserves)
+    virtual_tokens = float(state.virtual_token_reserves)
+    spot_price = float(_price_array(virtual_tokens))
+
+    x = virtual_sui + sui
+    with np.errstate(divide="ignore", invalid="ignore"):
+        new_supply = float(INITIAL_VIRTUAL_TOKENS) - float(K) / (
+            float(INITIAL_VIRTUAL_SUI) + x
+        )
+    tokens = np.where(x > 0, np.maximum(new_supply - virtual_tokens, 0.0), 0.0)
+
+    accepted = tokens > 0
+    accepted &= float(state.total_minted) + tokens <= float(MAX_SUPPLY)
+    if state.transitioned:
+        accepted = np.zeros_like(accepted)
+    tokens = np.where(accepted, tokens, 0.0)
+
+    post_price = _price_array(virtual_tokens - tokens)
+    return Quotes(tokens, _price_impact(spot_price, post_price), post_price)
+
+
+def quote_sells(state, token_amounts):
+    """
+    Quote many sells against one CurveState without mutating anything
+
+    Mirrors calculate_sui_to_receive and the checks in sell() in float64 for every
+    entry of ``token_amounts``. Rejected trades (transitioned curve, nothing
+    received, insufficient liquidity) quote zero SUI and leave the price unchanged.
+    """
+    tokens = np.asarray(token_amounts, dtype=np.float64)
+    virtual_sui = float(state.virtual_sui_reserves)
+    virtual_tokens = float(state.virtual_token_reserves)
+    spot_price = float(_price_array(virtual_tokens))
+
+    y = virtual_tokens + tokens
+    ivt = float(INITIAL_VIRTUAL_TOKENS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = float(K) / (ivt - y) - float(INITIAL_VIRTUAL_SUI)
+    sui = np.where(y < ivt, np.maximum(virtual_sui - x, 0.0), 0.0)
+
+    accepted = sui > 0
+    accepted &= sui <= float(state.sui_reserves)
+    if state.transitioned:
+        accepted = np.zeros_like(accepted)
+    sui = np.where(accepted, sui, 0.0)
+
+    post_price = _price_array(np.where(accepted, y, virtual_tokens))
+    return Quotes(sui, _price_impact(spot_price, post_price), post_price)
 
-def plot_bonding_curve(curve, sui_range=None):
-    """Plot the bonding curve price function"""
-    if sui_range is None:
-        # Default range from 0 to threshold
-        sui_range = np.linspace(0, float(LISTING_THRESHOLD) * 1.2, 1000)
 
-    # Create a fresh curve to avoid modifying the passed one
+class CurveArrays(NamedTuple):
+    """Per-point plot data for a cumulative run of purchases along ``sui_range``"""
+
+    prices: np.ndarray
+    tokens_minted: np.ndarray
+    token_balance: np.ndarray
+
+
+@decimal_context
+def _decimal_curve_arrays(sui_range):
+    """Reference implementation: walk ``sui_range`` one Decimal purchase at a time"""
     sim_curve = BondingCurve()
 
-    # Calculate token price at each point
     prices = []
     tokens_minted = []
     token_balance = []
@@ -217,7 +323,87 @@ def plot_bonding_curve(curve, sui_range=None):
         # Get the price after this update
         prices.append(float(sim_curve.calculate_price()))
 
+    return CurveArrays(
+        np.array(prices), np.array(tokens_minted), np.array(token_balance)
+    )
+
+
+def curve_arrays(sui_range, verify=False):
+    """
+    Vectorized equivalent of walking ``sui_range`` through a fresh BondingCurve
+
+    Every point of ``sui_range`` is treated as a purchase on top of the previous
+    ones, exactly like the Decimal loop, so the virtual SUI reserves after point i
+    are ``INITIAL_VIRTUAL_SUI + cumsum(sui_range)[i]`` and the target supply is the
+    closed form ``INITIAL_VIRTUAL_TOKENS - K / (INITIAL_VIRTUAL_SUI + x)``.
+
+    Virtual token reserves only move once the target supply overtakes them. Up to
+    that point the whole range is computed in one NumPy pass; the remainder (which
+    follows a data-dependent recurrence) is finished with a float64 loop. For the
+    constants in this module a fresh curve never reaches that point.
+
+    With ``verify=True`` the result is checked against the Decimal reference and a
+    ValueError is raised if they disagree.
+    """
+    sui = np.asarray(sui_range, dtype=np.float64)
+    ivt = float(INITIAL_VIRTUAL_TOKENS)
+    ivs = float(INITIAL_VIRTUAL_SUI)
+    k = float(K)
+
+    virtual_sui = ivs + np.cumsum(sui)
+    target_supply = ivt - k / (ivs + virtual_sui)
+
+    virtual_tokens = np.full(sui.shape, ivt)
+    tokens = np.zeros(sui.shape)
+
+    # First purchase whose target supply exceeds the untouched virtual reserves
+    moving = np.flatnonzero(target_supply > ivt)
+    if moving.size:
+        reserves = ivt
+        for i in range(moving[0], sui.size):
+            minted = max(0.0, target_supply[i] - reserves)
+            reserves -= minted
+            tokens[i] = minted
+            virtual_tokens[i] = reserves
+
+    previous_tokens = np.concatenate(([ivt], virtual_tokens[:-1]))
+    token_balance = ivt - previous_tokens - tokens
+
+    denominator = ivt - virtual_tokens
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prices = np.where(denominator > 0, k / (denominator * denominator), 0.0)
+
+    result = CurveArrays(prices, tokens, token_balance)
+
+    if verify:
+        _verify_curve_arrays(result, _decimal_curve_arrays(sui))
+
+    return result
+
+
+def _verify_curve_arrays(result, reference):
+    """Raise ValueError if vectorized plot data drifts from the Decimal reference"""
+    for name, fast, exact in zip(CurveArrays._fields, result, reference):
+        if not np.allclose(fast, exact, rtol=1e-9, atol=1e-6):
+            deviation = float(np.max(np.abs(fast - exact)))
+            raise ValueError(
+                f"Vectorized {name} deviates from Decimal path by up to {deviation}"
+            )
+
+
+def plot_bonding_curve(
+    curve, sui_range=None, verify=False, path="bonding_curve_analysis.png"
+):
+    """Plot the bonding curve price function"""
+    if sui_range is None:
+        # Default range from 0 to threshold
+        sui_range = np.linspace(0, float(LISTING_THRESHOLD) * 1.2, 1000)
+
+    # Plot data always starts from a fresh curve to avoid modifying the passed one
+    prices, tokens_minted, token_balance = curve_arrays(sui_range, verify=verify)
+
     # Create the plots
+    plt = pyplot()
     fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 16))
 
     # Price curve
@@ -255,15 +441,43 @@ def plot_bonding_curve(curve, sui_range=None):
     ax3.legend()
 
     plt.tight_layout()
-    plt.savefig("bonding_curve_analysis.png")
+    plt.savefig(path)
     plt.close()
 
-    return "bonding_curve_analysis.png"
+    return path
+
 
+# Per-trade columns written by simulate_transactions(output_dir=...)
+TRANSACTION_COLUMNS = (
+    ("kind", np.int8),  # 0 for buys, 1 for sells
+    ("amount", np.float64),  # SUI for buys, tokens for sells
+    ("amount_out", np.float64),
+    ("price", np.float64),
+    ("total_minted", np.float64),
+    ("virtual_sui_reserves", np.float64),
+    ("virtual_token_reserves", np.float64),
+    ("sui_reserves", np.float64),
+    ("user_token_balance", np.float64),
+    ("user_sui_invested", np.float64),
+)
 
-def simulate_transactions():
-    """Simulate a series of buy and sell transactions"""
+
+@decimal_context
+def simulate_transactions(output_dir=None):
+    """
+    Simulate a series of buy and sell transactions
+
+    With ``output_dir``, the per-trade history is also written there as
+    columnar .npy files (see columnar.ColumnarWriter) for later analysis.
+    """
     curve = BondingCurve()
+    writer = None
+    if output_dir is not None:
+        from columnar import ColumnarWriter
+
+        writer = ColumnarWriter(
+            output_dir, TRANSACTION_COLUMNS, metadata={"source": "bonding_curve_sim"}
+        )
 
     print("\n=== INITIAL STATE ===")
     print(curve.get_stats())
@@ -300,6 +514,7 @@ def simulate_transactions():
             sui_amount = tx["amount"]
             total_sui_invested += sui_amount
             tokens_received = curve.buy(sui_amount)
+            amount, amount_out = sui_amount, tokens_received
             user_token_balance += tokens_received
             print(
                 f"Buy {sui_amount} SUI -> Received {float(tokens_received):.2f} tokens at {float(curve.calculate_price()):.8f} SUI/token"
@@ -312,6 +527,7 @@ def simulate_transactions():
                 f"Attempting to sell {float(token_amount)} tokens (of {float(user_token_balance)} available)"
             )
             sui_received = curve.sell(token_amount)
+            amount, amount_out = token_amount, sui_received
             user_token_balance -= token_amount
             total_sui_invested -= float(sui_received)
             print(
@@ -323,6 +539,19 @@ def simulate_transactions():
         token_balance.append(float(user_token_balance))
         token_price.append(float(curve.calculate_price()))
         transaction_types.append(tx["type"])
+        if writer is not None:
+            writer.append(
+                kind=0 if tx["type"] == "buy" else 1,
+                amount=float(amount),
+                amount_out=float(amount_out),
+                price=token_price[-1],
+                total_minted=float(curve.total_minted),
+                virtual_sui_reserves=float(curve.virtual_sui_reserves),
+                virtual_token_reserves=float(curve.virtual_token_reserves),
+                sui_reserves=float(curve.sui_reserves),
+                user_token_balance=token_balance[-1],
+                user_sui_invested=float(total_sui_invested),
+            )
 
         # Print state after transaction
         stats = curve.get_stats()
@@ -350,41 +579,31 @@ def simulate_transactions():
                 f"  Status: Bonding Curve ({stats['sui_to_transition']:.2f} SUI to transition)"
             )
 
-    # Plot transaction history
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    if writer is not None:
+        writer.close()
 
-    # Price history
-    ax1.plot(range(len(token_price)), token_price, marker="o")
-    for i, tx_type in enumerate(transaction_types):
-        if tx_type == "buy":
-            ax1.plot(i, token_price[i], "go", markersize=10)
-        else:
-            ax1.plot(i, token_price[i], "ro", markersize=10)
-    ax1.set_title("Token Price History")
-    ax1.set_xlabel("Transaction Number")
-    ax1.set_ylabel("Token Price (SUI)")
-    ax1.grid(True)
-
-    # Token balance
-    ax2.plot(range(len(token_balance)), token_balance, marker="o")
-    for i, tx_type in enumerate(transaction_types):
-        if tx_type == "buy":
-            ax2.plot(i, token_balance[i], "go", markersize=10)
-        else:
-            ax2.plot(i, token_balance[i], "ro", markersize=10)
-    ax2.set_title("User Token Balance")
-    ax2.set_xlabel("Transaction Number")
-    ax2.set_ylabel("Token Balance")
-    ax2.grid(True)
+    kinds = np.array([tx_type == "sell" for tx_type in transaction_types], np.int8)
+    return plot_transaction_history(kinds, token_price, token_balance)
 
-    plt.tight_layout()
-    plt.savefig("transaction_history.png")
-    plt.close()
 
-    return "transaction_history.png"
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bonding curve simulation")
+    parser.add_argument(
+        "--debug", action="store_true", help="Trace every curve operation"
+    )
+    parser.add_argument("--metrics", help="Write operation metrics to this JSON file")
+    parser.add_argument(
+        "--output-dir", help="Also write the transaction history as .npy columns here"
+    )
+    args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    if args.debug:
+        logger.setLevel(logging.DEBUG)
+        INSTRUMENTATION.add_trace_callback(print_trace)
+    if args.debug or args.metrics:
+        INSTRUMENTATION.enable()
 
-if __name__ == "__main__":
     # Simulate and analyze the bonding curve
     print("=== Bonding Curve Analysis ===")
     print(f"Initial Virtual SUI: {float(INITIAL_VIRTUAL_SUI)}")
@@ -399,5 +618,9 @@ if __name__ == "__main__":
 
     # Simulate transactions
     print("\n=== Transaction Simulation ===")
-    tx_plot = simulate_transactions()
+    tx_plot = simulate_transactions(args.output_dir)
     print(f"Transaction history plot saved as {tx_plot}")
+
+    if args.metrics:
+        INSTRUMENTATION.dump_json(args.metrics)
+        print(f"Metrics written to {args.metrics}")
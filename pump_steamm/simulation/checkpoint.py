@@ -0,0 +1,302 @@
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from move_curve import CurveState
+
+MAGIC = b"PSTMCKPT"
+FORMAT_VERSION = 1
+SECTIONS = "sections"
+
+# Section codecs
+RAW = 0  # bytes as given
+ARRAY = 1  # NumPy array in .npy format
+JSON = 2  # UTF-8 JSON document
+
+_HEADER = struct.Struct("<8sHHQI")  # magic, version, flags, sequence, sections
+_ENTRY = struct.Struct("<BQ32s")  # codec, size, sha256 of the section bytes
+_MANIFEST_NAME = re.compile(r"^checkpoint-(\d{8})\.ckpt$")
+
+
+class Checkpoint(NamedTuple):
+    """One loaded checkpoint: decoded sections by name, plus caller metadata"""
+
+    sequence: int
+    metadata: dict
+    sections: dict
+
+
+def encode_section(value):
+    """(codec, bytes) for an ndarray, bytes, or JSON-serializable value"""
+    if isinstance(value, np.ndarray):
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, value, allow_pickle=False)
+        return ARRAY, buffer.getvalue()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return RAW, bytes(value)
+    return JSON, json.dumps(value, sort_keys=True).encode()
+
+
+def decode_section(codec, data):
+    if codec == ARRAY:
+        return np.lib.format.read_array(io.BytesIO(data), allow_pickle=False)
+    if codec == RAW:
+        return data
+    if codec == JSON:
+        return json.loads(data)
+    raise ValueError(f"Unknown checkpoint section codec {codec}")
+
+
+def _write_atomic(path, data):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+class CheckpointStore:
+    """
+    Directory of versioned, incremental binary checkpoints
+
+    Each checkpoint is a small manifest file ``checkpoint-<sequence>.ckpt``:
+    the MAGIC bytes, format version, sequence number and one entry per
+    section (name, codec, size, SHA-256), then JSON metadata and a SHA-256 of
+    everything before it. Section bytes live in ``sections/<sha256>`` and are
+    shared between checkpoints, so a save only writes the sections that
+    changed since any retained checkpoint. Files are written to a temporary
+    name and renamed, so an interrupted save leaves the previous checkpoint
+    intact. Only the newest ``keep`` checkpoints (and their sections) are
+    retained.
+    """
+
+    def __init__(self, directory, keep=2):
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        self.directory = directory
+        self.keep = keep
+        self.bytes_written = 0  # Section bytes written by this instance
+        os.makedirs(os.path.join(directory, SECTIONS), exist_ok=True)
+
+    def _manifest_path(self, sequence):
+        return os.path.join(self.directory, f"checkpoint-{sequence:08d}.ckpt")
+
+    def _section_path(self, digest):
+        return os.path.join(self.directory, SECTIONS, digest.hex())
+
+    def sequences(self):
+        """Sequence numbers of the checkpoints on disk, oldest first"""
+        matches = (_MANIFEST_NAME.match(name) for name in os.listdir(self.directory))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def latest(self):
+        """Sequence number of the newest checkpoint, or None"""
+        sequences = self.sequences()
+        return sequences[-1] if sequences else None
+
+    def save(self, sections, metadata=None):
+        """
+        Write a checkpoint of ``sections`` (name -> value) and return its sequence
+
+        Values are ndarrays, bytes or JSON-serializable objects; see
+        encode_section().
+        """
+        latest = self.latest()
+        sequence = 0 if latest is None else latest + 1
+
+        entries = []
+        for name, value in sections.items():
+            codec, data = encode_section(value)
+            digest = hashlib.sha256(data).digest()
+            path = self._section_path(digest)
+            if not os.path.exists(path):
+                _write_atomic(path, data)
+                self.bytes_written += len(data)
+            entries.append((name, codec, len(data), digest))
+
+        body = io.BytesIO()
+        body.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, sequence, len(entries)))
+        for name, codec, size, digest in entries:
+            encoded = name.encode()
+            body.write(struct.pack("<H", len(encoded)) + encoded)
+            body.write(_ENTRY.pack(codec, size, digest))
+        encoded = json.dumps(metadata or {}, sort_keys=True).encode()
+        body.write(struct.pack("<I", len(encoded)) + encoded)
+        data = body.getvalue()
+        _write_atomic(
+            self._manifest_path(sequence), data + hashlib.sha256(data).digest()
+        )
+
+        self._prune()
+        return sequence
+
+    def _read_manifest(self, sequence):
+        with open(self._manifest_path(sequence), "rb") as handle:
+            data = handle.read()
+        body, checksum = data[:-32], data[-32:]
+        if len(data) < _HEADER.size + 32 or hashlib.sha256(body).digest() != checksum:
+            raise ValueError(f"Checkpoint {sequence} is truncated or corrupt")
+        magic, version, _, stored_sequence, count = _HEADER.unpack_from(body)
+        if magic != MAGIC:
+            raise ValueError(f"Checkpoint {sequence} is not a checkpoint file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported checkpoint format version {version}")
+
+        offset = _HEADER.size
+        entries = []
+        for _ in range(count):
+            (length,) = struct.unpack_from("<H", body, offset)
+            name = body[offset + 2 : offset + 2 + length].decode()
+            offset += 2 + length
+            entries.append((name, *_ENTRY.unpack_from(body, offset)))
+            offset += _ENTRY.size
+        (length,) = struct.unpack_from("<I", body, offset)
+        metadata = json.loads(body[offset + 4 : offset + 4 + length])
+        return stored_sequence, entries, metadata
+
+    def load(self, sequence=None):
+        """
+        Load a checkpoint (the latest by default) as a Checkpoint
+
+        Every section is checked against its SHA-256; raises ValueError if the
+        manifest or a section is damaged and FileNotFoundError if there is
+        no checkpoint.
+        """
+        if sequence is None:
+            sequence = self.latest()
+            if sequence is None:
+                raise FileNotFoundError(f"No checkpoint in {self.directory}")
+        sequence, entries, metadata = self._read_manifest(sequence)
+        sections = {}
+        for name, codec, size, digest in entries:
+            with open(self._section_path(digest), "rb") as handle:
+                data = handle.read()
+            if len(data) != size or hashlib.sha256(data).digest() != digest:
+                raise ValueError(f"Checkpoint section {name!r} is corrupt")
+            sections[name] = decode_section(codec, data)
+        return Checkpoint(sequence, metadata, sections)
+
+    def _prune(self):
+        sequences = self.sequences()
+        for sequence in sequences[: -self.keep]:
+            os.remove(self._manifest_path(sequence))
+        referenced = set()
+        for sequence in sequences[-self.keep :]:
+            referenced.update(
+                digest.hex() for *_, digest in self._read_manifest(sequence)[1]
+            )
+        directory = os.path.join(self.directory, SECTIONS)
+        for name in os.listdir(directory):
+            if name not in referenced and not name.endswith(".tmp"):
+                os.remove(os.path.join(directory, name))
+
+
+class Schedule:
+    """Tells a simulation loop when the next checkpoint is due"""
+
+    def __init__(self, interval_seconds):
+        self.interval = interval_seconds
+        self._last = time.monotonic()
+
+    def due(self):
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            return True
+        return False
+
+
+# Section helpers for the engine objects. Each capture_* returns a dict of
+# sections under ``prefix`` that the matching restore_* turns back into state.
+
+
+def capture_curve(state, prefix="curve"):
+    """Sections of a move_curve CurveState (or BondingCurve)"""
+    if not isinstance(state, CurveState):
+        state = state.snapshot()
+    return {prefix: state._asdict()}
+
+
+def restore_curve(sections, prefix="curve"):
+    return CurveState(**sections[prefix])
+
+
+def capture_curve_store(store, prefix="curves"):
+    """Sections of a multi_curve.CurveStore (coin types must be JSON values)"""
+    from multi_curve import COLUMNS
+
+    sections = {
+        f"{prefix}/{name}": getattr(store, name)[: store.size]
+        for name in (*COLUMNS, "transitioned")
+    }
+    sections[f"{prefix}/coin_types"] = list(store.coin_types)
+    return sections
+
+
+def restore_curve_store(sections, prefix="curves", params=None):
+    from move_curve import DEFAULT_PARAMS
+    from multi_curve import COLUMNS, CurveStore
+
+    coin_types = sections[f"{prefix}/coin_types"]
+    store = CurveStore(len(coin_types), params or DEFAULT_PARAMS)
+    store.register_many(coin_types)
+    for name in (*COLUMNS, "transitioned"):
+        getattr(store, name)[: store.size] = sections[f"{prefix}/{name}"]
+    return store
+
+
+def capture_ledger(ledger, prefix="ledger"):
+    """Sections of a ledger.WalletLedger"""
+    from ledger import COLUMNS
+
+    return {f"{prefix}/{name}": getattr(ledger, name) for name, _ in COLUMNS}
+
+
+def restore_ledger(sections, prefix="ledger"):
+    from ledger import COLUMNS, WalletLedger
+
+    ledger = WalletLedger(len(sections[f"{prefix}/{COLUMNS[0][0]}"]))
+    for name, _ in COLUMNS:
+        getattr(ledger, name)[:] = sections[f"{prefix}/{name}"]
+    return ledger
+
+
+def capture_rng(rng, prefix="rng"):
+    """Sections of a NumPy Generator's bit generator state"""
+    return {prefix: rng.bit_generator.state}
+
+
+def restore_rng(sections, prefix="rng"):
+    state = sections[prefix]
+    bit_generator = getattr(np.random, state["bit_generator"])()
+    bit_generator.state = state
+    return np.random.Generator(bit_generator)
+
+
+def capture_writer(writer, prefix="writer"):
+    """
+    Sections of a columnar.ColumnarWriter, flushing it first
+
+    Only flushed rows are on disk, so the flush makes the recorded row count
+    match the rows the rest of the checkpoint has produced.
+    """
+    writer.flush()
+    return {prefix: {"directory": writer.directory, "rows": writer.rows}}
+
+
+def restore_writer(sections, columns, prefix="writer", **kwargs):
+    """Reopen the checkpointed writer, dropping rows written after the checkpoint"""
+    from columnar import ColumnarWriter
+
+    state = sections[prefix]
+    return ColumnarWriter(
+        state["directory"], columns, resume_rows=state["rows"], **kwargs
+    )
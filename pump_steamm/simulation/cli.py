@@ -0,0 +1,192 @@
+import argparse
+import contextlib
+import csv
+import importlib
+import json
+import sys
+
+# Commands are resolved before anything heavy is imported: ``quote`` only needs
+# the scalar Move arithmetic, and matplotlib is loaded (with the Agg backend)
+# by the plot functions themselves.
+COMMANDS = {
+    "quote": (None, "Quote buys or sells against a curve state"),
+    "simulate": ("monte_carlo", "Monte Carlo launch simulation"),
+    "plot": (None, "Plot the simulated bonding curves to PNG files"),
+    "sweep": ("sweep", "Sweep curve parameters and report launch metrics"),
+    "replay": ("replay", "Replay a BuyResult/SellResult event dump"),
+    "serve": ("quote_server", "Serve quotes and curve stats over local JSON-RPC"),
+    "conformance": ("conformance", "Fuzz the curve engines against Move semantics"),
+    "mempool": ("mempool", "Block ordering and sandwich (MEV) simulation"),
+    "precision": ("precision", "Measure the error of each precision mode"),
+    "events": ("event_sim", "Discrete-event launch simulation with arrival processes"),
+    "ledger": ("ledger", "Per-wallet ledger with holder concentration and PnL"),
+    "stress": ("stress", "Bank-run stress test of the reserves under exit orderings"),
+    "scenario": ("scenario", "Run declarative scenario files as a regression pack"),
+}
+
+QUOTE_FIELDS = (
+    "side",
+    "amount",
+    "amount_in",
+    "amount_out",
+    "price",
+    "post_price",
+    "price_impact",
+    "abort_code",
+    "error",
+)
+
+
+def _state_object(value):
+    """argparse type of --state; malformed values become usage errors"""
+    try:
+        state = json.loads(value)
+    except json.JSONDecodeError as error:
+        raise argparse.ArgumentTypeError(f"not valid JSON ({error})") from None
+    if not isinstance(state, dict):
+        raise argparse.ArgumentTypeError("expected a JSON object of CurveState fields")
+    return state
+
+
+def _quote_arguments(parser):
+    parser.add_argument("side", choices=("buy", "sell"))
+    parser.add_argument("amounts", nargs="+", type=int, help="Sizes in base units")
+    parser.add_argument(
+        "--exact-out",
+        action="store_true",
+        help="Treat amounts as the desired output and quote the input needed",
+    )
+    parser.add_argument(
+        "--state", type=_state_object, help="JSON object with CurveState fields"
+    )
+    parser.add_argument("--total-minted", type=int)
+    parser.add_argument("--virtual-sui-reserves", type=int)
+    parser.add_argument("--virtual-token-reserves", type=int)
+    parser.add_argument("--sui-reserves", type=int)
+    parser.add_argument("--transitioned", action="store_true", default=None)
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+
+
+def _quote_state(args):
+    from move_curve import CurveState
+
+    fields = {}
+    if args.state:
+        fields.update((k, v) for k, v in args.state.items() if k in CurveState._fields)
+    for name in CurveState._fields:
+        if getattr(args, name) is not None:
+            fields[name] = getattr(args, name)
+    return CurveState(**fields)
+
+
+def quote(state, side, amount, exact_out=False):
+    """Quote one trade against ``state`` as a JSON-ready dict"""
+    from move_curve import BondingCurve, MoveAbort
+
+    curve = BondingCurve(state=state)
+    row = dict.fromkeys(QUOTE_FIELDS)
+    row.update(side=side, amount=amount, price=curve.calculate_price())
+
+    amount_in = amount
+    if exact_out:
+        if side == "buy":
+            amount_in = curve.calculate_sui_for_tokens(amount)
+        else:
+            amount_in = curve.calculate_tokens_for_sui(amount)
+        if amount_in is None:
+            row["error"] = "No u64 amount yields the requested output"
+            return row
+    row["amount_in"] = amount_in
+
+    try:
+        if side == "buy":
+            row["amount_out"] = curve.buy(amount_in)
+        else:
+            row["amount_out"] = curve.sell(amount_in)
+    except (MoveAbort, ValueError) as error:
+        row["abort_code"] = getattr(error, "code", None)
+        row["error"] = str(error)
+        return row
+
+    row["post_price"] = curve.calculate_price()
+    if row["price"] > 0:
+        row["price_impact"] = row["post_price"] / row["price"] - 1.0
+    return row
+
+
+def _quote(args):
+    state = _quote_state(args)
+    rows = [quote(state, args.side, a, args.exact_out) for a in args.amounts]
+    _emit(rows, QUOTE_FIELDS, args.format)
+
+
+def _plot_arguments(parser):
+    parser.add_argument("model", choices=("sim", "working"))
+    parser.add_argument("--output", help="PNG path (defaults to the model's name)")
+    parser.add_argument(
+        "--verify", action="store_true", help="Check plot data against Decimal"
+    )
+
+
+def _plot(args):
+    options = {"verify": args.verify}
+    if args.output:
+        options["path"] = args.output
+
+    # The plot functions report progress on stdout; keep it for JSON only
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.model == "sim":
+            import bonding_curve_sim
+
+            path = bonding_curve_sim.plot_bonding_curve(
+                bonding_curve_sim.BondingCurve(), **options
+            )
+        else:
+            import working_bonding_curve
+
+            path = options.get("path", "working_bonding_curve.png")
+            working_bonding_curve.plot_bonding_curve(**options)
+    print(json.dumps({"plot": path}))
+
+
+def _emit(rows, fields, output_format):
+    if output_format == "json":
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    else:
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _resolve(command):
+    """(add_arguments, main) of a command, importing its module on demand"""
+    if command == "quote":
+        return _quote_arguments, _quote
+    if command == "plot":
+        return _plot_arguments, _plot
+    module = importlib.import_module(COMMANDS[command][0])
+    return module.add_arguments, module.main
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bonding curve simulation tools",
+        epilog="Commands: "
+        + "; ".join(f"{name}: {text}" for name, (_, text) in COMMANDS.items()),
+    )
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    add_arguments, run = _resolve(args.command)
+    command_parser = argparse.ArgumentParser(
+        prog=f"{parser.prog} {args.command}",
+        description=COMMANDS[args.command][1],
+    )
+    add_arguments(command_parser)
+    run(command_parser.parse_args(args.args))
+
+
+if __name__ == "__main__":
+    main()
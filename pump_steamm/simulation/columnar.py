@@ -0,0 +1,213 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+HEADER_SIZE = 128  # Fixed .npy header size, so row counts can be patched in place
+
+
+def _npy_header(dtype, rows):
+    """
+    .npy (format 1.0) header for a 1-D column of ``rows`` values
+
+    Padded to HEADER_SIZE bytes whatever the row count, so a growing file only
+    ever rewrites these bytes.
+    """
+    descr = np.lib.format.dtype_to_descr(np.dtype(dtype))
+    header = f"{{'descr': {descr!r}, 'fortran_order': False, 'shape': ({rows},), }}"
+    header = header.encode("latin1")
+    padding = HEADER_SIZE - 10 - len(header) - 1
+    if padding < 0:
+        raise ValueError(f"Column header for {dtype} does not fit")
+    return (
+        b"\x93NUMPY\x01\x00"
+        + struct.pack("<H", HEADER_SIZE - 10)
+        + (header + b" " * padding + b"\n")
+    )
+
+
+class ColumnarWriter:
+    """
+    Chunked writer of simulation output as one .npy file per column
+
+    Rows are buffered in fixed-size NumPy chunks. Each full chunk is appended
+    to the column files, their headers are patched with the new row count and
+    ``manifest.json`` is replaced atomically. An interrupted run therefore
+    leaves every column a valid .npy file holding all flushed rows, and memory
+    use stays at one chunk however long the run is.
+
+    ``columns`` is a sequence of (name, dtype) pairs. Use as a context manager,
+    or call close() to flush the last partial chunk. With ``resume_rows`` the
+    writer reopens existing column files instead, truncated to that many rows
+    (e.g. the row count saved in a checkpoint), and appends after them.
+    """
+
+    def __init__(
+        self, directory, columns, chunk_rows=65_536, metadata=None, resume_rows=None
+    ):
+        if chunk_rows <= 0:
+            raise ValueError("chunk_rows must be positive")
+        self.directory = directory
+        self.columns = [(name, np.dtype(dtype)) for name, dtype in columns]
+        self.chunk_rows = chunk_rows
+        self.metadata = metadata or {}
+        self.rows = resume_rows or 0  # Rows on disk
+        self.chunks = 0
+        self._buffer = {
+            name: np.empty(chunk_rows, dtype) for name, dtype in self.columns
+        }
+        self._buffered = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        for name, dtype in self.columns:
+            path = os.path.join(directory, f"{name}.npy")
+            if resume_rows is None:
+                handle = open(path, "wb")
+            else:
+                handle = open(path, "r+b")
+                size = HEADER_SIZE + self.rows * dtype.itemsize
+                if os.fstat(handle.fileno()).st_size < size:
+                    raise ValueError(f"Column {name} has fewer than {self.rows} rows")
+                handle.truncate(size)
+            handle.write(_npy_header(dtype, self.rows))
+            self._files[name] = handle
+        self._write_manifest()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, **values):
+        """Buffer one row; every column needs a value"""
+        i = self._buffered
+        for name, _ in self.columns:
+            self._buffer[name][i] = values[name]
+        self._buffered += 1
+        if self._buffered == self.chunk_rows:
+            self.flush()
+
+    def extend(self, **arrays):
+        """Buffer many rows given as equal-length arrays, one per column"""
+        lengths = {len(arrays[name]) for name, _ in self.columns}
+        if len(lengths) != 1:
+            raise ValueError("Columns must have the same length")
+        n = lengths.pop()
+        start = 0
+        while start < n:
+            take = min(n - start, self.chunk_rows - self._buffered)
+            for name, _ in self.columns:
+                self._buffer[name][self._buffered : self._buffered + take] = arrays[
+                    name
+                ][start : start + take]
+            self._buffered += take
+            start += take
+            if self._buffered == self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        """Append the buffered rows to the column files and publish them"""
+        if not self._buffered:
+            return
+        rows = self.rows + self._buffered
+        for name, dtype in self.columns:
+            handle = self._files[name]
+            handle.seek(0, os.SEEK_END)
+            handle.write(self._buffer[name][: self._buffered].tobytes())
+            handle.seek(0)
+            handle.write(_npy_header(dtype, rows))
+            handle.flush()
+        self.rows = rows
+        self.chunks += 1
+        self._buffered = 0
+        self._write_manifest()
+
+    def close(self):
+        if self._files:
+            self.flush()
+            for handle in self._files.values():
+                handle.close()
+            self._files = {}
+
+    def _write_manifest(self):
+        manifest = {
+            "version": FORMAT_VERSION,
+            "rows": self.rows,
+            "chunk_rows": self.chunk_rows,
+            "chunks": self.chunks,
+            "columns": [
+                {"name": name, "dtype": dtype.str, "file": f"{name}.npy"}
+                for name, dtype in self.columns
+            ],
+            "metadata": self.metadata,
+        }
+        path = os.path.join(self.directory, MANIFEST)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(temporary, path)
+
+
+class ColumnarResults:
+    """
+    Read-only view of a ColumnarWriter directory
+
+    Columns are memory-mapped on first access, so opening a multi-GB history
+    reads nothing but the manifest and slicing returns views into the page
+    cache without copying. Only the rows the manifest lists are exposed, which
+    hides a chunk that was being written when the run stopped.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as handle:
+            self.manifest = json.load(handle)
+        if self.manifest["version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported columnar format version {self.manifest['version']}"
+            )
+        self._files = {c["name"]: c["file"] for c in self.manifest["columns"]}
+        self._mapped = {}
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def __contains__(self, name):
+        return name in self._files
+
+    @property
+    def columns(self):
+        return list(self._files)
+
+    @property
+    def metadata(self):
+        return self.manifest["metadata"]
+
+    def __getitem__(self, name):
+        """Memory-mapped column, truncated to the published rows"""
+        if name not in self._mapped:
+            path = os.path.join(self.directory, self._files[name])
+            if len(self):
+                column = np.load(path, mmap_mode="r")[: len(self)]
+            else:
+                # An empty file cannot be mapped
+                column = np.load(path)
+            self._mapped[name] = column
+        return self._mapped[name]
+
+    def slice(self, start=None, stop=None):
+        """Dict of zero-copy views of rows [start, stop) of every column"""
+        return {name: self[name][start:stop] for name in self._files}
+
+    def to_arrow(self):
+        """pyarrow.Table over the columns (pyarrow is optional)"""
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError("to_arrow() needs pyarrow installed") from error
+        return pa.table({name: self[name] for name in self._files})
@@ -0,0 +1,501 @@
+import argparse
+import json
+import time
+from decimal import ROUND_FLOOR, Decimal
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from move_curve import (
+    DEFAULT_PARAMS,
+    EInsufficientLiquidity,
+    EInvalidAmount,
+    ENegativeTokenMinting,
+    U64_MAX,
+    U128_MAX,
+    BondingCurve,
+    CurveParams,
+    CurveState,
+    MoveAbort,
+)
+from multi_curve import ARITHMETIC_ABORT, OK, CurveStore
+
+BUY = "buy"
+SELL = "sell"
+SCALE = 10**9  # Base units per whole SUI/token in the Decimal sims
+
+EDGES = np.array([0, 1, 2, 2**32, 2**63 - 1, 2**63, U64_MAX - 1, U64_MAX], dtype=object)
+
+
+class Cases(NamedTuple):
+    """A batch of (state, trade) cases, one entry per row (object arrays)"""
+
+    total_minted: np.ndarray
+    virtual_sui_reserves: np.ndarray
+    virtual_token_reserves: np.ndarray
+    sui_reserves: np.ndarray
+    amount: np.ndarray
+
+
+class Outcome(NamedTuple):
+    """What a trade did, per row: code is OK, a Move abort code or ARITHMETIC_ABORT"""
+
+    code: np.ndarray
+    amount_out: np.ndarray
+    virtual_sui_reserves: np.ndarray
+    virtual_token_reserves: np.ndarray
+
+
+class Engine(NamedTuple):
+    """
+    A curve implementation under test
+
+    ``run(cases, side, params)`` returns an Outcome. Vectorized engines see
+    whole batches; the others only the first ``scalar_sample`` rows of each.
+    Engines without abort codes (the Decimal sims return 0 instead) are only
+    compared on whether a trade went through. Outputs and reserves may differ
+    from the reference by up to ``tolerance`` base units.
+    """
+
+    name: str
+    run: Callable
+    params: CurveParams = DEFAULT_PARAMS
+    vectorized: bool = False
+    has_codes: bool = True
+    tolerance: int = 0
+
+
+class Mismatch(NamedTuple):
+    engine: str
+    side: str
+    total_minted: int
+    virtual_sui_reserves: int
+    virtual_token_reserves: int
+    sui_reserves: int
+    amount: int
+    expected: tuple  # (code, amount_out, virtual_sui, virtual_tokens)
+    actual: tuple
+
+
+def _u128(value):
+    """Mask of u128 intermediates that would abort (underflow or overflow)"""
+    return (value < 0) | (value > U128_MAX)
+
+
+def reference(cases, side, params=DEFAULT_PARAMS):
+    """
+    Independent u128 model of bonding_curve.move buy/sell, on object arrays
+
+    A line-by-line reading of the Move source, kept separate from move_curve
+    so the two can be checked against each other: every u128 intermediate and
+    every u64 cast is range-checked, and each row keeps the first abort it
+    hits in source order.
+    """
+    total, vs, vt, reserves, amount = cases
+    k = params.k
+    ivt = params.initial_virtual_tokens
+    code = np.full(len(amount), OK, dtype=np.int16)
+
+    def fail(mask, abort_code):
+        code[(code == OK) & mask] = abort_code
+
+    if side == BUY:
+        # calculate_tokens_to_mint
+        x = vs + amount
+        fail(x == 0, ARITHMETIC_ABORT)
+        new_token_supply = ivt - k // np.where(x == 0, 1, x)
+        fail(_u128(new_token_supply), ARITHMETIC_ABORT)
+        out = np.where(new_token_supply > vt, new_token_supply - vt, 0)
+        fail(out > U64_MAX, ARITHMETIC_ABORT)
+
+        fail(out <= 0, ENegativeTokenMinting)
+        # mint_tokens
+        fail(total + out > U64_MAX, ARITHMETIC_ABORT)
+        fail(total + out > params.max_supply, EInvalidAmount)
+        # update_reserves, then the virtual reserves
+        new_vs = vs + amount
+        new_vt = vt + out
+        fail(reserves + amount > U64_MAX, ARITHMETIC_ABORT)
+        fail(new_vs > U64_MAX, ARITHMETIC_ABORT)
+        fail(new_vt > U64_MAX, ARITHMETIC_ABORT)
+    else:
+        # calculate_sui_to_receive
+        sellable = vt >= amount
+        denominator = ivt - np.where(sellable, vt - amount, 0)
+        fail(sellable & (_u128(denominator) | (denominator == 0)), ARITHMETIC_ABORT)
+        new_sui = k // np.where(denominator > 0, denominator, 1)
+        out = np.where(sellable & (vs > new_sui), vs - new_sui, 0)
+
+        fail(out <= 0, EInvalidAmount)
+        # burn_tokens, send_sui, then the virtual reserves
+        fail(amount > total, ARITHMETIC_ABORT)
+        fail(reserves < out, EInsufficientLiquidity)
+        fail(out > vs, ARITHMETIC_ABORT)
+        new_vs = vs - out
+        new_vt = vt - amount
+
+    ok = code == OK
+    return Outcome(
+        code,
+        np.where(ok, out, 0),
+        np.where(ok, new_vs, vs),
+        np.where(ok, new_vt, vt),
+    )
+
+
+def _log_uniform(rng, n, low_bits=0, high_bits=64):
+    """u64 values spread evenly over orders of magnitude (object array)"""
+    values = np.exp2(rng.uniform(low_bits, high_bits, n))
+    return np.minimum(values, float(2**63)).astype(np.uint64).astype(object)
+
+
+def _u64(rng, n):
+    """Uniform u64 values with the boundary values mixed in (object array)"""
+    values = rng.integers(0, U64_MAX, n, dtype=np.uint64, endpoint=True).astype(object)
+    edge = rng.random(n) < 0.25
+    values[edge] = rng.choice(EDGES, int(edge.sum()))
+    return values
+
+
+def random_cases(rng, n, side, params=DEFAULT_PARAMS):
+    """
+    ``n`` random (state, trade) cases for ``side``
+
+    Half the states lie on the curve as a run of buys leaves it (virtual tokens
+    = INITIAL_VIRTUAL_TOKENS - k / virtual SUI, total minted = virtual tokens,
+    real reserves = virtual SUI - INITIAL_VIRTUAL_SUI), a quarter are such
+    states with their bookkeeping fields knocked off by a random amount, and
+    the rest are arbitrary u64 values. Trade sizes are log-uniform, with sells
+    drawn mostly around the tokens outstanding.
+    """
+    ivs = params.initial_virtual_sui
+    span = max(1, 2 * (params.listing_threshold - ivs))
+    vs = ivs + (rng.random(n) * span).astype(np.uint64).astype(object)
+    vt = params.initial_virtual_tokens - params.k // vs
+    total = vt.copy()
+    reserves = vs - ivs
+
+    kind = rng.random(n)
+    perturbed = (kind >= 0.5) & (kind < 0.75)
+    noise = _log_uniform(rng, n, high_bits=40) * np.where(rng.random(n) < 0.5, -1, 1)
+    total = np.where(perturbed, np.maximum(total + noise, 0), total)
+    reserves = np.where(perturbed, np.maximum(reserves - noise, 0), reserves)
+
+    arbitrary = kind >= 0.75
+    for column in (total, vs, vt, reserves):
+        column[arbitrary] = _u64(rng, int(arbitrary.sum()))
+
+    amount = _log_uniform(rng, n)
+    if side == SELL:
+        # Sell around the tokens outstanding, sometimes slightly more
+        fraction = rng.uniform(0, 1.01, n)
+        share = (vt * (fraction * 2**32).astype(np.int64).astype(object)) >> 32
+        amount = np.where(rng.random(n) < 0.75, np.minimum(share, U64_MAX), amount)
+    edge = rng.random(n) < 0.02
+    amount[edge] = rng.choice(EDGES, int(edge.sum()))
+    return Cases(total, vs, vt, reserves, amount)
+
+
+def _run_curve_store(cases, side, params):
+    """Vectorized engine: multi_curve.CurveStore holding one row per case"""
+    n = len(cases.amount)
+    store = CurveStore(capacity=n, params=params)
+    rows = store.register_many(range(n))
+    for name in ("total_minted", "virtual_sui_reserves", "virtual_token_reserves"):
+        getattr(store, name)[:n] = getattr(cases, name).astype(np.uint64)
+    store.sui_reserves[:n] = cases.sui_reserves.astype(np.uint64)
+    trade = store.buy if side == BUY else store.sell
+    result = trade(rows, cases.amount.astype(np.uint64))
+    return Outcome(
+        result.code,
+        result.amount_out.astype(object),
+        store.virtual_sui_reserves[:n].astype(object),
+        store.virtual_token_reserves[:n].astype(object),
+    )
+
+
+def _run_move_curve(cases, side, params):
+    """Scalar engine: move_curve.BondingCurve, one curve per case"""
+    rows = []
+    for total, vs, vt, reserves, amount in zip(*cases):
+        curve = BondingCurve(params, CurveState(total, vs, vt, reserves))
+        try:
+            out = curve.buy(amount) if side == BUY else curve.sell(amount)
+            code = OK
+        except MoveAbort as abort:
+            out = 0
+            code = ARITHMETIC_ABORT if abort.code is None else abort.code
+        rows.append(
+            (code, out, curve.virtual_sui_reserves, curve.virtual_token_reserves)
+        )
+    return _outcome(rows)
+
+
+def _outcome(rows):
+    code, out, vs, vt = zip(*rows) if rows else ((),) * 4
+    return Outcome(
+        np.array(code, dtype=np.int16),
+        np.array(out, dtype=object),
+        np.array(vs, dtype=object),
+        np.array(vt, dtype=object),
+    )
+
+
+def _to_decimal(value):
+    return Decimal(int(value)) / SCALE
+
+
+def _to_base_units(value):
+    return int((value * SCALE).to_integral_value(ROUND_FLOOR))
+
+
+def _run_bonding_curve_sim(cases, side, params):
+    """Scalar engine: bonding_curve_sim.BondingCurve, in whole SUI/tokens"""
+    import bonding_curve_sim
+
+    rows = []
+    for total, vs, vt, reserves, amount in zip(*cases):
+        curve = bonding_curve_sim.BondingCurve()
+        curve.total_minted = _to_decimal(total)
+        curve.virtual_sui_reserves = _to_decimal(vs)
+        curve.virtual_token_reserves = _to_decimal(vt)
+        curve.sui_reserves = _to_decimal(reserves)
+        trade = curve.buy if side == BUY else curve.sell
+        out = _to_base_units(trade(_to_decimal(amount)))
+        rows.append(
+            (
+                OK if out > 0 else EInvalidAmount,
+                out,
+                _to_base_units(curve.virtual_sui_reserves),
+                _to_base_units(curve.virtual_token_reserves),
+            )
+        )
+    return _outcome(rows)
+
+
+def _run_working_bonding_curve(cases, side, params):
+    """Scalar engine: the working_bonding_curve functions, in whole SUI/tokens"""
+    import working_bonding_curve as sim
+
+    rows = []
+    for _, vs, vt, _, amount in zip(*cases):
+        virtual_sui, virtual_tokens = _to_decimal(vs), _to_decimal(vt)
+        size = _to_decimal(amount)
+        try:
+            if side == BUY:
+                out = sim.calculate_tokens_to_mint(virtual_sui, virtual_tokens, size)
+                virtual_sui, virtual_tokens = virtual_sui + size, virtual_tokens + out
+            else:
+                out = sim.calculate_sui_to_receive(virtual_sui, virtual_tokens, size)
+                virtual_sui, virtual_tokens = virtual_sui - out, virtual_tokens - size
+        except ArithmeticError:
+            # Decimal division by zero, the sim's only way to fail loudly
+            rows.append((ARITHMETIC_ABORT, 0, vs, vt))
+            continue
+        if out > 0:
+            rows.append(
+                (
+                    OK,
+                    _to_base_units(out),
+                    _to_base_units(virtual_sui),
+                    _to_base_units(virtual_tokens),
+                )
+            )
+        else:
+            rows.append((EInvalidAmount, 0, vs, vt))
+    return _outcome(rows)
+
+
+# The Decimal sims hard-code their own constants (in whole SUI/tokens); the
+# reference is evaluated with the same constants in base units so that only
+# the formulas are compared.
+BONDING_CURVE_SIM_PARAMS = CurveParams(
+    initial_virtual_sui=30 * SCALE,
+    initial_virtual_tokens=1_073_000_191 * SCALE,
+    listing_threshold=69 * SCALE,
+    max_supply=1_000_000_000 * SCALE,
+)
+WORKING_BONDING_CURVE_PARAMS = CurveParams(
+    initial_virtual_sui=30 * SCALE,
+    initial_virtual_tokens=1_000_000 * SCALE,
+    listing_threshold=69 * SCALE,
+)
+
+ENGINES = {
+    engine.name: engine
+    for engine in (
+        Engine("curve_store", _run_curve_store, vectorized=True),
+        Engine("move_curve", _run_move_curve),
+        Engine(
+            "bonding_curve_sim",
+            _run_bonding_curve_sim,
+            BONDING_CURVE_SIM_PARAMS,
+            has_codes=False,
+            tolerance=1,
+        ),
+        Engine(
+            "working_bonding_curve",
+            _run_working_bonding_curve,
+            WORKING_BONDING_CURVE_PARAMS,
+            has_codes=False,
+            tolerance=1,
+        ),
+    )
+}
+
+
+def diverging(engine, expected, actual):
+    """Boolean mask of the rows where ``actual`` disagrees with the reference"""
+    if engine.has_codes:
+        differs = expected.code != actual.code
+    else:
+        differs = (expected.code == OK) != (actual.code == OK)
+    both_ok = (expected.code == OK) & (actual.code == OK)
+    for field in ("amount_out", "virtual_sui_reserves", "virtual_token_reserves"):
+        error = np.abs(getattr(expected, field) - getattr(actual, field))
+        differs |= both_ok & (error > engine.tolerance)
+    return differs.astype(bool)
+
+
+def _row(outcome, i):
+    return tuple(int(column[i]) for column in outcome)
+
+
+def _single(case):
+    return Cases(*(np.array([value], dtype=object) for value in case))
+
+
+def _fails(engine, side, case):
+    cases = _single(case)
+    expected = reference(cases, side, engine.params)
+    return bool(diverging(engine, expected, engine.run(cases, side, engine.params))[0])
+
+
+def shrink(engine, side, case, max_steps=2000):
+    """
+    Greedily minimize a diverging case
+
+    Each field in turn is replaced by the smallest of 0, 1, half, three
+    quarters and one less than its value that still diverges, until no field
+    can be made smaller (or ``max_steps`` engine calls have been spent).
+    """
+    case = [int(value) for value in case]
+    steps = 0
+    progress = True
+    while progress and steps < max_steps:
+        progress = False
+        for field, value in enumerate(case):
+            for candidate in (0, 1, value >> 1, value - (value >> 2), value - 1):
+                if not 0 <= candidate < value:
+                    continue
+                steps += 1
+                trial = case[:field] + [candidate] + case[field + 1 :]
+                if _fails(engine, side, trial):
+                    case = trial
+                    progress = True
+                    break
+    return case
+
+
+def _mismatch(engine, side, case):
+    cases = _single(case)
+    expected = reference(cases, side, engine.params)
+    actual = engine.run(cases, side, engine.params)
+    return Mismatch(engine.name, side, *case, _row(expected, 0), _row(actual, 0))
+
+
+def run_conformance(
+    engines=None,
+    n_cases=1_000_000,
+    batch_size=100_000,
+    scalar_sample=1_000,
+    max_reports=3,
+    seed=0,
+):
+    """
+    Fuzz every engine against the reference, buys and sells alike
+
+    Vectorized engines run all ``n_cases`` cases per side; scalar ones the
+    first ``scalar_sample`` of every batch. Returns one report per engine with
+    the number of cases checked and diverging, throughput, and the first
+    ``max_reports`` divergences per side after shrinking.
+    """
+    engines = list(ENGINES.values()) if engines is None else engines
+    rng = np.random.default_rng(seed)
+    reports = {}
+    for engine in engines:
+        checked = diverged = 0
+        found = {BUY: [], SELL: []}
+        start = time.perf_counter()
+        for side in (BUY, SELL):
+            remaining = n_cases
+            while remaining > 0:
+                n = min(batch_size, remaining)
+                remaining -= n
+                cases = random_cases(rng, n, side, engine.params)
+                if not engine.vectorized:
+                    cases = Cases(*(column[:scalar_sample] for column in cases))
+                expected = reference(cases, side, engine.params)
+                actual = engine.run(cases, side, engine.params)
+                bad = np.flatnonzero(diverging(engine, expected, actual))
+                checked += len(cases.amount)
+                diverged += len(bad)
+                for i in bad[: max(0, max_reports - len(found[side]))]:
+                    found[side].append([column[i] for column in cases])
+        elapsed = time.perf_counter() - start
+
+        # Different cases often shrink to the same one
+        shrunk = {
+            (side, tuple(shrink(engine, side, case))): None
+            for side in (BUY, SELL)
+            for case in found[side]
+        }
+        reports[engine.name] = {
+            "cases": checked,
+            "divergences": diverged,
+            "cases_per_second": checked / elapsed if elapsed else 0.0,
+            "first_divergences": [
+                _mismatch(engine, side, case)._asdict() for side, case in shrunk
+            ],
+        }
+    return reports
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=sorted(ENGINES),
+        help="Engine to check (repeatable; default: all)",
+    )
+    parser.add_argument("--cases", type=int, default=1_000_000, help="Cases per side")
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument(
+        "--scalar-sample",
+        type=int,
+        default=1_000,
+        help="Cases per batch run through the scalar engines",
+    )
+    parser.add_argument("--max-reports", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(args):
+    engines = [ENGINES[name] for name in args.engine] if args.engine else None
+    reports = run_conformance(
+        engines,
+        args.cases,
+        args.batch_size,
+        args.scalar_sample,
+        args.max_reports,
+        args.seed,
+    )
+    print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Differential fuzzing of the curve engines against Move semantics"
+    )
+    add_arguments(parser)
+    main(parser.parse_args())
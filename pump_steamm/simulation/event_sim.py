@@ -0,0 +1,396 @@
+import argparse
+import heapq
+import json
+import time
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+from monte_carlo import SUI
+from move_curve import DEFAULT_PARAMS
+from multi_curve import OK, CurveStore, _rounds
+
+# Control events; trades are not queued one by one (see EventSimulator)
+LAUNCH = 0
+SNAPSHOT = 1
+END = 2
+
+# Columns of the per-curve result array
+CURVE_METRICS = (
+    "launch_ms",
+    "transition_ms",  # NaN if the curve never transitioned
+    "trades",  # Trades executed (accepted or aborted) before transition
+    "rejected",  # Trades the Move code aborted
+    "buy_volume_sui",
+    "sell_volume_sui",
+)
+
+
+class Arrivals(NamedTuple):
+    """A batch of trade arrivals, in no particular order"""
+
+    time_ms: np.ndarray  # float64
+    row: np.ndarray  # int64, CurveStore row
+    is_sell: np.ndarray  # bool
+    sui: np.ndarray  # uint64 SUI amount of buys
+    sell_fraction: np.ndarray  # float64 share of total minted that sells dump
+
+    @classmethod
+    def concatenate(cls, batches):
+        return cls(*(np.concatenate(columns) for columns in zip(*batches)))
+
+    def take(self, index):
+        return Arrivals(*(column[index] for column in self))
+
+
+def _buy_sizes(rng, n, median_sui, sigma):
+    return (median_sui * np.exp(sigma * rng.standard_normal(n)) * SUI).astype(np.uint64)
+
+
+def _trades(rng, time_ms, rows, median_sui, sigma, sell_probability, max_sell):
+    n = len(time_ms)
+    return Arrivals(
+        time_ms,
+        rows,
+        rng.random(n) < sell_probability,
+        _buy_sizes(rng, n, median_sui, sigma),
+        rng.random(n) * max_sell,
+    )
+
+
+@dataclass(frozen=True)
+class PoissonArrivals:
+    """Independent trades at a constant rate per curve"""
+
+    rate_per_s: float = 2.0
+    buy_median_sui: float = 20.0
+    buy_sigma: float = 1.0
+    sell_probability: float = 0.3
+    max_sell_fraction: float = 0.002
+
+    def sample(self, rng, rows, start_ms, stop_ms):
+        """Arrivals on ``rows`` in [start_ms, stop_ms)"""
+        n = rng.poisson(self.rate_per_s * len(rows) * (stop_ms - start_ms) / 1000)
+        return _trades(
+            rng,
+            rng.uniform(start_ms, stop_ms, n),
+            rng.choice(rows, n),
+            self.buy_median_sui,
+            self.buy_sigma,
+            self.sell_probability,
+            self.max_sell_fraction,
+        )
+
+
+@dataclass(frozen=True)
+class BurstyArrivals:
+    """
+    Trades in clusters: bursts start as a Poisson process per curve, and each
+    brings a geometric number of trades spaced ``gap_ms`` apart on average
+    """
+
+    bursts_per_s: float = 0.05
+    mean_burst_size: float = 20.0
+    gap_ms: float = 150.0
+    buy_median_sui: float = 30.0
+    buy_sigma: float = 1.0
+    sell_probability: float = 0.4
+    max_sell_fraction: float = 0.005
+
+    def sample(self, rng, rows, start_ms, stop_ms):
+        n = rng.poisson(self.bursts_per_s * len(rows) * (stop_ms - start_ms) / 1000)
+        starts = rng.uniform(start_ms, stop_ms, n)
+        burst_rows = rng.choice(rows, n)
+        sizes = rng.geometric(1 / self.mean_burst_size, n)
+        total = int(sizes.sum())
+
+        # Offsets within each burst: cumulative exponential gaps, restarted per burst
+        gaps = rng.exponential(self.gap_ms, total)
+        first = np.cumsum(sizes) - sizes
+        gaps[first] = 0.0
+        offsets = np.cumsum(gaps)
+        offsets -= np.repeat(offsets[first], sizes)
+        return _trades(
+            rng,
+            np.repeat(starts, sizes) + offsets,
+            np.repeat(burst_rows, sizes),
+            self.buy_median_sui,
+            self.buy_sigma,
+            self.sell_probability,
+            self.max_sell_fraction,
+        )
+
+
+@dataclass(frozen=True)
+class WhaleArrivals:
+    """
+    Rare large buys, each followed by a Poisson number of copy-trading buys
+    after exponentially distributed delays
+    """
+
+    whales_per_s: float = 0.002
+    whale_median_sui: float = 3_000.0
+    whale_sigma: float = 0.5
+    mean_followers: float = 30.0
+    follower_delay_ms: float = 2_000.0
+    follower_median_sui: float = 15.0
+    follower_sigma: float = 1.0
+
+    def sample(self, rng, rows, start_ms, stop_ms):
+        n = rng.poisson(self.whales_per_s * len(rows) * (stop_ms - start_ms) / 1000)
+        whale_ms = rng.uniform(start_ms, stop_ms, n)
+        whale_rows = rng.choice(rows, n)
+        followers = rng.poisson(self.mean_followers, n)
+        total = int(followers.sum())
+
+        time_ms = np.concatenate(
+            [
+                whale_ms,
+                np.repeat(whale_ms, followers)
+                + rng.exponential(self.follower_delay_ms, total),
+            ]
+        )
+        sui = np.concatenate(
+            [
+                _buy_sizes(rng, n, self.whale_median_sui, self.whale_sigma),
+                _buy_sizes(rng, total, self.follower_median_sui, self.follower_sigma),
+            ]
+        )
+        return Arrivals(
+            time_ms,
+            np.concatenate([whale_rows, np.repeat(whale_rows, followers)]),
+            np.zeros(n + total, dtype=bool),
+            sui,
+            np.zeros(n + total),
+        )
+
+
+DEFAULT_PROCESSES = (PoissonArrivals(), BurstyArrivals(), WhaleArrivals())
+
+
+@dataclass(frozen=True)
+class EventConfig:
+    """Launch population and load model of one discrete-event run"""
+
+    n_curves: int = 1_000
+    duration_s: float = 3_600.0
+    launch_window_s: float = 600.0  # Curves launch uniformly over this span
+    processes: tuple = DEFAULT_PROCESSES
+    window_ms: float = 1_000.0  # Arrivals drawn and executed per window
+    snapshot_every_s: float = 60.0
+    params: object = DEFAULT_PARAMS
+
+
+class EventSimulator:
+    """
+    Discrete-event simulation of many launches under realistic trade arrivals
+
+    Sparse events (curve launches, metric snapshots, the end of the run) sit
+    in a heap and are handled in time order. Between two of them, the arrival
+    processes draw every trade of the next ``window_ms`` for all live curves at
+    once; arrivals that spill past the window (burst tails, whale followers)
+    carry over to the next. A window's trades are sorted by timestamp and
+    applied through a multi_curve.CurveStore in rounds that give each curve
+    its trades in order. This is the same Move arithmetic as
+    move_curve.BondingCurve, at a per-window rather than per-event Python cost.
+    """
+
+    def __init__(self, config=EventConfig(), seed=0):
+        self.config = config
+        self.rng = np.random.default_rng(seed)
+        self.store = CurveStore(config.n_curves, config.params)
+        self.store.register_many(range(config.n_curves))
+        self.launched = np.zeros(config.n_curves, dtype=bool)
+        self.metrics = np.zeros((config.n_curves, len(CURVE_METRICS)))
+        self.metrics[:, CURVE_METRICS.index("transition_ms")] = np.nan
+        self.snapshots = []
+        self.now_ms = 0.0
+        self.events = 0
+        self._queue = []
+        self._seq = 0
+        self._pending = None
+        self._last_snapshot = (0.0, 0)
+
+    def schedule(self, time_ms, kind, payload=None):
+        heapq.heappush(self._queue, (time_ms, self._seq, kind, payload))
+        self._seq += 1
+
+    def _live_rows(self):
+        return np.flatnonzero(
+            self.launched & ~self.store.transitioned[: len(self.launched)]
+        )
+
+    def _advance(self, until_ms):
+        """Draw and execute every trade in [now_ms, until_ms)"""
+        while self.now_ms < until_ms:
+            stop = min(until_ms, self.now_ms + self.config.window_ms)
+            rows = self._live_rows()
+            batches = [self._pending] if self._pending is not None else []
+            if len(rows):
+                batches += [
+                    process.sample(self.rng, rows, self.now_ms, stop)
+                    for process in self.config.processes
+                ]
+            if batches:
+                arrivals = Arrivals.concatenate(batches)
+                due = arrivals.time_ms < stop
+                self._pending = arrivals.take(~due)
+                self._execute(arrivals.take(due))
+            self.now_ms = stop
+
+    def _execute(self, arrivals):
+        store, metrics = self.store, self.metrics
+        order = np.argsort(arrivals.time_ms, kind="stable")
+        arrivals = arrivals.take(order)
+        column = CURVE_METRICS.index
+
+        for batch in _rounds(arrivals.row):
+            rows = arrivals.row[batch]
+            # Curves that transitioned earlier in the window take no more trades
+            live = ~store.transitioned[rows]
+            batch, rows = batch[live], rows[live]
+            sells = arrivals.is_sell[batch]
+
+            buy, buy_rows = batch[~sells], rows[~sells]
+            if len(buy):
+                out, code = store.buy(buy_rows, arrivals.sui[buy])
+                ok = code == OK
+                metrics[buy_rows, column("rejected")] += ~ok
+                metrics[buy_rows, column("buy_volume_sui")] += np.where(
+                    ok, arrivals.sui[buy] / SUI, 0.0
+                )
+                moved = store.transitioned[buy_rows]
+                metrics[buy_rows[moved], column("transition_ms")] = arrivals.time_ms[
+                    buy[moved]
+                ]
+
+            sell, sell_rows = batch[sells], rows[sells]
+            if len(sell):
+                minted = store.total_minted[sell_rows].astype(np.float64)
+                amounts = (arrivals.sell_fraction[sell] * minted).astype(np.uint64)
+                out, code = store.sell(sell_rows, amounts)
+                ok = code == OK
+                metrics[sell_rows, column("rejected")] += ~ok
+                metrics[sell_rows, column("sell_volume_sui")] += out / SUI
+
+            metrics[rows, column("trades")] += 1
+            self.events += len(batch)
+
+    def _snapshot(self):
+        last_ms, last_events = self._last_snapshot
+        elapsed_s = (self.now_ms - last_ms) / 1000
+        transitioned = self.store.transitioned[: len(self.launched)]
+        self.snapshots.append(
+            {
+                "time_ms": self.now_ms,
+                "launched": int(self.launched.sum()),
+                "transitioned": int(transitioned.sum()),
+                "trades": self.events,
+                "trades_per_s": (
+                    (self.events - last_events) / elapsed_s if elapsed_s else 0.0
+                ),
+                "sui_reserves": float(self.store.sui_reserves.sum(dtype=np.float64))
+                / SUI,
+            }
+        )
+        self._last_snapshot = (self.now_ms, self.events)
+
+    def run(self):
+        """Run to ``duration_s``; returns the per-curve metrics array"""
+        config = self.config
+        end_ms = config.duration_s * 1000
+        # Launches are aligned to window boundaries, one heap event per window
+        window = config.window_ms
+        launches = self.rng.uniform(0, config.launch_window_s * 1000, config.n_curves)
+        launches = np.ceil(launches / window) * window
+        order = np.argsort(launches, kind="stable")
+        times, starts = np.unique(launches[order], return_index=True)
+        for launch_ms, rows in zip(times, np.split(order, starts[1:])):
+            self.schedule(launch_ms, LAUNCH, rows)
+        self.metrics[:, CURVE_METRICS.index("launch_ms")] = launches
+        every_ms = config.snapshot_every_s * 1000
+        for snapshot_ms in np.arange(every_ms, end_ms, every_ms):
+            self.schedule(snapshot_ms, SNAPSHOT)
+        self.schedule(end_ms, END)
+
+        while self._queue:
+            time_ms, _, kind, payload = heapq.heappop(self._queue)
+            self._advance(time_ms)
+            if kind == LAUNCH:
+                self.launched[payload] = True
+            elif kind == SNAPSHOT:
+                self._snapshot()
+            else:
+                self._snapshot()
+                break
+        return self.metrics
+
+
+def summarize(simulator, seconds=None):
+    """Run-level summary: time to transition, load and throughput"""
+    metrics = simulator.metrics
+    column = CURVE_METRICS.index
+    transitioned = ~np.isnan(metrics[:, column("transition_ms")])
+    time_to_transition = (
+        metrics[transitioned, column("transition_ms")]
+        - metrics[transitioned, column("launch_ms")]
+    ) / 1000
+    summary = {
+        "curves": len(metrics),
+        "events": simulator.events,
+        "transition_rate": float(transitioned.mean()) if len(metrics) else 0.0,
+        "time_to_transition_s": (
+            dict(
+                zip(
+                    ("p5", "p50", "p95"),
+                    np.percentile(time_to_transition, (5, 50, 95)).tolist(),
+                )
+            )
+            if transitioned.any()
+            else None
+        ),
+        "rejected_rate": float(
+            metrics[:, column("rejected")].sum()
+            / max(1.0, metrics[:, column("trades")].sum())
+        ),
+        "peak_trades_per_s": max(
+            (s["trades_per_s"] for s in simulator.snapshots), default=0.0
+        ),
+    }
+    if seconds:
+        summary["events_per_second"] = simulator.events / seconds
+    return summary
+
+
+def add_arguments(parser):
+    parser.add_argument("--curves", type=int, default=EventConfig.n_curves)
+    parser.add_argument("--duration", type=float, default=EventConfig.duration_s)
+    parser.add_argument(
+        "--launch-window", type=float, default=EventConfig.launch_window_s
+    )
+    parser.add_argument("--window-ms", type=float, default=EventConfig.window_ms)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--snapshots", action="store_true", help="Print snapshots")
+
+
+def main(args):
+    config = EventConfig(
+        n_curves=args.curves,
+        duration_s=args.duration,
+        launch_window_s=args.launch_window,
+        window_ms=args.window_ms,
+    )
+    simulator = EventSimulator(config, args.seed)
+    start = time.perf_counter()
+    simulator.run()
+    output = summarize(simulator, time.perf_counter() - start)
+    if args.snapshots:
+        output["snapshots"] = simulator.snapshots
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Discrete-event launch simulator")
+    add_arguments(parser)
+    main(parser.parse_args())
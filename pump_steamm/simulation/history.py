@@ -0,0 +1,212 @@
+import numpy as np
+
+from move_curve import DEFAULT_PARAMS, BondingCurve, CurveState, calculate_price
+from replay import BUY, SELL, apply_record, read_trade_log
+
+COLUMNS = (
+    ("kind", np.int8),
+    ("amount", np.uint64),
+    ("amount_out", np.uint64),
+    ("timestamp_ms", np.int64),
+    ("sui_delta", np.int64),
+    ("token_delta", np.int64),
+)
+
+
+class CurveHistory:
+    """
+    Event-sourced trade history of one move_curve.BondingCurve
+
+    Every accepted trade is appended to compact columns (side, amount, output,
+    timestamp and the signed change of the virtual reserves), and the full
+    CurveState is snapshotted every ``snapshot_every`` trades. The state after
+    any trade i is then the nearest snapshot at or before i plus the summed
+    deltas of at most ``snapshot_every`` trades. Timestamp lookups add one
+    binary search, so a point-in-time query costs O(log n + snapshot_every)
+    instead of a replay from the start.
+
+    A buy moves virtual SUI, real SUI reserves, virtual tokens and total
+    minted by the same two amounts (and a sell reverses them), so two delta
+    columns are enough to rebuild the whole state.
+    """
+
+    def __init__(self, curve=None, snapshot_every=1024, capacity=1024):
+        if snapshot_every <= 0:
+            raise ValueError("snapshot_every must be positive")
+        self.curve = curve if curve is not None else BondingCurve()
+        self.snapshot_every = snapshot_every
+        self.size = 0
+        self.snapshots = [self.curve.snapshot()]  # State before trade k * N
+        self.transition_index = None  # Index of the trade that transitioned
+        self.skipped = 0  # Log records that were invalid or aborted
+        self.diverged = 0  # Log records whose output differed from the curve's
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity):
+        for name, dtype in COLUMNS:
+            column = np.zeros(capacity, dtype=dtype)
+            if self.size:
+                column[: self.size] = getattr(self, name)[: self.size]
+            setattr(self, name, column)
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def params(self):
+        return self.curve.params
+
+    def append(self, kind, amount, timestamp_ms=None):
+        """
+        Apply one trade to the live curve and record it
+
+        Returns the curve's output. Aborted trades raise MoveAbort and leave
+        the history untouched. Timestamps must not decrease; a missing one
+        repeats the previous trade's.
+        """
+        if timestamp_ms is not None and timestamp_ms < self._last_timestamp():
+            raise ValueError("Trades must be appended in timestamp order")
+
+        before = self.curve.snapshot()
+        if kind == BUY:
+            out = self.curve.buy(amount)
+        elif kind == SELL:
+            out = self.curve.sell(amount)
+        else:
+            raise ValueError(f"Unknown trade kind {kind!r}")
+        self._record(kind, amount, out, timestamp_ms, before)
+        return out
+
+    def append_record(self, record, follow_log=True):
+        """
+        Apply one replay.TradeRecord the way replay() does and record it
+
+        Returns the output recorded for the trade, or None if the record was
+        skipped. Records without a valid amount, and trades the Move code
+        aborts with nothing logged to follow, leave the history untouched and
+        are counted in ``skipped``. Records replay() reports as divergences
+        are counted in ``diverged``; with ``follow_log`` a trade whose logged
+        output differs is recorded as logged, so the history stays in sync
+        with the chain. A
+        timestamp earlier than the previous trade's is clamped to it.
+        """
+        before = self.curve.snapshot()
+        out, _, diverged = apply_record(self.curve, record, follow_log)
+        self.diverged += diverged
+        if self.curve.snapshot() == before:
+            self.skipped += 1
+            return None
+        if diverged and follow_log:
+            out = record.logged_out
+        timestamp_ms = record.timestamp_ms
+        if timestamp_ms is not None:
+            timestamp_ms = max(timestamp_ms, self._last_timestamp())
+        self._record(record.kind, record.amount, out, timestamp_ms, before)
+        return out
+
+    def _last_timestamp(self):
+        return int(self.timestamp_ms[self.size - 1]) if self.size else 0
+
+    def _record(self, kind, amount, out, timestamp_ms, before):
+        """Append one applied trade given the curve state before it"""
+        if timestamp_ms is None:
+            timestamp_ms = self._last_timestamp()
+        if self.size == len(self.kind):
+            self._allocate(2 * len(self.kind))
+        i = self.size
+        self.kind[i] = kind
+        self.amount[i] = amount
+        self.amount_out[i] = out
+        self.timestamp_ms[i] = timestamp_ms
+        curve = self.curve
+        self.sui_delta[i] = curve.virtual_sui_reserves - before.virtual_sui_reserves
+        self.token_delta[i] = (
+            curve.virtual_token_reserves - before.virtual_token_reserves
+        )
+        if curve.transitioned and not before.transitioned:
+            self.transition_index = i
+        self.size += 1
+
+        if self.size % self.snapshot_every == 0:
+            self.snapshots.append(curve.snapshot())
+
+    def buy(self, sui_amount, timestamp_ms=None):
+        return self.append(BUY, sui_amount, timestamp_ms)
+
+    def sell(self, token_amount, timestamp_ms=None):
+        return self.append(SELL, token_amount, timestamp_ms)
+
+    def extend(self, records, follow_log=True):
+        """Append replay.TradeRecords (e.g. from read_trade_log) with append_record"""
+        for record in records:
+            self.append_record(record, follow_log)
+
+    def state_at(self, i):
+        """CurveState after the first ``i`` trades (0 is the initial state)"""
+        if not 0 <= i <= self.size:
+            raise IndexError(f"Trade index {i} out of range 0..{self.size}")
+        k = i // self.snapshot_every
+        base = self.snapshots[k]
+        start = k * self.snapshot_every
+        sui = int(self.sui_delta[start:i].sum(dtype=object)) if i > start else 0
+        tokens = int(self.token_delta[start:i].sum(dtype=object)) if i > start else 0
+        transitioned = self.transition_index is not None and self.transition_index < i
+        return CurveState(
+            base.total_minted + tokens,
+            base.virtual_sui_reserves + sui,
+            base.virtual_token_reserves + tokens,
+            base.sui_reserves + sui,
+            base.transitioned or transitioned,
+        )
+
+    def index_at_time(self, timestamp_ms):
+        """Number of trades recorded at or before ``timestamp_ms``"""
+        return int(
+            np.searchsorted(self.timestamp_ms[: self.size], timestamp_ms, side="right")
+        )
+
+    def state_at_time(self, timestamp_ms):
+        """CurveState as of ``timestamp_ms`` (after every trade stamped until then)"""
+        return self.state_at(self.index_at_time(timestamp_ms))
+
+    def price_at(self, i):
+        """Marginal price after the first ``i`` trades"""
+        return calculate_price(self.state_at(i).virtual_token_reserves, self.params)
+
+    def reserves_at(self, i):
+        """Real SUI reserves after the first ``i`` trades"""
+        return self.state_at(i).sui_reserves
+
+    def price_series(self):
+        """Marginal price after every trade, computed in one vectorized pass"""
+        deltas = np.cumsum(self.token_delta[: self.size], dtype=np.float64)
+        virtual_tokens = self.snapshots[0].virtual_token_reserves + deltas
+        denominator = self.params.initial_virtual_tokens - virtual_tokens
+        k = float(self.params.k)
+        with np.errstate(divide="ignore"):
+            return np.where(denominator > 0, k / (denominator * denominator), 0.0)
+
+    def nbytes(self):
+        """Memory held by the trade columns"""
+        return sum(getattr(self, name).nbytes for name, _ in COLUMNS)
+
+
+def history_from_log(
+    path, bonding_curve_id=None, snapshot_every=1024, params=None, follow_log=True
+):
+    """
+    Build a CurveHistory from a JSONL/CSV event dump (see replay.read_trade_log)
+
+    Records are applied as replay.replay() applies them, so the history ends
+    in the state the replay reaches; see CurveHistory.append_record.
+    """
+    history = CurveHistory(BondingCurve(params or DEFAULT_PARAMS), snapshot_every)
+    history.extend(
+        (
+            record
+            for record in read_trade_log(path)
+            if bonding_curve_id in (None, record.bonding_curve_id)
+        ),
+        follow_log,
+    )
+    return history
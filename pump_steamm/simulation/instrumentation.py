@@ -0,0 +1,149 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, NamedTuple
+
+
+class TraceEvent(NamedTuple):
+    """One completed call of an instrumented operation"""
+
+    op: str
+    args: tuple
+    kwargs: dict
+    result: Any
+    elapsed: float  # Seconds
+    error: BaseException = None
+
+
+class Instrumentation:
+    """
+    Per-operation counters, timers and trace callbacks for the curve engines
+
+    Operations are registered once per class (see ``register``), but nothing is
+    wrapped until ``enable()`` is called: while disabled the original methods
+    sit on the classes untouched, so instrumented code runs with no extra work
+    at all. ``enable()`` swaps in timing wrappers and ``disable()`` puts the
+    originals back.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._targets = []  # (owner, attribute, op)
+        self._originals = {}
+        self._ops = {}
+        self._counters = {}
+        self._callbacks = []
+
+    def register(self, owner, *attributes, prefix=None):
+        """Declare methods of ``owner`` (a class or module) as instrumentable"""
+        prefix = prefix or owner.__name__
+        for attribute in attributes:
+            target = (owner, attribute, f"{prefix}.{attribute}")
+            self._targets.append(target)
+            if self.enabled:
+                self._patch(*target)
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            for target in self._targets:
+                self._patch(*target)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            for (owner, attribute), original in self._originals.items():
+                setattr(owner, attribute, original)
+            self._originals.clear()
+
+    @contextmanager
+    def session(self, reset=True):
+        """Enable instrumentation for the duration of a ``with`` block"""
+        if reset:
+            self.reset()
+        self.enable()
+        try:
+            yield self
+        finally:
+            self.disable()
+
+    def reset(self):
+        # Zero in place: live wrappers hold references to these lists
+        for stats in self._ops.values():
+            stats[:] = [0, 0, 0.0, 0.0]
+        self._counters.clear()
+
+    def add_trace_callback(self, callback):
+        """Call ``callback(TraceEvent)`` after every instrumented call"""
+        self._callbacks.append(callback)
+
+    def remove_trace_callback(self, callback):
+        self._callbacks.remove(callback)
+
+    def count(self, name, n=1):
+        """Bump a free-form counter; callers guard this with ``if .enabled``"""
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def _patch(self, owner, attribute, op):
+        original = owner.__dict__[attribute]
+        self._originals[(owner, attribute)] = original
+        setattr(owner, attribute, self._wrap(op, original))
+
+    def _wrap(self, op, fn):
+        # calls, errors, total seconds, max seconds
+        stats = self._ops.setdefault(op, [0, 0, 0.0, 0.0])
+        callbacks = self._callbacks
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as error:
+                elapsed = clock() - start
+                stats[1] += 1
+                for callback in callbacks:
+                    callback(TraceEvent(op, args, kwargs, None, elapsed, error))
+                raise
+            elapsed = clock() - start
+            stats[0] += 1
+            stats[2] += elapsed
+            if elapsed > stats[3]:
+                stats[3] = elapsed
+            for callback in callbacks:
+                callback(TraceEvent(op, args, kwargs, result, elapsed))
+            return result
+
+        return wrapper
+
+    def metrics(self):
+        """Current metrics as a JSON-serializable dict"""
+        operations = {}
+        for op, (calls, errors, total, longest) in self._ops.items():
+            if not calls and not errors:
+                continue
+            operations[op] = {
+                "calls": calls,
+                "errors": errors,
+                "total_seconds": total,
+                "mean_seconds": total / calls if calls else 0.0,
+                "max_seconds": longest,
+            }
+        return {"operations": operations, "counters": dict(self._counters)}
+
+    def dump_json(self, path):
+        """Write metrics() to ``path``"""
+        with open(path, "w") as handle:
+            json.dump(self.metrics(), handle, indent=2)
+
+
+def print_trace(event):
+    """Trace callback that prints every call, like the old DEBUG output did"""
+    args = ", ".join(str(arg) for arg in event.args[1:])
+    outcome = f"raised {event.error!r}" if event.error else f"-> {event.result}"
+    print(f"{event.op}({args}) {outcome} [{event.elapsed * 1e6:.1f} us]")
+
+
+INSTRUMENTATION = Instrumentation()
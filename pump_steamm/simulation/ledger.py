@@ -0,0 +1,313 @@
+import argparse
+import json
+import time
+
+import numpy as np
+
+from monte_carlo import SUI
+from move_curve import DEFAULT_PARAMS, BondingCurve, MoveAbort, quote_sells
+
+COLUMNS = (
+    ("tokens", np.uint64),  # Balance, base units
+    ("sui_spent", np.uint64),  # Gross SUI paid for buys
+    ("sui_received", np.uint64),  # Gross SUI received from sells
+    ("cost_basis", np.float64),  # SUI cost of the tokens still held (average cost)
+    ("realized_pnl", np.float64),  # SUI
+    ("trades", np.uint32),
+)
+
+
+class WalletLedger:
+    """
+    Per-wallet balances and PnL in contiguous columns indexed by wallet id
+
+    About 44 bytes per wallet, so a million wallets take ~44 MB. Batches are
+    applied with np.add.at scatter-adds, which handle a wallet appearing
+    several times in one batch. PnL uses the average-cost method: a buy adds
+    its SUI to the wallet's cost basis, and a sell releases the basis of the
+    tokens sold at the wallet's current average cost.
+    """
+
+    def __init__(self, n_wallets):
+        self.n_wallets = n_wallets
+        for name, dtype in COLUMNS:
+            setattr(self, name, np.zeros(n_wallets, dtype=dtype))
+
+    def __len__(self):
+        return self.n_wallets
+
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name, _ in COLUMNS)
+
+    def record_buys(self, wallets, sui, tokens):
+        """Credit ``tokens`` bought for ``sui`` (base units) to each wallet"""
+        wallets = np.asarray(wallets, dtype=np.int64)
+        sui = np.asarray(sui, dtype=np.uint64)
+        tokens = np.asarray(tokens, dtype=np.uint64)
+        np.add.at(self.tokens, wallets, tokens)
+        np.add.at(self.sui_spent, wallets, sui)
+        np.add.at(self.cost_basis, wallets, sui.astype(np.float64))
+        np.add.at(self.trades, wallets, 1)
+
+    def record_sells(self, wallets, tokens, sui):
+        """
+        Debit ``tokens`` sold for ``sui`` from each wallet
+
+        Sells never change a wallet's average cost, so every sell of the batch
+        releases basis at the average cost the wallet had before it. Raises
+        ValueError (and records nothing) if a wallet would sell more than it
+        holds.
+        """
+        wallets = np.asarray(wallets, dtype=np.int64)
+        tokens = np.asarray(tokens, dtype=np.uint64)
+        sui = np.asarray(sui, dtype=np.uint64)
+
+        unique, inverse = np.unique(wallets, return_inverse=True)
+        sold = np.zeros(len(unique), dtype=np.uint64)
+        np.add.at(sold, inverse, tokens)
+        balance = self.tokens[unique]
+        if np.any(sold > balance):
+            wallet = int(unique[np.argmax(sold > balance)])
+            raise ValueError(f"Wallet {wallet} sells more tokens than it holds")
+
+        average_cost = self.cost_basis[unique] / np.maximum(balance, 1)
+        released = tokens * average_cost[inverse]
+        np.subtract.at(self.tokens, wallets, tokens)
+        np.add.at(self.sui_received, wallets, sui)
+        np.subtract.at(self.cost_basis, wallets, released)
+        np.add.at(self.realized_pnl, wallets, sui.astype(np.float64) - released)
+        np.add.at(self.trades, wallets, 1)
+        # Wallets that sold out keep no basis (clears float residue)
+        emptied = unique[self.tokens[unique] == 0]
+        self.cost_basis[emptied] = 0.0
+
+    def record(self, wallets, is_sell, amount_in, amount_out):
+        """
+        Apply a mixed batch of accepted trades in batch order
+
+        ``amount_in``/``amount_out`` are SUI/tokens for buys and tokens/SUI for
+        sells. A wallet's trades are split into phases at every change between
+        buying and selling, and phase k of all wallets is applied as one
+        vectorized buy batch plus one sell batch, which keeps average costs
+        exact whatever the order.
+        """
+        wallets = np.asarray(wallets, dtype=np.int64)
+        is_sell = np.asarray(is_sell, dtype=bool)
+        amount_in = np.asarray(amount_in, dtype=np.uint64)
+        amount_out = np.asarray(amount_out, dtype=np.uint64)
+        if not len(wallets):
+            return
+
+        order = np.argsort(wallets, kind="stable")
+        sorted_wallets, sorted_sells = wallets[order], is_sell[order]
+        switch = np.r_[False, sorted_sells[1:] != sorted_sells[:-1]]
+        new_wallet = np.r_[True, sorted_wallets[1:] != sorted_wallets[:-1]]
+        switches = np.cumsum(switch & ~new_wallet)
+        wallet_start = np.maximum.accumulate(np.where(new_wallet, switches, 0))
+        phase = np.empty(len(wallets), dtype=np.int64)
+        phase[order] = switches - wallet_start
+
+        for k in range(int(phase.max()) + 1):
+            buys = np.flatnonzero((phase == k) & ~is_sell)
+            sells = np.flatnonzero((phase == k) & is_sell)
+            if len(buys):
+                self.record_buys(wallets[buys], amount_in[buys], amount_out[buys])
+            if len(sells):
+                self.record_sells(wallets[sells], amount_in[sells], amount_out[sells])
+
+    def unrealized_pnl(self, price=None, state=None, params=DEFAULT_PARAMS):
+        """
+        SUI value of every wallet's holdings minus its cost basis
+
+        With ``price`` (SUI per token) holdings are marked to that price. With
+        a CurveState they are valued at what each wallet would get by selling
+        its whole balance into the curve alone (exact Move arithmetic, price
+        impact included).
+        """
+        if state is not None:
+            value = quote_sells(state, self.tokens, params).amount_out
+            value = value.astype(np.float64)
+        elif price is not None:
+            value = self.tokens.astype(np.float64) * price
+        else:
+            raise ValueError("Pass a price or a curve state")
+        return np.where(self.tokens > 0, value - self.cost_basis, 0.0)
+
+    def summary(self, price=None, state=None, top=(1, 10, 100), params=DEFAULT_PARAMS):
+        """Holder concentration and PnL of the whole ledger"""
+        balances = self.tokens[self.tokens > 0].astype(np.float64)
+        supply = balances.sum()
+        ranked = np.sort(balances)
+        n = len(ranked)
+        if n:
+            gini = float(
+                2 * np.dot(np.arange(1, n + 1), ranked) / (n * supply) - (n + 1) / n
+            )
+            shares = ranked / supply
+            hhi = float(np.dot(shares, shares))
+        else:
+            gini = hhi = 0.0
+        tail = np.cumsum(ranked[::-1])
+
+        summary = {
+            "wallets": self.n_wallets,
+            "holders": n,
+            "gini": gini,
+            "hhi": hhi,
+            **{
+                f"top_{k}_share": float(tail[min(k, n) - 1] / supply) if n else 0.0
+                for k in top
+            },
+            "realized_pnl_sui": float(self.realized_pnl.sum()) / SUI,
+            "traders": int((self.trades > 0).sum()),
+        }
+        if price is not None or state is not None:
+            unrealized = self.unrealized_pnl(price, state, params)
+            total = self.realized_pnl + unrealized
+            traded = self.trades > 0
+            summary.update(
+                unrealized_pnl_sui=float(unrealized.sum()) / SUI,
+                profitable_wallets=int((total[traded] > 0).sum()),
+                pnl_sui_percentiles=(
+                    dict(
+                        zip(
+                            ("p1", "p50", "p99"),
+                            (np.percentile(total[traded], (1, 50, 99)) / SUI).tolist(),
+                        )
+                    )
+                    if traded.any()
+                    else None
+                ),
+            )
+        return summary
+
+
+def simulate_wallets(
+    n_wallets,
+    n_trades,
+    sell_probability=0.3,
+    batch_size=65_536,
+    seed=0,
+    checkpoint_dir=None,
+    resume=False,
+    checkpoint_every=60.0,
+):
+    """
+    Random trading by ``n_wallets`` wallets on one curve, recorded in a ledger
+
+    Trades run one by one through move_curve.BondingCurve (each depends on the
+    state the previous one left); the ledger takes them in batches. Sellers
+    sell a random fraction of their own balance. Returns (ledger, curve).
+
+    With ``checkpoint_dir`` the ledger, curve and trade position are
+    checkpointed between batches at most every ``checkpoint_every`` seconds;
+    ``resume`` continues from the latest checkpoint of the same run.
+    """
+    rng = np.random.default_rng(seed)
+    ledger = WalletLedger(n_wallets)
+    curve = BondingCurve()
+    # Pending (not yet recorded) balance changes, so sells see their own buys
+    held = {}
+
+    wallets = rng.integers(0, n_wallets, n_trades)
+    sells = rng.random(n_trades) < sell_probability
+    sizes = (20 * np.exp(rng.standard_normal(n_trades)) * SUI).astype(np.uint64)
+    fractions = rng.random(n_trades)
+
+    first = 0
+    store = None
+    if checkpoint_dir is not None:
+        from checkpoint import (
+            CheckpointStore,
+            Schedule,
+            capture_curve,
+            capture_ledger,
+            restore_curve,
+            restore_ledger,
+        )
+
+        store = CheckpointStore(checkpoint_dir)
+        schedule = Schedule(checkpoint_every)
+        run = [n_wallets, n_trades, sell_probability, seed]
+        if resume and store.latest() is not None:
+            saved = store.load()
+            if saved.metadata["run"] != run:
+                raise ValueError(f"{checkpoint_dir} holds a checkpoint of another run")
+            ledger = restore_ledger(saved.sections)
+            curve = BondingCurve(state=restore_curve(saved.sections))
+            first = saved.metadata["position"]
+
+    batch = ([], [], [], [])
+    for i in range(first, n_trades):
+        wallet = int(wallets[i])
+        balance = held.get(wallet)
+        if balance is None:
+            balance = int(ledger.tokens[wallet])
+        try:
+            if sells[i]:
+                amount = int(balance * fractions[i])
+                out = curve.sell(amount)
+                held[wallet] = balance - amount
+            else:
+                amount = int(sizes[i])
+                out = curve.buy(amount)
+                held[wallet] = balance + out
+        except MoveAbort:
+            continue
+        for column, value in zip(batch, (wallet, sells[i], amount, out)):
+            column.append(value)
+
+        if len(batch[0]) == batch_size or curve.transitioned:
+            ledger.record(*batch)
+            batch = ([], [], [], [])
+            held.clear()
+            if store is not None and schedule.due():
+                store.save(
+                    {**capture_ledger(ledger), **capture_curve(curve)},
+                    {"run": run, "position": i + 1},
+                )
+        if curve.transitioned:
+            break
+    ledger.record(*batch)
+    return ledger, curve
+
+
+def add_arguments(parser):
+    parser.add_argument("--wallets", type=int, default=1_000_000)
+    parser.add_argument("--trades", type=int, default=200_000)
+    parser.add_argument("--sell-probability", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint-dir", help="Checkpoint the ledger here")
+    parser.add_argument(
+        "--checkpoint-every", type=float, default=60.0, help="Seconds between saves"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the latest checkpoint in --checkpoint-dir",
+    )
+
+
+def main(args):
+    start = time.perf_counter()
+    if args.resume and not args.checkpoint_dir:
+        raise SystemExit("--resume needs --checkpoint-dir")
+    ledger, curve = simulate_wallets(
+        args.wallets,
+        args.trades,
+        args.sell_probability,
+        seed=args.seed,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=args.resume,
+        checkpoint_every=args.checkpoint_every,
+    )
+    summary = ledger.summary(state=curve.snapshot())
+    summary["ledger_mb"] = ledger.nbytes() / 2**20
+    summary["seconds"] = time.perf_counter() - start
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-wallet ledger and PnL summary")
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -0,0 +1,388 @@
+import argparse
+import json
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+from monte_carlo import DEFAULT_TRADERS, SUI
+from move_curve import (
+    DEFAULT_PARAMS,
+    BondingCurve,
+    MoveAbort,
+    _sui_to_receive_rows,
+    _tokens_to_mint_rows,
+)
+from multi_curve import ARITHMETIC_ABORT, OK
+from replay import BUY, SELL
+from sharding import percentile_summary, run_sharded
+
+# Columns of the per-block result array
+METRICS = (
+    "trades",
+    "fifo_rejected",  # Trades the Move code aborts in arrival order
+    "ordering_spread",  # Mean (best - worst) / best output over the block's trades
+    "sandwiches",  # Victim buys an attacker sandwiched profitably
+    "attacker_profit_sui",
+    "victim_loss",  # Tokens lost by sandwiched buyers / their FIFO tokens, 0..1
+    "max_victim_loss",
+    "prefix_reuse",  # Share of trade applications served from the prefix trie
+)
+
+
+class PendingTrade(NamedTuple):
+    """A buy or sell waiting in the mempool"""
+
+    kind: int  # replay.BUY or replay.SELL
+    amount: int  # SUI for buys, tokens for sells, in base units
+
+
+class BlockOutcome(NamedTuple):
+    """Result of executing a block in one order, aligned with ``order``"""
+
+    order: tuple  # Block trade indices, or injected PendingTrades
+    amount_out: list  # 0 for aborted trades
+    code: list  # OK or the abort code the Move call would raise
+    state: object  # CurveState after the last trade
+
+
+class Sandwich(NamedTuple):
+    """An attacker's front-run / back-run pair around one victim buy"""
+
+    victim: int  # Index of the victim trade in the block
+    front_run_sui: int
+    back_run_sui: int  # SUI the back-run sell received
+
+    @property
+    def profit(self):
+        return self.back_run_sui - self.front_run_sui
+
+
+class _Node:
+    """Curve state after a prefix of some execution order"""
+
+    __slots__ = ("state", "amount_out", "code", "children")
+
+    def __init__(self, state, amount_out=0, code=OK):
+        self.state = state
+        self.amount_out = amount_out
+        self.code = code
+        self.children = {}
+
+
+def apply_trade(state, trade, params=DEFAULT_PARAMS):
+    """(state after, amount_out, code) of one trade; aborts leave ``state``"""
+    curve = BondingCurve(params, state)
+    try:
+        if trade.kind == BUY:
+            out = curve.buy(trade.amount)
+        else:
+            out = curve.sell(trade.amount)
+    except MoveAbort as abort:
+        return state, 0, ARITHMETIC_ABORT if abort.code is None else abort.code
+    return curve.snapshot(), out, OK
+
+
+class BlockExecutor:
+    """
+    Evaluates one block of pending trades against a shared curve under any order
+
+    Every executed order is stored in a prefix trie of curve states, so orders
+    that start the same way (FIFO and its sandwiched variants, or the
+    leave-one-out orders of the worst/best-case analysis) only apply the trades
+    after their shared prefix.
+    """
+
+    def __init__(self, state, trades, params=DEFAULT_PARAMS):
+        self.trades = [PendingTrade(*trade) for trade in trades]
+        self.params = params
+        self.root = _Node(state)
+        self.applied = 0  # Trades actually run through the curve
+        self.requested = 0  # Trades the executed orders contained
+
+    def _trade(self, key):
+        return self.trades[key] if isinstance(key, int) else key
+
+    def _walk(self, order):
+        node = self.root
+        nodes = []
+        for key in order:
+            child = node.children.get(key)
+            if child is None:
+                state, out, code = apply_trade(
+                    node.state, self._trade(key), self.params
+                )
+                child = node.children[key] = _Node(state, out, code)
+                self.applied += 1
+            nodes.append(child)
+            node = child
+        self.requested += len(nodes)
+        return node, nodes
+
+    def execute(self, order):
+        """
+        Run the trades in ``order`` from the block's starting state
+
+        Items are indices into the block, or PendingTrades injected by someone
+        other than the block's senders (an attacker, say).
+        """
+        order = tuple(order)
+        last, nodes = self._walk(order)
+        return BlockOutcome(
+            order,
+            [node.amount_out for node in nodes],
+            [node.code for node in nodes],
+            last.state,
+        )
+
+    def fifo(self):
+        return self.execute(range(len(self.trades)))
+
+    def _extreme_orders(self, worst):
+        """
+        Per trade, the order that gives it its worst (or best) fill
+
+        A buy fills worst after every other buy of the block and before every
+        sell, and best the other way round; sells mirror that. Trades keep
+        arrival order within each group.
+        """
+        buys = [i for i, trade in enumerate(self.trades) if trade.kind == BUY]
+        sells = [i for i, trade in enumerate(self.trades) if trade.kind == SELL]
+        for i, trade in enumerate(self.trades):
+            ahead = buys if (trade.kind == BUY) == worst else sells
+            yield i, [j for j in ahead if j != i] + [i]
+
+    def _extreme_outputs(self, worst):
+        out = np.zeros(len(self.trades), dtype=object)
+        for i, order in self._extreme_orders(worst):
+            _, nodes = self._walk(order)
+            out[i] = nodes[-1].amount_out
+        return out
+
+    def worst_case(self):
+        """Output of every trade at its least favourable position in the block"""
+        return self._extreme_outputs(worst=True)
+
+    def best_case(self):
+        """Output of every trade at its most favourable position in the block"""
+        return self._extreme_outputs(worst=False)
+
+    def best_front_run(self, state, victim, budget, grid=64):
+        """
+        Most profitable front-run size against one victim buy at ``state``
+
+        Profit is evaluated for ``grid`` sizes, geometrically spaced up to
+        ``budget``, in one vectorized pass of the exact curve arithmetic.
+        Sizes that would transition the curve before the back-run (which then
+        aborts) are ruled out. Returns (front_run_sui, profit), or None if no
+        size is profitable.
+        """
+        params = self.params
+        if state.transitioned or budget <= 0:
+            return None
+        sizes = np.unique(np.geomspace(SUI // 1000, budget, grid).astype(np.uint64))
+        front = sizes.astype(object)
+        vs, vt = state.virtual_sui_reserves, state.virtual_token_reserves
+
+        tokens, aborted = _tokens_to_mint_rows(vs, vt, front, params)
+        vs, vt = vs + front, vt + tokens
+        victim_tokens, victim_aborted = _tokens_to_mint_rows(
+            vs, vt, victim.amount, params
+        )
+        vs, vt = vs + victim.amount, vt + victim_tokens
+        back, back_aborted = _sui_to_receive_rows(vs, vt, tokens, params)
+
+        feasible = ~(aborted | victim_aborted | back_aborted)
+        feasible &= (tokens > 0) & (victim_tokens > 0)
+        feasible &= vs < params.listing_threshold
+        profit = np.where(feasible, back - front, 0)
+        best = int(np.argmax(profit))
+        if profit[best] <= 0:
+            return None
+        return int(front[best]), int(profit[best])
+
+    def sandwich(self, budget, grid=64):
+        """
+        FIFO order with every profitable buy sandwiched by one attacker
+
+        The attacker sees the victims in arrival order, front-runs each buy
+        with the size found by best_front_run and sells the tokens back right
+        after it. The chosen sandwich is then executed exactly and kept only if
+        it really pays. Returns (BlockOutcome, list of Sandwiches).
+        """
+        order = []
+        sandwiches = []
+        for i, trade in enumerate(self.trades):
+            if trade.kind == BUY:
+                node, _ = self._walk(order)
+                found = self.best_front_run(node.state, trade, budget, grid)
+                if found is not None:
+                    front = PendingTrade(BUY, found[0])
+                    node, nodes = self._walk(order + [front, i])
+                    back = PendingTrade(SELL, nodes[-2].amount_out)
+                    _, nodes = self._walk(order + [front, i, back])
+                    received = nodes[-1].amount_out
+                    codes = [n.code for n in nodes[-3:]]
+                    if codes == [OK] * 3 and received > front.amount:
+                        sandwiches.append(Sandwich(i, front.amount, received))
+                        order += [front, i, back]
+                        continue
+            order.append(i)
+        return self.execute(order), sandwiches
+
+    def prefix_reuse(self):
+        if not self.requested:
+            return 0.0
+        return 1.0 - self.applied / self.requested
+
+
+@dataclass(frozen=True)
+class BlockConfig:
+    """Random block model: a partly filled curve and a checkpoint's worth of trades"""
+
+    trades_per_block: int = 32
+    sell_probability: float = 0.3
+    traders: tuple = DEFAULT_TRADERS
+    max_progress: float = 0.9  # Blocks start up to this far towards the threshold
+    attacker_budget_sui: float = 10_000.0
+    front_run_grid: int = 64
+    params: object = DEFAULT_PARAMS
+
+
+def random_block(rng, config):
+    """(starting CurveState, pending trades) of one random block"""
+    params = config.params
+    curve = BondingCurve(params)
+    distance = params.listing_threshold - params.initial_virtual_sui
+    bought = int(rng.random() * config.max_progress * distance)
+    if bought:
+        curve.buy(bought)
+
+    n = config.trades_per_block
+    weights = np.array([t.weight for t in config.traders], dtype=np.float64)
+    profile = rng.choice(len(config.traders), size=n, p=weights / weights.sum())
+    medians = np.array([t.buy_median_sui for t in config.traders])[profile]
+    sigmas = np.array([t.buy_sigma for t in config.traders])[profile]
+    sell_caps = np.array([t.max_sell_fraction for t in config.traders])[profile]
+
+    is_sell = rng.random(n) < config.sell_probability
+    buy_sizes = (medians * np.exp(sigmas * rng.standard_normal(n)) * SUI).astype(
+        np.int64
+    )
+    sell_sizes = (rng.random(n) * sell_caps * curve.total_minted).astype(np.int64)
+    kinds = np.where(is_sell, SELL, BUY)
+    amounts = np.where(is_sell, sell_sizes, buy_sizes)
+    trades = [PendingTrade(int(k), int(a)) for k, a in zip(kinds, amounts)]
+    return curve.snapshot(), trades
+
+
+def evaluate_block(state, trades, config=BlockConfig()):
+    """MEV metrics (see METRICS) of one block"""
+    executor = BlockExecutor(state, trades, config.params)
+    fifo = executor.fifo()
+    fifo_out = np.array(fifo.amount_out, dtype=object)
+
+    best = executor.best_case()
+    worst = executor.worst_case()
+    filled = best > 0
+    spread = (best[filled] - worst[filled]) / best[filled]
+
+    budget = int(config.attacker_budget_sui * SUI)
+    sandwiched, sandwiches = executor.sandwich(budget, config.front_run_grid)
+    victim_out = dict(zip(sandwiched.order, sandwiched.amount_out))
+    losses = np.array(
+        [
+            1.0 - victim_out[s.victim] / fifo_out[s.victim]
+            for s in sandwiches
+            if fifo_out[s.victim] > 0
+        ]
+    )
+    lost = sum(fifo_out[s.victim] - victim_out[s.victim] for s in sandwiches)
+    victims_fifo = sum(fifo_out[s.victim] for s in sandwiches)
+
+    return np.array(
+        [
+            len(trades),
+            sum(code != OK for code in fifo.code),
+            float(spread.mean()) if spread.size else 0.0,
+            len(sandwiches),
+            sum(s.profit for s in sandwiches) / SUI,
+            lost / victims_fifo if victims_fifo else 0.0,
+            float(losses.max()) if losses.size else 0.0,
+            executor.prefix_reuse(),
+        ]
+    )
+
+
+def simulate_block(rng, config):
+    """MEV metrics of one random block drawn with ``rng``"""
+    state, trades = random_block(rng, config)
+    return evaluate_block(state, trades, config)
+
+
+def run_blocks(
+    n_blocks, config=BlockConfig(), base_seed=0, workers=None, shard_size=None
+):
+    """
+    Evaluate ``n_blocks`` seeded random blocks across a process pool
+
+    Blocks are sharded by sharding.run_sharded. Returns an
+    (n_blocks, len(METRICS)) array ordered by block.
+    """
+    return run_sharded(
+        simulate_block,
+        n_blocks,
+        len(METRICS),
+        config,
+        base_seed,
+        workers,
+        shard_size,
+    )
+
+
+def summarize(results, percentiles=(5, 25, 50, 75, 95)):
+    """Percentile summary of every metric, plus the share of blocks attacked"""
+    sandwiches = results[:, METRICS.index("sandwiches")]
+    summary = {
+        "blocks": int(len(results)),
+        "attacked_rate": float((sandwiches > 0).mean()) if len(results) else 0.0,
+        "total_attacker_profit_sui": float(
+            results[:, METRICS.index("attacker_profit_sui")].sum()
+        ),
+    }
+    summary.update(percentile_summary(results, METRICS, percentiles))
+    return summary
+
+
+def add_arguments(parser):
+    parser.add_argument("--blocks", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--trades-per-block", type=int, default=BlockConfig.trades_per_block
+    )
+    parser.add_argument(
+        "--sell-probability", type=float, default=BlockConfig.sell_probability
+    )
+    parser.add_argument(
+        "--attacker-budget",
+        type=float,
+        default=BlockConfig.attacker_budget_sui,
+        help="Largest front-run, in SUI",
+    )
+
+
+def main(args):
+    config = BlockConfig(
+        trades_per_block=args.trades_per_block,
+        sell_probability=args.sell_probability,
+        attacker_budget_sui=args.attacker_budget,
+    )
+    results = run_blocks(args.blocks, config, args.seed, args.workers)
+    print(json.dumps(summarize(results), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Block ordering and MEV simulator")
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -0,0 +1,240 @@
+import argparse
+import json
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+from move_curve import DEFAULT_PARAMS, BondingCurve, MoveAbort
+from sharding import percentile_summary, run_sharded, shard_plan
+
+SUI = 1_000_000_000  # Base units per SUI
+
+# Columns of the per-launch result array
+METRICS = (
+    "trades_to_transition",  # NaN if the launch never reached LISTING_THRESHOLD
+    "sui_volume_to_transition",  # Gross buy volume (SUI) until transition
+    "mean_buy_slippage",  # Average effective price / spot price - 1 over buys
+    "max_buy_slippage",
+    "peak_sui_reserves",  # SUI
+    "final_sui_reserves",  # SUI
+    "max_reserve_drawdown",  # Largest peak-to-trough drop of sui_reserves, 0..1
+    "rejected_trades",  # Trades the Move code would have aborted
+)
+
+
+class TraderProfile(NamedTuple):
+    """One class of trader in the launch population"""
+
+    name: str
+    weight: float  # Relative share of trades
+    buy_median_sui: float  # Median of the lognormal buy size, in SUI
+    buy_sigma: float  # Lognormal shape parameter of the buy size
+    max_sell_fraction: float  # Sells are uniform in (0, this] of circulating tokens
+
+
+DEFAULT_TRADERS = (
+    TraderProfile("retail", 0.85, 20.0, 1.0, 0.002),
+    TraderProfile("active", 0.14, 250.0, 0.8, 0.01),
+    TraderProfile("whale", 0.01, 5_000.0, 0.5, 0.05),
+)
+
+
+@dataclass(frozen=True)
+class LaunchConfig:
+    """Random launch model; every launch draws its trades from this distribution"""
+
+    max_trades: int = 5_000
+    sell_probability: float = 0.3
+    traders: tuple = DEFAULT_TRADERS
+    params: object = DEFAULT_PARAMS
+
+
+def simulate_launch(rng, config):
+    """Run one random launch to transition (or max_trades) and return its metrics"""
+    n = config.max_trades
+    weights = np.array([t.weight for t in config.traders], dtype=np.float64)
+    profile = rng.choice(len(config.traders), size=n, p=weights / weights.sum())
+    medians = np.array([t.buy_median_sui for t in config.traders])[profile]
+    sigmas = np.array([t.buy_sigma for t in config.traders])[profile]
+    sell_caps = np.array([t.max_sell_fraction for t in config.traders])[profile]
+
+    # Draw everything up front so the trade loop does no RNG calls
+    is_sell = rng.random(n) < config.sell_probability
+    buy_sizes = (medians * np.exp(sigmas * rng.standard_normal(n)) * SUI).astype(
+        np.int64
+    )
+    sell_fractions = rng.random(n) * sell_caps
+
+    curve = BondingCurve(config.params)
+    trades_to_transition = np.nan
+    buy_volume = 0
+    slippage_sum = 0.0
+    slippage_max = 0.0
+    buys = 0
+    peak_reserves = 0
+    max_drawdown = 0.0
+    rejected = 0
+
+    for i in range(n):
+        try:
+            if is_sell[i]:
+                curve.sell(int(curve.total_minted * sell_fractions[i]))
+            else:
+                sui_amount = int(buy_sizes[i])
+                spot_price = curve.calculate_price()
+                tokens = curve.buy(sui_amount)
+                slippage = sui_amount / tokens / spot_price - 1.0
+                slippage_sum += slippage
+                slippage_max = max(slippage_max, slippage)
+                buy_volume += sui_amount
+                buys += 1
+        except (MoveAbort, ValueError):
+            rejected += 1
+            continue
+
+        reserves = curve.sui_reserves
+        if reserves > peak_reserves:
+            peak_reserves = reserves
+        elif peak_reserves:
+            max_drawdown = max(max_drawdown, 1.0 - reserves / peak_reserves)
+
+        if curve.transitioned:
+            trades_to_transition = i + 1
+            break
+
+    return np.array(
+        [
+            trades_to_transition,
+            buy_volume / SUI if curve.transitioned else np.nan,
+            slippage_sum / buys if buys else np.nan,
+            slippage_max,
+            peak_reserves / SUI,
+            curve.sui_reserves / SUI,
+            max_drawdown,
+            rejected,
+        ]
+    )
+
+
+def run_monte_carlo(
+    n_launches,
+    config=LaunchConfig(),
+    base_seed=0,
+    workers=None,
+    shard_size=None,
+    checkpoint_dir=None,
+    resume=False,
+    checkpoint_every=60.0,
+):
+    """
+    Simulate ``n_launches`` seeded random launches across a process pool
+
+    Launches are sharded by sharding.run_sharded. Returns an
+    (n_launches, len(METRICS)) array ordered by launch.
+
+    With ``checkpoint_dir``, finished shards are checkpointed at most every
+    ``checkpoint_every`` seconds (each shard is its own section, so a save
+    only writes the shards finished since the last one) and once at the end.
+    With ``resume``, shards from the latest checkpoint of the same run are
+    reused and only the rest are simulated; per-launch seeding makes the
+    result identical to an uninterrupted run.
+    """
+    workers, shard_size = shard_plan(n_launches, workers, shard_size)
+
+    finished = {}
+    on_shard = None
+    if checkpoint_dir is not None:
+        from checkpoint import CheckpointStore, Schedule
+
+        store = CheckpointStore(checkpoint_dir)
+        schedule = Schedule(checkpoint_every)
+        run = {"launches": n_launches, "seed": base_seed, "config": repr(config)}
+        if resume and store.latest() is not None:
+            saved = store.load()
+            if saved.metadata["run"] != run:
+                raise ValueError(f"{checkpoint_dir} holds a checkpoint of another run")
+            shard_size = saved.metadata["shard_size"]
+            finished = {
+                int(name.split("/")[1]): shard for name, shard in saved.sections.items()
+            }
+
+        def save():
+            store.save(
+                {f"shard/{start}": shard for start, shard in finished.items()},
+                {"run": run, "shard_size": shard_size},
+            )
+
+        def on_shard(start, shard):
+            finished[start] = shard
+            if schedule.due():
+                save()
+
+    results = run_sharded(
+        simulate_launch,
+        n_launches,
+        len(METRICS),
+        config,
+        base_seed,
+        workers,
+        shard_size,
+        dict(finished),
+        on_shard,
+    )
+    if checkpoint_dir is not None:
+        save()
+    return results
+
+
+def summarize(results, percentiles=(5, 25, 50, 75, 95)):
+    """Merge per-launch results into percentile summaries for every metric"""
+    transitioned = ~np.isnan(results[:, METRICS.index("trades_to_transition")])
+    summary = {
+        "launches": int(len(results)),
+        "transition_rate": float(transitioned.mean()) if len(results) else 0.0,
+    }
+    summary.update(percentile_summary(results, METRICS, percentiles))
+    return summary
+
+
+def add_arguments(parser):
+    parser.add_argument("--launches", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-trades", type=int, default=LaunchConfig.max_trades)
+    parser.add_argument(
+        "--sell-probability", type=float, default=LaunchConfig.sell_probability
+    )
+    parser.add_argument("--checkpoint-dir", help="Checkpoint finished shards here")
+    parser.add_argument(
+        "--checkpoint-every", type=float, default=60.0, help="Seconds between saves"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the latest checkpoint in --checkpoint-dir",
+    )
+
+
+def main(args):
+    config = LaunchConfig(
+        max_trades=args.max_trades, sell_probability=args.sell_probability
+    )
+    if args.resume and not args.checkpoint_dir:
+        raise SystemExit("--resume needs --checkpoint-dir")
+    results = run_monte_carlo(
+        args.launches,
+        config,
+        args.seed,
+        args.workers,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=args.resume,
+        checkpoint_every=args.checkpoint_every,
+    )
+    print(json.dumps(summarize(results), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo launch simulator")
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -0,0 +1,662 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+from instrumentation import INSTRUMENTATION
+
+# NumPy is imported inside the batch functions only, so scalar quoting (and the
+# CLI) starts without paying for it
+
+# Constants from sources/bonding_curve.move, in base units (9 decimals)
+MAX_SUPPLY = 1_000_000_000_000_000_000  # 1 billion tokens
+INITIAL_VIRTUAL_SUI = 30_000_000_000_000  # 30,000 SUI
+INITIAL_VIRTUAL_TOKENS = 1_000_000_000_000_000_000  # 1 billion tokens
+K = INITIAL_VIRTUAL_SUI * INITIAL_VIRTUAL_TOKENS  # Constant product k
+LISTING_THRESHOLD = 69_000_000_000_000  # 69,000 SUI
+
+U64_MAX = (1 << 64) - 1
+U128_MAX = (1 << 128) - 1
+
+# Abort codes from bonding_curve.move
+EInsufficientLiquidity = 0
+ETransitionedToAMM = 1
+EInvalidAmount = 2
+ENotAuthorized = 3
+ENegativeTokenMinting = 4
+
+
+class MoveAbort(Exception):
+    """
+    Raised wherever the Move code would abort the transaction
+
+    ``code`` is the abort code passed to ``assert!``, or None for arithmetic
+    aborts raised by the VM itself (overflow, underflow, division by zero).
+    """
+
+    def __init__(self, code, message=""):
+        self.code = code
+        super().__init__(message or f"Move abort with code {code}")
+
+
+def _arithmetic_abort(message):
+    return MoveAbort(None, f"Arithmetic error: {message}")
+
+
+@dataclass(frozen=True)
+class CurveParams:
+    """Curve constants; the defaults are the ones compiled into the Move module"""
+
+    initial_virtual_sui: int = INITIAL_VIRTUAL_SUI
+    initial_virtual_tokens: int = INITIAL_VIRTUAL_TOKENS
+    listing_threshold: int = LISTING_THRESHOLD
+    max_supply: int = MAX_SUPPLY
+    k: Optional[int] = None
+
+    def __post_init__(self):
+        if self.k is None:
+            # let k = (INITIAL_VIRTUAL_SUI as u128) * (INITIAL_VIRTUAL_TOKENS as u128);
+            object.__setattr__(
+                self, "k", self.initial_virtual_sui * self.initial_virtual_tokens
+            )
+        if self.k > U128_MAX:
+            raise _arithmetic_abort("k overflows u128")
+
+
+DEFAULT_PARAMS = CurveParams()
+
+
+class CurveState(NamedTuple):
+    """Immutable snapshot of the on-chain BondingCurve fields, in base units"""
+
+    total_minted: int = 0
+    virtual_sui_reserves: int = INITIAL_VIRTUAL_SUI
+    virtual_token_reserves: int = 0
+    sui_reserves: int = 0
+    transitioned: bool = False
+
+
+class Quotes(NamedTuple):
+    """Batch quote results, one entry per requested trade size"""
+
+    amount_out: np.ndarray
+    price_impact: np.ndarray
+    post_price: np.ndarray
+
+
+class ExactOutQuotes(NamedTuple):
+    """Batch exact-output quotes, one entry per requested output amount"""
+
+    amount_in: np.ndarray  # uint64, 0 where infeasible
+    amount_out: np.ndarray  # uint64, what amount_in actually yields (>= requested)
+    feasible: np.ndarray  # bool, False where the trade would abort
+
+
+def _check_u64(value, name):
+    if not 0 <= value <= U64_MAX:
+        raise ValueError(f"{name} must fit in a u64, got {value}")
+    return value
+
+
+def calculate_tokens_to_mint(
+    virtual_sui_reserves, virtual_token_reserves, sui_amount, params=DEFAULT_PARAMS
+):
+    """Calculate tokens to mint based on SUI amount, exactly as the Move code does"""
+    # let x = (bonding_curve.virtual_sui_reserves as u128) + (sui_amount as u128);
+    x = virtual_sui_reserves + sui_amount
+    if x == 0:
+        raise _arithmetic_abort("division by zero")
+
+    # let new_token_supply = (INITIAL_VIRTUAL_TOKENS as u128) - (k / x);
+    new_token_supply = params.initial_virtual_tokens - params.k // x
+    if new_token_supply < 0:
+        raise _arithmetic_abort("u128 subtraction underflow")
+
+    if new_token_supply > virtual_token_reserves:
+        tokens = new_token_supply - virtual_token_reserves
+        if tokens > U64_MAX:
+            raise _arithmetic_abort("cast to u64 overflow")
+        return tokens
+    return 0
+
+
+def calculate_sui_to_receive(
+    virtual_sui_reserves, virtual_token_reserves, token_amount, params=DEFAULT_PARAMS
+):
+    """Calculate SUI to receive based on token amount, exactly as the Move code does"""
+    if virtual_token_reserves < token_amount:
+        return 0
+
+    new_virtual_tokens = virtual_token_reserves - token_amount
+
+    # let new_sui_amount = k / ((INITIAL_VIRTUAL_TOKENS as u128) - new_virtual_tokens);
+    denominator = params.initial_virtual_tokens - new_virtual_tokens
+    if denominator < 0:
+        raise _arithmetic_abort("u128 subtraction underflow")
+    if denominator == 0:
+        raise _arithmetic_abort("division by zero")
+    new_sui_amount = params.k // denominator
+
+    if virtual_sui_reserves > new_sui_amount:
+        return virtual_sui_reserves - new_sui_amount
+    return 0
+
+
+def calculate_sui_for_tokens(
+    virtual_sui_reserves, virtual_token_reserves, token_amount, params=DEFAULT_PARAMS
+):
+    """
+    Smallest SUI amount whose buy mints at least ``token_amount`` tokens
+
+    Exact inverse of calculate_tokens_to_mint. With m = INITIAL_VIRTUAL_TOKENS -
+    virtual_token_reserves - token_amount the buy mints enough once
+    ``k / x <= m`` in integer division, i.e. once ``x > k / (m + 1)``, so the
+    answer is a single floor division. Because of that floor the buy may mint a
+    few more base units than asked. Returns None if no u64 amount mints that many.
+    """
+    if token_amount == 0:
+        return 0
+    m = params.initial_virtual_tokens - virtual_token_reserves - token_amount
+    if m < 0:
+        return None
+    sui_amount = max(0, params.k // (m + 1) + 1 - virtual_sui_reserves)
+    return sui_amount if sui_amount <= U64_MAX else None
+
+
+def calculate_tokens_for_sui(
+    virtual_sui_reserves, virtual_token_reserves, sui_amount, params=DEFAULT_PARAMS
+):
+    """
+    Smallest token amount whose sell returns at least ``sui_amount`` SUI
+
+    Exact inverse of calculate_sui_to_receive, by the same argument as
+    calculate_sui_for_tokens with m = virtual_sui_reserves - sui_amount.
+    Returns None if selling every virtual token would not return that much.
+    """
+    if sui_amount == 0:
+        return 0
+    m = virtual_sui_reserves - sui_amount
+    if m < 0:
+        return None
+    token_amount = params.k // (m + 1) + 1 - params.initial_virtual_tokens
+    token_amount = max(0, token_amount + virtual_token_reserves)
+    return token_amount if token_amount <= virtual_token_reserves else None
+
+
+def sui_to_transition(state, params=DEFAULT_PARAMS):
+    """SUI a single buy needs to push ``state`` over the listing threshold"""
+    if state.transitioned:
+        return 0
+    return max(0, params.listing_threshold - state.virtual_sui_reserves)
+
+
+def calculate_price(virtual_token_reserves, params=DEFAULT_PARAMS):
+    """Marginal price in SUI per token (k / (INITIAL_VIRTUAL_TOKENS - y)^2)"""
+    denominator = params.initial_virtual_tokens - virtual_token_reserves
+    if denominator <= 0:
+        return 0.0
+    return params.k / (denominator * denominator)
+
+
+class BondingCurve:
+    """
+    Integer model of ``pump_steamm::bonding_curve::BondingCurve``
+
+    Balances are plain ints in base units. Every ``assert!`` and every
+    arithmetic abort of ``buy``/``sell`` raises MoveAbort, and like a Move
+    transaction a failed call leaves the state untouched.
+    """
+
+    def __init__(self, params=DEFAULT_PARAMS, state=None):
+        if state is None:
+            state = CurveState(virtual_sui_reserves=params.initial_virtual_sui)
+        self.params = params
+        self.restore(state)
+
+    def calculate_tokens_to_mint(self, sui_amount):
+        """Calculate tokens to mint based on SUI amount"""
+        return calculate_tokens_to_mint(
+            self.virtual_sui_reserves,
+            self.virtual_token_reserves,
+            sui_amount,
+            self.params,
+        )
+
+    def calculate_sui_to_receive(self, token_amount):
+        """Calculate SUI to receive based on token amount"""
+        return calculate_sui_to_receive(
+            self.virtual_sui_reserves,
+            self.virtual_token_reserves,
+            token_amount,
+            self.params,
+        )
+
+    def calculate_sui_for_tokens(self, token_amount):
+        """Smallest SUI amount that buys at least ``token_amount`` tokens"""
+        return calculate_sui_for_tokens(
+            self.virtual_sui_reserves,
+            self.virtual_token_reserves,
+            token_amount,
+            self.params,
+        )
+
+    def calculate_tokens_for_sui(self, sui_amount):
+        """Smallest token amount that sells for at least ``sui_amount`` SUI"""
+        return calculate_tokens_for_sui(
+            self.virtual_sui_reserves,
+            self.virtual_token_reserves,
+            sui_amount,
+            self.params,
+        )
+
+    def calculate_price(self):
+        """Current marginal token price in SUI"""
+        return calculate_price(self.virtual_token_reserves, self.params)
+
+    def buy(self, sui_amount):
+        """Buy tokens through the bonding curve and return the amount minted"""
+        _check_u64(sui_amount, "sui_amount")
+        if self.transitioned:
+            raise MoveAbort(ETransitionedToAMM, "Bonding curve has transitioned")
+
+        tokens_to_mint = self.calculate_tokens_to_mint(sui_amount)
+        if tokens_to_mint <= 0:
+            raise MoveAbort(ENegativeTokenMinting, "No tokens would be minted")
+
+        # mint_tokens
+        new_total = self.total_minted + tokens_to_mint
+        if new_total > U64_MAX:
+            raise _arithmetic_abort("u64 addition overflow")
+        if new_total > self.params.max_supply:
+            raise MoveAbort(EInvalidAmount, "Exceeds max supply")
+
+        # update_reserves and the virtual reserve updates
+        sui_reserves = self.sui_reserves + sui_amount
+        virtual_sui = self.virtual_sui_reserves + sui_amount
+        virtual_tokens = self.virtual_token_reserves + tokens_to_mint
+        if max(sui_reserves, virtual_sui, virtual_tokens) > U64_MAX:
+            raise _arithmetic_abort("u64 addition overflow")
+
+        self.total_minted = new_total
+        self.sui_reserves = sui_reserves
+        self.virtual_sui_reserves = virtual_sui
+        self.virtual_token_reserves = virtual_tokens
+
+        self.check_transition()
+
+        return tokens_to_mint
+
+    def sell(self, token_amount):
+        """Sell tokens back through the bonding curve and return the SUI received"""
+        _check_u64(token_amount, "token_amount")
+        if self.transitioned:
+            raise MoveAbort(ETransitionedToAMM, "Bonding curve has transitioned")
+
+        sui_amount = self.calculate_sui_to_receive(token_amount)
+        if sui_amount <= 0:
+            raise MoveAbort(EInvalidAmount, "No SUI would be received")
+
+        # burn_tokens
+        if token_amount > self.total_minted:
+            raise _arithmetic_abort("u64 subtraction underflow")
+
+        # send_sui
+        if self.sui_reserves < sui_amount:
+            raise MoveAbort(EInsufficientLiquidity, "Insufficient liquidity")
+
+        if sui_amount > self.virtual_sui_reserves:
+            raise _arithmetic_abort("u64 subtraction underflow")
+
+        self.total_minted -= token_amount
+        self.sui_reserves -= sui_amount
+        self.virtual_sui_reserves -= sui_amount
+        self.virtual_token_reserves -= token_amount
+
+        return sui_amount
+
+    def check_transition(self):
+        """Transition to AMM once virtual SUI hits the threshold; True if it just did"""
+        if (
+            not self.transitioned
+            and self.virtual_sui_reserves >= self.params.listing_threshold
+        ):
+            self.transitioned = True
+            return True
+        return False
+
+    def snapshot(self):
+        """Capture the current fields as an immutable CurveState"""
+        return CurveState(
+            self.total_minted,
+            self.virtual_sui_reserves,
+            self.virtual_token_reserves,
+            self.sui_reserves,
+            self.transitioned,
+        )
+
+    def restore(self, state):
+        """Overwrite the current fields with a CurveState"""
+        self.total_minted = state.total_minted
+        self.virtual_sui_reserves = state.virtual_sui_reserves
+        self.virtual_token_reserves = state.virtual_token_reserves
+        self.sui_reserves = state.sui_reserves
+        self.transitioned = state.transitioned
+
+    def get_stats(self):
+        """Get current stats"""
+        return {
+            "total_minted": self.total_minted,
+            "virtual_sui_reserves": self.virtual_sui_reserves,
+            "virtual_token_reserves": self.virtual_token_reserves,
+            "sui_reserves": self.sui_reserves,
+            "transitioned": self.transitioned,
+            "current_price": self.calculate_price(),
+            "sui_to_transition": sui_to_transition(self, self.params),
+        }
+
+
+INSTRUMENTATION.register(
+    BondingCurve,
+    "calculate_tokens_to_mint",
+    "calculate_sui_to_receive",
+    "calculate_sui_for_tokens",
+    "calculate_tokens_for_sui",
+    "buy",
+    "sell",
+    "check_transition",
+    prefix="move_curve.BondingCurve",
+)
+
+
+def _as_u128_array(values):
+    """Python-int object array, so u128 intermediates never wrap"""
+    import numpy as np
+
+    if isinstance(values, np.ndarray):
+        if values.dtype == object:
+            return values.astype(object)
+        if values.dtype.kind not in "iu":
+            raise TypeError(f"Expected integer amounts, got {values.dtype}")
+        if values.dtype.kind == "i" and values.size and values.min() < 0:
+            raise ValueError("Amounts must be non-negative")
+        return values.astype(np.uint64).astype(object)
+
+    # Lists mixing ints >= 2**63 with small ones would infer float64, so build
+    # the object array directly and check the entries ourselves
+    array = np.array(values, dtype=object)
+    flat = array.ravel()
+    for value in flat:
+        if isinstance(value, bool) or not isinstance(value, (int, np.integer)):
+            raise TypeError(f"Expected integer amounts, got {type(value).__name__}")
+        if value < 0:
+            raise ValueError("Amounts must be non-negative")
+    return np.array([int(value) for value in flat], dtype=object).reshape(array.shape)
+
+
+def _to_u64_array(values):
+    """Convert an object array of checked u64 results back to uint64"""
+    import numpy as np
+
+    return np.asarray(values, dtype=object).astype(np.uint64)
+
+
+def _tokens_to_mint_rows(vs, vt, amount, params):
+    """
+    Object-array core of calculate_tokens_to_mint
+
+    Returns the tokens per row and a mask of rows where the Move code would hit
+    an arithmetic abort (those rows report 0 tokens).
+    """
+    import numpy as np
+
+    x = vs + amount
+    aborted = x == 0
+    new_token_supply = params.initial_virtual_tokens - params.k // np.where(
+        aborted, 1, x
+    )
+    aborted |= new_token_supply < 0
+
+    tokens = np.where(new_token_supply > vt, new_token_supply - vt, 0)
+    aborted |= tokens > U64_MAX
+    return np.where(aborted, 0, tokens), aborted
+
+
+def _sui_to_receive_rows(vs, vt, amount, params):
+    """Object-array core of calculate_sui_to_receive; same contract as above"""
+    import numpy as np
+
+    sellable = vt >= amount
+    new_virtual_tokens = np.where(sellable, vt - amount, 0)
+
+    denominator = params.initial_virtual_tokens - new_virtual_tokens
+    aborted = sellable & (denominator <= 0)
+    new_sui_amount = params.k // np.where(denominator > 0, denominator, 1)
+
+    sui = np.where(sellable & ~aborted & (vs > new_sui_amount), vs - new_sui_amount, 0)
+    return sui, aborted
+
+
+def _sui_for_tokens_rows(vs, vt, amount, params):
+    """
+    Object-array core of calculate_sui_for_tokens
+
+    Returns the SUI per row and a mask of rows with no u64 answer (those rows
+    report 0). Zero amounts are left to the caller.
+    """
+    import numpy as np
+
+    m = params.initial_virtual_tokens - vt - amount
+    infeasible = m < 0
+    sui = params.k // (np.where(infeasible, 0, m) + 1) + 1 - vs
+    sui = np.where(sui > 0, sui, 0)
+    infeasible |= sui > U64_MAX
+    return np.where(infeasible, 0, sui), infeasible
+
+
+def _tokens_for_sui_rows(vs, vt, amount, params):
+    """Object-array core of calculate_tokens_for_sui; same contract as above"""
+    import numpy as np
+
+    m = vs - amount
+    infeasible = m < 0
+    tokens = params.k // (np.where(infeasible, 0, m) + 1) + 1
+    tokens = tokens - params.initial_virtual_tokens + vt
+    tokens = np.where(tokens > 0, tokens, 0)
+    infeasible |= tokens > vt
+    return np.where(infeasible, 0, tokens), infeasible
+
+
+def calculate_tokens_to_mint_batch(
+    virtual_sui_reserves, virtual_token_reserves, sui_amounts, params=DEFAULT_PARAMS
+):
+    """
+    Vectorized calculate_tokens_to_mint over broadcastable u64 arrays
+
+    Intermediates are evaluated on object arrays of Python ints, so the u128
+    products and floor divisions match the Move code exactly. Raises MoveAbort
+    if any element would abort.
+    """
+    import numpy as np
+
+    tokens, aborted = _tokens_to_mint_rows(
+        *np.broadcast_arrays(
+            _as_u128_array(virtual_sui_reserves),
+            _as_u128_array(virtual_token_reserves),
+            _as_u128_array(sui_amounts),
+        ),
+        params,
+    )
+    if aborted.any():
+        raise _arithmetic_abort(f"at index {int(np.argmax(aborted))}")
+    return _to_u64_array(tokens)
+
+
+def calculate_sui_to_receive_batch(
+    virtual_sui_reserves, virtual_token_reserves, token_amounts, params=DEFAULT_PARAMS
+):
+    """
+    Vectorized calculate_sui_to_receive over broadcastable u64 arrays
+
+    Same exactness guarantees as calculate_tokens_to_mint_batch.
+    """
+    import numpy as np
+
+    sui, aborted = _sui_to_receive_rows(
+        *np.broadcast_arrays(
+            _as_u128_array(virtual_sui_reserves),
+            _as_u128_array(virtual_token_reserves),
+            _as_u128_array(token_amounts),
+        ),
+        params,
+    )
+    if aborted.any():
+        raise _arithmetic_abort(f"at index {int(np.argmax(aborted))}")
+    return _to_u64_array(sui)
+
+
+def _price_array(virtual_token_reserves, params):
+    """Vectorized calculate_price for an array of virtual token reserves"""
+    import numpy as np
+
+    denominator = params.initial_virtual_tokens - np.asarray(
+        virtual_token_reserves, dtype=np.float64
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            denominator > 0, float(params.k) / (denominator * denominator), 0.0
+        )
+
+
+def _price_impact(spot_price, post_price):
+    """Relative move of the spot price caused by each trade"""
+    import numpy as np
+
+    if spot_price <= 0:
+        return np.zeros_like(post_price)
+    return post_price / spot_price - 1.0
+
+
+def quote_buys(state, sui_amounts, params=DEFAULT_PARAMS):
+    """
+    Quote many buys against one CurveState without mutating anything
+
+    Trades that BondingCurve.buy would abort, arithmetic aborts included, quote
+    zero tokens and leave the price unchanged; the rest of the batch is quoted
+    as usual.
+    """
+    import numpy as np
+
+    vs, vt, amounts = np.broadcast_arrays(
+        _as_u128_array(state.virtual_sui_reserves),
+        _as_u128_array(state.virtual_token_reserves),
+        np.atleast_1d(_as_u128_array(sui_amounts)),
+    )
+    tokens, aborted = _tokens_to_mint_rows(vs, vt, amounts, params)
+
+    accepted = ~aborted & (tokens > 0)
+    accepted &= state.total_minted + tokens <= params.max_supply
+    accepted &= state.sui_reserves + amounts <= U64_MAX
+    accepted &= vs + amounts <= U64_MAX
+    accepted &= vt + tokens <= U64_MAX
+    if state.transitioned:
+        accepted = np.zeros_like(accepted)
+    tokens = np.where(accepted, tokens, 0)
+
+    spot_price = float(_price_array(state.virtual_token_reserves, params))
+    post_price = _price_array(tokens + state.virtual_token_reserves, params)
+    return Quotes(
+        _to_u64_array(tokens), _price_impact(spot_price, post_price), post_price
+    )
+
+
+def quote_sells(state, token_amounts, params=DEFAULT_PARAMS):
+    """
+    Quote many sells against one CurveState without mutating anything
+
+    Trades that BondingCurve.sell would abort, arithmetic aborts included,
+    quote zero SUI and leave the price unchanged.
+    """
+    import numpy as np
+
+    vs, vt, amounts = np.broadcast_arrays(
+        _as_u128_array(state.virtual_sui_reserves),
+        _as_u128_array(state.virtual_token_reserves),
+        np.atleast_1d(_as_u128_array(token_amounts)),
+    )
+    sui, aborted = _sui_to_receive_rows(vs, vt, amounts, params)
+
+    accepted = ~aborted & (sui > 0)
+    accepted &= amounts <= state.total_minted
+    accepted &= sui <= state.sui_reserves
+    accepted &= sui <= vs
+    if state.transitioned:
+        accepted = np.zeros_like(accepted)
+    sui = np.where(accepted, sui, 0)
+
+    spot_price = float(_price_array(state.virtual_token_reserves, params))
+    post_tokens = np.where(accepted, vt - amounts, vt)
+    post_price = _price_array(post_tokens, params)
+    return Quotes(_to_u64_array(sui), _price_impact(spot_price, post_price), post_price)
+
+
+def quote_buys_exact_out(state, token_amounts, params=DEFAULT_PARAMS):
+    """
+    Cheapest buy for each requested token amount against one CurveState
+
+    O(1) per request: amount_in comes from the closed-form inverse and
+    amount_out is what that buy really mints (at least the requested amount,
+    given the floor division). Requests that BondingCurve.buy would abort, or
+    that no u64 amount can fill, are marked infeasible and quote zeros.
+    """
+    import numpy as np
+
+    vs, vt, amounts = np.broadcast_arrays(
+        _as_u128_array(state.virtual_sui_reserves),
+        _as_u128_array(state.virtual_token_reserves),
+        np.atleast_1d(_as_u128_array(token_amounts)),
+    )
+    sui, infeasible = _sui_for_tokens_rows(vs, vt, amounts, params)
+    tokens, aborted = _tokens_to_mint_rows(vs, vt, sui, params)
+
+    feasible = ~(infeasible | aborted) & (amounts > 0)
+    feasible &= state.total_minted + tokens <= params.max_supply
+    feasible &= state.sui_reserves + sui <= U64_MAX
+    feasible &= vs + sui <= U64_MAX
+    feasible &= vt + tokens <= U64_MAX
+    if state.transitioned:
+        feasible = np.zeros_like(feasible)
+    return ExactOutQuotes(
+        _to_u64_array(np.where(feasible, sui, 0)),
+        _to_u64_array(np.where(feasible, tokens, 0)),
+        feasible.astype(bool),
+    )
+
+
+def quote_sells_exact_out(state, sui_amounts, params=DEFAULT_PARAMS):
+    """
+    Smallest sell for each requested SUI amount against one CurveState
+
+    Mirror of quote_buys_exact_out: amount_in is the token amount to sell and
+    amount_out the SUI it really returns.
+    """
+    import numpy as np
+
+    vs, vt, amounts = np.broadcast_arrays(
+        _as_u128_array(state.virtual_sui_reserves),
+        _as_u128_array(state.virtual_token_reserves),
+        np.atleast_1d(_as_u128_array(sui_amounts)),
+    )
+    tokens, infeasible = _tokens_for_sui_rows(vs, vt, amounts, params)
+    sui, aborted = _sui_to_receive_rows(vs, vt, tokens, params)
+
+    feasible = ~(infeasible | aborted) & (amounts > 0)
+    feasible &= tokens <= state.total_minted
+    feasible &= sui <= state.sui_reserves
+    feasible &= sui <= vs
+    if state.transitioned:
+        feasible = np.zeros_like(feasible)
+    return ExactOutQuotes(
+        _to_u64_array(np.where(feasible, tokens, 0)),
+        _to_u64_array(np.where(feasible, sui, 0)),
+        feasible.astype(bool),
+    )
@@ -0,0 +1,258 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from move_curve import (
+    DEFAULT_PARAMS,
+    EInsufficientLiquidity,
+    EInvalidAmount,
+    ENegativeTokenMinting,
+    ETransitionedToAMM,
+    U64_MAX,
+    BondingCurve,
+    CurveState,
+    MoveAbort,
+    _price_array,
+    _sui_to_receive_rows,
+    _tokens_to_mint_rows,
+)
+
+# Abort code from registry.move
+EDuplicatedBondingCurveType = 1
+
+# Result codes for batch trades besides the Move abort codes
+OK = -1
+ARITHMETIC_ABORT = -2
+
+COLUMNS = (
+    "total_minted",
+    "virtual_sui_reserves",
+    "virtual_token_reserves",
+    "sui_reserves",
+)
+
+
+class TradeResults(NamedTuple):
+    """Outcome of a batch of trades, aligned with the input arrays"""
+
+    amount_out: np.ndarray  # uint64, 0 for aborted trades
+    code: np.ndarray  # int16, OK or the abort code the Move call would raise
+
+
+def _rounds(rows):
+    """
+    Split a batch into rounds in which every curve appears at most once
+
+    Trades on the same curve must apply in order, so the n-th trade on a curve
+    goes into round n. Returns a list of index arrays into the batch.
+    """
+    order = np.argsort(rows, kind="stable")
+    sorted_rows = rows[order]
+    starts = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+    rank = np.empty(len(rows), dtype=np.int64)
+    rank[order] = np.arange(len(rows)) - group_start
+    if not len(rank):
+        return []
+    by_rank = np.argsort(rank, kind="stable")
+    bounds = np.searchsorted(rank[by_rank], np.arange(rank.max() + 2))
+    return [by_rank[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+class CurveStore:
+    """
+    Struct-of-arrays store for many bonding curves
+
+    Mirrors the registry's Bag of curves: each coin type owns one row, and the
+    BondingCurve fields live in contiguous uint64 columns (plus a bool column
+    for ``transitioned``), about 33 bytes per curve. Batch buy/sell apply any
+    number of (row, amount) trades with the exact Move arithmetic of
+    move_curve; trades on the same curve are applied in batch order.
+    """
+
+    def __init__(self, capacity=1024, params=DEFAULT_PARAMS):
+        self.params = params
+        self.size = 0
+        self.coin_types = []
+        self._index = {}
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity):
+        for name in COLUMNS:
+            column = np.zeros(capacity, dtype=np.uint64)
+            if self.size:
+                column[: self.size] = getattr(self, name)[: self.size]
+            setattr(self, name, column)
+        transitioned = np.zeros(capacity, dtype=bool)
+        if self.size:
+            transitioned[: self.size] = self.transitioned[: self.size]
+        self.transitioned = transitioned
+
+    @property
+    def capacity(self):
+        return len(self.transitioned)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, coin_type):
+        return coin_type in self._index
+
+    def register(self, coin_type, state=None):
+        """Add a fresh curve for ``coin_type`` and return its row"""
+        return int(self.register_many([coin_type], state)[0])
+
+    def register_many(self, coin_types, state=None):
+        """Add one fresh curve per coin type, all starting from ``state``"""
+        coin_types = list(coin_types)
+        if state is None:
+            state = CurveState(virtual_sui_reserves=self.params.initial_virtual_sui)
+
+        seen = set()
+        for coin_type in coin_types:
+            if coin_type in self._index or coin_type in seen:
+                raise MoveAbort(
+                    EDuplicatedBondingCurveType, f"Duplicate coin type {coin_type}"
+                )
+            seen.add(coin_type)
+
+        start, stop = self.size, self.size + len(coin_types)
+        if stop > self.capacity:
+            self._allocate(max(stop, 2 * self.capacity))
+
+        for name in COLUMNS:
+            getattr(self, name)[start:stop] = getattr(state, name)
+        self.transitioned[start:stop] = state.transitioned
+        for row, coin_type in enumerate(coin_types, start):
+            self._index[coin_type] = row
+        self.coin_types.extend(coin_types)
+        self.size = stop
+        return np.arange(start, stop)
+
+    def row(self, coin_type):
+        return self._index[coin_type]
+
+    def rows(self, coin_types):
+        """Vector of rows for a sequence of coin types"""
+        index = self._index
+        return np.fromiter((index[c] for c in coin_types), dtype=np.int64)
+
+    def state(self, row):
+        """CurveState of one row"""
+        return CurveState(
+            *(int(getattr(self, name)[row]) for name in COLUMNS),
+            bool(self.transitioned[row]),
+        )
+
+    def set_state(self, row, state):
+        for name in COLUMNS:
+            getattr(self, name)[row] = getattr(state, name)
+        self.transitioned[row] = state.transitioned
+
+    def curve(self, row):
+        """Detached move_curve.BondingCurve copy of one row"""
+        return BondingCurve(self.params, self.state(row))
+
+    def prices(self, rows=None):
+        """Marginal price of every curve (or of ``rows``)"""
+        rows = slice(0, self.size) if rows is None else rows
+        return _price_array(self.virtual_token_reserves[rows], self.params)
+
+    def _columns(self, rows):
+        """Exact (object) copies of the integer columns for ``rows``"""
+        return [getattr(self, name)[rows].astype(object) for name in COLUMNS]
+
+    def _prepare(self, rows, amounts):
+        rows = np.asarray(rows, dtype=np.int64)
+        amounts = np.asarray(amounts)
+        if amounts.dtype.kind == "i" and amounts.size and amounts.min() < 0:
+            raise ValueError("Amounts must be non-negative")
+        amounts = amounts.astype(np.uint64)
+        if rows.shape != amounts.shape:
+            raise ValueError("rows and amounts must have the same shape")
+        if rows.size and (rows.min() < 0 or rows.max() >= self.size):
+            raise IndexError("Trade references an unknown curve row")
+        return rows, amounts
+
+    def buy(self, rows, sui_amounts):
+        """Apply a batch of buys; mirrors BondingCurve.buy for every trade"""
+        rows, amounts = self._prepare(rows, sui_amounts)
+        out = np.zeros(len(rows), dtype=np.uint64)
+        code = np.full(len(rows), OK, dtype=np.int16)
+
+        for batch in _rounds(rows):
+            r = rows[batch]
+            amount = amounts[batch].astype(object)
+            total, vs, vt, reserves = self._columns(r)
+
+            tokens, aborted = _tokens_to_mint_rows(vs, vt, amount, self.params)
+            new_total = total + tokens
+            new_reserves = reserves + amount
+            new_vs = vs + amount
+            new_vt = vt + tokens
+
+            # Same precedence as the asserts in BondingCurve.buy
+            result = np.full(len(r), OK, dtype=np.int16)
+            result[
+                (new_reserves > U64_MAX) | (new_vs > U64_MAX) | (new_vt > U64_MAX)
+            ] = ARITHMETIC_ABORT
+            result[new_total > self.params.max_supply] = EInvalidAmount
+            result[new_total > U64_MAX] = ARITHMETIC_ABORT
+            result[tokens <= 0] = ENegativeTokenMinting
+            result[aborted] = ARITHMETIC_ABORT
+            result[self.transitioned[r]] = ETransitionedToAMM
+
+            ok = result == OK
+            r_ok = r[ok]
+            self.total_minted[r_ok] = new_total[ok].astype(np.uint64)
+            self.sui_reserves[r_ok] = new_reserves[ok].astype(np.uint64)
+            self.virtual_sui_reserves[r_ok] = new_vs[ok].astype(np.uint64)
+            self.virtual_token_reserves[r_ok] = new_vt[ok].astype(np.uint64)
+            self.transitioned[r_ok] |= (
+                self.virtual_sui_reserves[r_ok] >= self.params.listing_threshold
+            )
+
+            out[batch[ok]] = tokens[ok].astype(np.uint64)
+            code[batch] = result
+
+        return TradeResults(out, code)
+
+    def sell(self, rows, token_amounts):
+        """Apply a batch of sells; mirrors BondingCurve.sell for every trade"""
+        rows, amounts = self._prepare(rows, token_amounts)
+        out = np.zeros(len(rows), dtype=np.uint64)
+        code = np.full(len(rows), OK, dtype=np.int16)
+
+        for batch in _rounds(rows):
+            r = rows[batch]
+            amount = amounts[batch].astype(object)
+            total, vs, vt, reserves = self._columns(r)
+
+            sui, aborted = _sui_to_receive_rows(vs, vt, amount, self.params)
+
+            # Same precedence as the asserts in BondingCurve.sell
+            result = np.full(len(r), OK, dtype=np.int16)
+            result[sui > vs] = ARITHMETIC_ABORT
+            result[reserves < sui] = EInsufficientLiquidity
+            result[amount > total] = ARITHMETIC_ABORT
+            result[sui <= 0] = EInvalidAmount
+            result[aborted] = ARITHMETIC_ABORT
+            result[self.transitioned[r]] = ETransitionedToAMM
+
+            ok = result == OK
+            r_ok = r[ok]
+            self.total_minted[r_ok] = (total - amount)[ok].astype(np.uint64)
+            self.sui_reserves[r_ok] = (reserves - sui)[ok].astype(np.uint64)
+            self.virtual_sui_reserves[r_ok] = (vs - sui)[ok].astype(np.uint64)
+            self.virtual_token_reserves[r_ok] = (vt - amount)[ok].astype(np.uint64)
+
+            out[batch[ok]] = sui[ok].astype(np.uint64)
+            code[batch] = result
+
+        return TradeResults(out, code)
+
+    def nbytes(self):
+        """Memory held by the columns (excluding the coin-type index)"""
+        return sum(getattr(self, name).nbytes for name in COLUMNS) + (
+            self.transitioned.nbytes
+        )
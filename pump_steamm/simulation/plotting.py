@@ -0,0 +1,95 @@
+import numpy as np
+
+BUY = 0
+SELL = 1
+
+
+def pyplot():
+    """
+    Import matplotlib.pyplot on first use, with the headless Agg backend
+
+    Every plot here is written to a file, so nothing needs a display, and
+    modules that only compute curves never pay for importing matplotlib.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def lttb(x, y, n_out):
+    """
+    Indices of the ``n_out`` points Largest-Triangle-Three-Buckets keeps
+
+    The first and last points are always kept; the rest are split into equal
+    buckets, and each bucket keeps the point forming the largest triangle with
+    the previously kept point and the mean of the next bucket. Peaks and
+    troughs survive, unlike with striding. Each bucket is one vectorized
+    NumPy pass, so the loop runs ``n_out`` times whatever the input size.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges = np.append(edges, n)  # The last point is the final "next bucket"
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop, next_stop = edges[i], edges[i + 1], edges[i + 2]
+        mean_x = x[stop:next_stop].mean()
+        mean_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[a] - mean_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (mean_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def _history_axis(ax, values, kinds, max_points):
+    """Downsampled line plus one scatter layer each for buys and sells"""
+    index = np.arange(len(values))
+    kept = lttb(index, values, max_points)
+    ax.plot(kept, np.asarray(values)[kept], color="tab:blue", zorder=1)
+    for kind, color in ((BUY, "green"), (SELL, "red")):
+        rows = np.flatnonzero(kinds == kind)
+        rows = rows[lttb(rows, np.asarray(values)[rows], max_points)]
+        ax.scatter(rows, np.asarray(values)[rows], color=color, s=40, zorder=2)
+    ax.set_xlabel("Transaction Number")
+    ax.grid(True)
+
+
+def plot_transaction_history(
+    kinds, prices, balances, path="transaction_history.png", max_points=2_000
+):
+    """
+    Price and token-balance history, buys in green and sells in red
+
+    ``kinds`` holds BUY/SELL per trade. Any array-likes work, including the
+    memory-mapped columns of a columnar.ColumnarResults. Long histories are
+    reduced to ``max_points`` per series with lttb(), so the figure costs the
+    same to draw whether it holds a hundred trades or ten million.
+    """
+    plt = pyplot()
+    kinds = np.asarray(kinds)
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+
+    _history_axis(ax1, prices, kinds, max_points)
+    ax1.set_title("Token Price History")
+    ax1.set_ylabel("Token Price (SUI)")
+
+    _history_axis(ax2, balances, kinds, max_points)
+    ax2.set_title("User Token Balance")
+    ax2.set_ylabel("Token Balance")
+
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
@@ -0,0 +1,226 @@
+import argparse
+import functools
+import json
+import time
+from decimal import Decimal, localcontext
+from typing import NamedTuple
+
+import numpy as np
+
+from move_curve import (
+    DEFAULT_PARAMS,
+    _as_u128_array,
+    _sui_to_receive_rows,
+    _tokens_to_mint_rows,
+)
+
+EXACT = "exact"  # Python ints with the Move code's floor division
+DECIMAL = "decimal"  # Decimal with true division, in a local context
+FLOAT64 = "float64"  # NumPy float64
+MODES = (EXACT, DECIMAL, FLOAT64)
+
+DECIMAL_PRECISION = 40  # Significant digits of the DECIMAL mode and the sims
+
+
+def decimal_context(func):
+    """
+    Run ``func`` with DECIMAL_PRECISION digits in a local Decimal context
+
+    The Decimal sims use this instead of setting ``getcontext().prec`` at
+    import time, which changed the precision for every importer.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with localcontext() as context:
+            context.prec = DECIMAL_PRECISION
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class Ladder(NamedTuple):
+    """State after each buy of a cumulative run of purchases from a fresh curve"""
+
+    tokens_minted: np.ndarray
+    virtual_sui_reserves: np.ndarray
+    virtual_token_reserves: np.ndarray
+
+
+class ErrorReport(NamedTuple):
+    """Measured deviation of one mode from EXACT, in base units"""
+
+    mode: str
+    cases: int
+    max_abs_error: float
+    max_rel_error: float
+    seconds: float
+    cases_per_second: float
+
+
+_to_decimal = np.frompyfunc(Decimal, 1, 1)
+
+
+def _convert(values, mode):
+    """u64 values (or arrays of them) in the representation of ``mode``"""
+    exact = _as_u128_array(values)
+    if mode == EXACT:
+        return exact
+    if mode == DECIMAL:
+        return _to_decimal(exact)
+    if mode == FLOAT64:
+        return exact.astype(np.float64)
+    raise ValueError(f"Unknown precision mode {mode!r}; expected one of {MODES}")
+
+
+def _constants(params, mode):
+    if mode == EXACT:
+        return params.k, params.initial_virtual_tokens
+    if mode == DECIMAL:
+        return Decimal(params.k), Decimal(params.initial_virtual_tokens)
+    return float(params.k), float(params.initial_virtual_tokens)
+
+
+def tokens_to_mint(vs, vt, sui_amounts, params=DEFAULT_PARAMS, mode=EXACT):
+    """
+    calculate_tokens_to_mint over broadcastable arrays in a chosen precision
+
+    EXACT reproduces the Move arithmetic (aborting rows give 0). DECIMAL and
+    FLOAT64 evaluate the same formula with true division, trading exactness
+    for speed; see measure_deviation() for what that costs.
+    """
+    vs, vt, amounts = np.broadcast_arrays(
+        *(_convert(v, mode) for v in (vs, vt, sui_amounts))
+    )
+    if mode == EXACT:
+        return _tokens_to_mint_rows(vs, vt, amounts, params)[0]
+    k, ivt = _constants(params, mode)
+    with localcontext() as context:
+        context.prec = DECIMAL_PRECISION
+        x = vs + amounts
+        positive = x > 0
+        supply = ivt - k / np.where(positive, x, 1)
+        return np.where(positive & (supply > vt), supply - vt, 0)
+
+
+def sui_to_receive(vs, vt, token_amounts, params=DEFAULT_PARAMS, mode=EXACT):
+    """calculate_sui_to_receive counterpart of tokens_to_mint()"""
+    vs, vt, amounts = np.broadcast_arrays(
+        *(_convert(v, mode) for v in (vs, vt, token_amounts))
+    )
+    if mode == EXACT:
+        return _sui_to_receive_rows(vs, vt, amounts, params)[0]
+    k, ivt = _constants(params, mode)
+    with localcontext() as context:
+        context.prec = DECIMAL_PRECISION
+        sellable = vt >= amounts
+        denominator = ivt - np.where(sellable, vt - amounts, 0)
+        valid = sellable & (denominator > 0)
+        new_sui = k / np.where(valid, denominator, 1)
+        return np.where(valid & (vs > new_sui), vs - new_sui, 0)
+
+
+def buy_ladder(sui_amounts, params=DEFAULT_PARAMS, mode=EXACT):
+    """
+    Cumulative buys from a fresh curve in one vectorized pass
+
+    After any run of buys the Move code leaves ``virtual_token_reserves =
+    INITIAL_VIRTUAL_TOKENS - k / virtual_sui_reserves`` (floored in EXACT), so
+    the whole ladder follows from the cumulative SUI without a loop.
+    Assumes every buy goes through, i.e. the ladder stays below max supply and
+    before the transition.
+    """
+    k, ivt = _constants(params, mode)
+    amounts = _convert(sui_amounts, mode)
+    start = _convert(params.initial_virtual_sui, mode)
+    with localcontext() as context:
+        context.prec = DECIMAL_PRECISION
+        vs = start + np.cumsum(amounts)
+        vt = ivt - (k // vs if mode == EXACT else k / vs)
+        start_tokens = ivt - (k // start if mode == EXACT else k / start)
+        tokens = np.diff(vt, prepend=start_tokens)
+    return Ladder(tokens, vs, vt)
+
+
+def _max_errors(exact, approx):
+    """(max absolute, max relative) error of ``approx``, computed exactly"""
+    with localcontext() as context:
+        context.prec = 80
+        error = np.abs(_to_decimal(approx) - _to_decimal(exact))
+        scale = np.maximum(np.abs(_to_decimal(exact)), 1)
+        if not len(error):
+            return 0.0, 0.0
+        return float(error.max()), float((error / scale).max())
+
+
+def _random_trades(rng, n, params):
+    """On-curve states and log-uniform trade sizes, as u64 arrays"""
+    ivs = params.initial_virtual_sui
+    span = max(1, params.listing_threshold - ivs)
+    vs = ivs + (rng.random(n) * span).astype(np.uint64).astype(object)
+    vt = params.initial_virtual_tokens - params.k // vs
+    buys = np.exp2(rng.uniform(20, 50, n)).astype(np.uint64)
+    sells = (rng.random(n) * vt.astype(np.float64)).astype(np.uint64)
+    ladder = np.exp2(rng.uniform(20, 40, n)).astype(np.uint64)
+    ladder = ladder[: int(np.searchsorted(np.cumsum(ladder), span))]
+    return vs.astype(np.uint64), vt.astype(np.uint64), buys, sells, ladder
+
+
+def measure_deviation(mode, n_cases=100_000, params=DEFAULT_PARAMS, seed=0):
+    """
+    Largest deviation of ``mode`` from EXACT over random buys, sells and ladders
+
+    Buys and sells are quoted from random on-curve states; the ladder is a run
+    of random buys from a fresh curve up to the listing threshold. Errors cover
+    the amounts out and the ladder's virtual reserves, in base units.
+    """
+    vs, vt, buys, sells, ladder = _random_trades(
+        np.random.default_rng(seed), n_cases, params
+    )
+    start = time.perf_counter()
+    results = (
+        tokens_to_mint(vs, vt, buys, params, mode),
+        sui_to_receive(vs, vt, sells, params, mode),
+        *buy_ladder(ladder, params, mode),
+    )
+    seconds = time.perf_counter() - start
+
+    expected = (
+        tokens_to_mint(vs, vt, buys, params),
+        sui_to_receive(vs, vt, sells, params),
+        *buy_ladder(ladder, params),
+    )
+    errors = [_max_errors(e, a) for e, a in zip(expected, results)]
+    cases = 2 * n_cases + len(ladder)
+    return ErrorReport(
+        mode,
+        cases,
+        max(abs_error for abs_error, _ in errors),
+        max(rel_error for _, rel_error in errors),
+        seconds,
+        cases / seconds if seconds else 0.0,
+    )
+
+
+def error_budget(modes=MODES, n_cases=100_000, params=DEFAULT_PARAMS, seed=0):
+    """measure_deviation() for every mode"""
+    return [measure_deviation(mode, n_cases, params, seed) for mode in modes]
+
+
+def add_arguments(parser):
+    parser.add_argument("--mode", action="append", choices=MODES)
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(args):
+    reports = error_budget(args.mode or MODES, args.cases, seed=args.seed)
+    print(json.dumps([report._asdict() for report in reports], indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure the error of each precision mode against exact math"
+    )
+    add_arguments(parser)
+    main(parser.parse_args())
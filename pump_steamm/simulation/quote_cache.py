@@ -0,0 +1,171 @@
+import time
+from collections import OrderedDict
+
+BUY = "buy"
+SELL = "sell"
+
+_MISSING = object()
+
+
+class QuoteCache:
+    """
+    Bounded LRU (and optionally TTL) memo of quote results
+
+    Keys are ``(curve_id, virtual_sui_reserves, virtual_token_reserves, side,
+    amount)``. The two virtual reserves are the only state the quote formulas
+    read, so a quote can never be served for reserves other than the ones it
+    was computed on: once a trade moves the curve, lookups simply miss.
+    ``invalidate(curve_id)`` additionally drops the now unreachable entries of
+    a curve right away instead of waiting for LRU eviction.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._by_curve = {}  # curve_id -> set of keys
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Cached value for ``key`` (refreshing its recency), or ``default``"""
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        value, expires_at = entry
+        if expires_at is not None and self.clock() >= expires_at:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        expires_at = None if self.ttl is None else self.clock() + self.ttl
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        else:
+            self._by_curve.setdefault(key[0], set()).add(key)
+        self._entries[key] = (value, expires_at)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, calling ``compute()`` and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, curve_id):
+        """Drop every entry of one curve; returns how many were dropped"""
+        keys = self._by_curve.pop(curve_id, ())
+        for key in keys:
+            del self._entries[key]
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_curve.clear()
+
+    def _remove(self, key):
+        del self._entries[key]
+        keys = self._by_curve[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._by_curve[key[0]]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class CachedQuoter:
+    """
+    Memoizing front for one bonding curve
+
+    Works with any curve that has virtual reserves and the two ``calculate_*``
+    quote methods, i.e. both bonding_curve_sim.BondingCurve and
+    move_curve.BondingCurve. Trades go through ``buy``/``sell`` here so the
+    curve's stale entries are invalidated as soon as its state changes.
+    """
+
+    def __init__(self, curve, cache=None, curve_id=None):
+        self.curve = curve
+        self.cache = cache if cache is not None else QuoteCache()
+        self.curve_id = curve_id if curve_id is not None else id(curve)
+
+    def _key(self, side, amount):
+        curve = self.curve
+        return (
+            self.curve_id,
+            curve.virtual_sui_reserves,
+            curve.virtual_token_reserves,
+            side,
+            amount,
+        )
+
+    def _reserves(self):
+        return self.curve.virtual_sui_reserves, self.curve.virtual_token_reserves
+
+    def quote_buy(self, sui_amount):
+        """Tokens minted for ``sui_amount`` at the current state"""
+        key = self._key(BUY, sui_amount)
+        tokens = self.cache.get(key, _MISSING)
+        if tokens is _MISSING:
+            tokens = self.curve.calculate_tokens_to_mint(sui_amount)
+            self.cache.put(key, tokens)
+        return tokens
+
+    def quote_sell(self, token_amount):
+        """SUI received for ``token_amount`` at the current state"""
+        key = self._key(SELL, token_amount)
+        sui = self.cache.get(key, _MISSING)
+        if sui is _MISSING:
+            sui = self.curve.calculate_sui_to_receive(token_amount)
+            self.cache.put(key, sui)
+        return sui
+
+    def buy(self, sui_amount):
+        before = self._reserves()
+        result = self.curve.buy(sui_amount)
+        self._invalidate_if_moved(before)
+        return result
+
+    def sell(self, token_amount):
+        before = self._reserves()
+        result = self.curve.sell(token_amount)
+        self._invalidate_if_moved(before)
+        return result
+
+    def _invalidate_if_moved(self, before):
+        # Rejected trades leave the reserves (and so their cached quotes) valid
+        if self._reserves() != before:
+            self.cache.invalidate(self.curve_id)
+
+    def stats(self):
+        return self.cache.stats()
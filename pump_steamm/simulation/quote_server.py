@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+from move_curve import BondingCurve, MoveAbort, quote_buys, quote_sells
+from multi_curve import CurveStore
+from quote_cache import BUY, SELL, QuoteCache
+
+logger = logging.getLogger(__name__)
+
+SUI = 1_000_000_000
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+MAX_BODY = 1 << 20
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        self.code = code
+        super().__init__(message)
+
+
+class QuoteService:
+    """
+    Quote engine over a CurveStore that batches concurrent requests
+
+    Every quote awaits a future. The first request of an event-loop tick
+    schedules a flush, which runs once all handlers ready in that tick have
+    enqueued. The flush prices every (curve, side) group with a single
+    vectorized quote_buys/quote_sells call. Repeated quotes against unchanged
+    reserves are answered from a QuoteCache without touching the engine.
+    """
+
+    def __init__(self, store, cache=None):
+        self.store = store
+        self.cache = cache if cache is not None else QuoteCache(maxsize=65_536)
+        self._pending = defaultdict(list)  # (row, side) -> [(amount, future)]
+        self._flush_scheduled = False
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def _row(self, curve_id):
+        if curve_id not in self.store:
+            raise RpcError(INVALID_PARAMS, f"Unknown curve {curve_id!r}")
+        return self.store.row(curve_id)
+
+    def quote(self, curve_id, side, amount):
+        """Future resolving to the quote of one trade"""
+        row = self._row(curve_id)
+        self.requests += 1
+        future = asyncio.get_running_loop().create_future()
+
+        key = self._cache_key(row, side, amount)
+        cached = self.cache.get(key)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+
+        self._pending[(row, side)].append((amount, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        return future
+
+    def _cache_key(self, row, side, amount):
+        store = self.store
+        return (
+            row,
+            int(store.virtual_sui_reserves[row]),
+            int(store.virtual_token_reserves[row]),
+            side,
+            amount,
+        )
+
+    def _flush(self):
+        pending, self._pending = self._pending, defaultdict(list)
+        self._flush_scheduled = False
+        for (row, side), items in pending.items():
+            amounts = np.fromiter((a for a, _ in items), dtype=np.uint64)
+            state = self.store.state(row)
+            quote = quote_buys if side == BUY else quote_sells
+            try:
+                quotes = quote(state, amounts, self.store.params)
+            except (MoveAbort, TypeError, ValueError) as error:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(RpcError(INVALID_PARAMS, str(error)))
+                continue
+
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(items))
+            for i, (amount, future) in enumerate(items):
+                result = {
+                    # u64 amounts as strings, like the Sui RPC, since they
+                    # overflow JavaScript numbers
+                    "amount_out": str(int(quotes.amount_out[i])),
+                    "price_impact": float(quotes.price_impact[i]),
+                    "post_price": float(quotes.post_price[i]),
+                }
+                self.cache.put(self._cache_key(row, side, amount), result)
+                if not future.done():
+                    future.set_result(result)
+
+    def get_stats(self, curve_id):
+        stats = BondingCurve(self.store.params, self.store.state(self._row(curve_id)))
+        return {
+            name: str(value) if type(value) is int else value
+            for name, value in stats.get_stats().items()
+        }
+
+    def list_curves(self):
+        return [str(coin_type) for coin_type in self.store.coin_types]
+
+    def service_stats(self):
+        return {
+            "curves": len(self.store),
+            "requests": self.requests,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "cache": self.cache.stats(),
+        }
+
+
+def _amount(value):
+    try:
+        amount = int(value)
+    except (TypeError, ValueError):
+        raise RpcError(INVALID_PARAMS, f"Invalid amount {value!r}") from None
+    if not 0 <= amount < 2**64:
+        raise RpcError(INVALID_PARAMS, f"Amount {amount} does not fit in a u64")
+    return amount
+
+
+async def _quote_method(service, side, params):
+    """``{"curve": id, "amount": n}`` or ``{"curve": id, "amounts": [...]}``"""
+    if not isinstance(params, dict) or "curve" not in params:
+        raise RpcError(INVALID_PARAMS, "Expected {curve, amount | amounts}")
+    if "amounts" in params:
+        amounts = [_amount(a) for a in params["amounts"]]
+        return list(
+            await asyncio.gather(
+                *(service.quote(params["curve"], side, a) for a in amounts)
+            )
+        )
+    return await service.quote(params["curve"], side, _amount(params.get("amount")))
+
+
+async def dispatch(service, request):
+    """Handle one JSON-RPC request object; notifications return None"""
+    request_id = request.get("id") if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            raise RpcError(INVALID_REQUEST, "Invalid request")
+        method, params = request["method"], request.get("params", {})
+        if method == "quote_buy":
+            result = await _quote_method(service, BUY, params)
+        elif method == "quote_sell":
+            result = await _quote_method(service, SELL, params)
+        elif method == "get_stats":
+            curve = params.get("curve") if isinstance(params, dict) else None
+            result = service.get_stats(curve)
+        elif method == "list_curves":
+            result = service.list_curves()
+        elif method == "service_stats":
+            result = service.service_stats()
+        else:
+            raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+        response = {"jsonrpc": "2.0", "result": result, "id": request_id}
+    except RpcError as error:
+        response = {
+            "jsonrpc": "2.0",
+            "error": {"code": error.code, "message": str(error)},
+            "id": request_id,
+        }
+    except (TypeError, ValueError, KeyError) as error:
+        # Malformed params (e.g. an unhashable curve id or non-list amounts)
+        response = {
+            "jsonrpc": "2.0",
+            "error": {"code": INVALID_PARAMS, "message": f"Invalid params: {error}"},
+            "id": request_id,
+        }
+    if isinstance(request, dict) and "id" not in request:
+        return None
+    return response
+
+
+async def handle_body(service, body):
+    """Handle a raw JSON-RPC payload, single or batch, and return the response bytes"""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        response = {
+            "jsonrpc": "2.0",
+            "error": {"code": PARSE_ERROR, "message": "Parse error"},
+            "id": None,
+        }
+    else:
+        if isinstance(payload, list) and payload:
+            responses = await asyncio.gather(*(dispatch(service, r) for r in payload))
+            response = [r for r in responses if r is not None]
+        else:
+            response = await dispatch(service, payload)
+    return b"" if response in (None, []) else json.dumps(response).encode()
+
+
+def _http_response(status, body=b"", keep_alive=True):
+    headers = [
+        f"HTTP/1.1 {status}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(body)}",
+        # The frontend dev server runs on another origin
+        "Access-Control-Allow-Origin: *",
+        "Access-Control-Allow-Methods: POST, GET, OPTIONS",
+        "Access-Control-Allow-Headers: Content-Type",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    return ("\r\n".join(headers) + "\r\n\r\n").encode() + body
+
+
+async def handle_connection(service, reader, writer):
+    """Minimal HTTP/1.1 keep-alive loop: POST carries JSON-RPC, GET returns stats"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                break
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method = request_line.split(" ", 1)[0]
+            headers = {}
+            for line in header_lines:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            keep_alive = headers.get("connection", "").lower() != "close"
+
+            try:
+                length = int(headers.get("content-length", 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                error = {"code": PARSE_ERROR, "message": "Invalid Content-Length"}
+                body = json.dumps({"jsonrpc": "2.0", "error": error, "id": None})
+                writer.write(_http_response("400 Bad Request", body.encode(), False))
+                break
+            if length > MAX_BODY:
+                writer.write(_http_response("413 Payload Too Large", b"", False))
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            if method == "POST":
+                body = await handle_body(service, body)
+                response = _http_response("200 OK", body, keep_alive)
+            elif method == "GET":
+                stats = json.dumps(service.service_stats()).encode()
+                response = _http_response("200 OK", stats, keep_alive)
+            elif method == "OPTIONS":
+                response = _http_response("204 No Content", b"", keep_alive)
+            else:
+                response = _http_response("405 Method Not Allowed", b"", False)
+                keep_alive = False
+            writer.write(response)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host="127.0.0.1", port=8765):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(service, r, w), host, port
+    )
+    logger.info(
+        "Serving quotes for %d curves on http://%s:%d", len(service.store), host, port
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def simulated_store(n_curves, trades_per_curve=0, seed=0):
+    """CurveStore of ``n_curves`` fresh curves, each moved by random buys"""
+    store = CurveStore(capacity=n_curves)
+    store.register_many(f"curve-{i}" for i in range(n_curves))
+    rng = np.random.default_rng(seed)
+    for _ in range(trades_per_curve):
+        sizes = (rng.lognormal(np.log(20), 1.0, n_curves) * SUI).astype(np.uint64)
+        store.buy(np.arange(n_curves), sizes)
+    return store
+
+
+def replayed_store(path):
+    """CurveStore holding the replayed state of every curve in a trade log"""
+    from replay import apply_record, read_trade_log
+
+    # One pass over the log, holding one curve per id rather than the records
+    store = CurveStore()
+    curves = {}
+    for record in read_trade_log(path):
+        curve_id = record.bonding_curve_id or "default"
+        curve = curves.get(curve_id)
+        if curve is None:
+            curve = curves[curve_id] = BondingCurve(store.params)
+        apply_record(curve, record)
+
+    for curve_id, curve in curves.items():
+        store.register(curve_id, curve.snapshot())
+    return store
+
+
+def add_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--replay", help="Serve the replayed state of this event dump")
+    parser.add_argument("--curves", type=int, default=1)
+    parser.add_argument("--trades", type=int, default=0, help="Random buys per curve")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(args):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.replay:
+        store = replayed_store(args.replay)
+    else:
+        store = simulated_store(args.curves, args.trades, args.seed)
+    try:
+        asyncio.run(serve(QuoteService(store), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON-RPC quote service")
+    add_arguments(parser)
+    main(parser.parse_args())
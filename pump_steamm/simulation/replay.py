@@ -0,0 +1,290 @@
+import argparse
+import csv
+import gzip
+import json
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from move_curve import U64_MAX, BondingCurve, MoveAbort
+
+BUY = 0
+SELL = 1
+
+
+class TradeRecord(NamedTuple):
+    """One BuyResult/SellResult event, normalized from a JSONL or CSV dump"""
+
+    kind: int  # BUY or SELL
+    amount: Optional[int]  # sui_amount for buys, token_amount for sells
+    logged_out: Optional[int]  # tokens_minted / sui_received, if the dump has it
+    bonding_curve_id: Optional[str] = None
+    timestamp_ms: Optional[int] = None
+
+
+class Divergence(NamedTuple):
+    """A trade whose recomputed output differs from the logged one"""
+
+    index: int
+    kind: int
+    amount: Optional[int]  # None if the log has no valid amount
+    logged_out: Optional[int]
+    recomputed_out: Optional[int]  # None if the Move code would have aborted
+    abort_code: Optional[int] = None
+
+
+class ReplayChunk(NamedTuple):
+    """Per-trade state deltas for a contiguous run of replayed trades"""
+
+    start: int  # Index of the first trade of the chunk in the log
+    kind: np.ndarray  # int8, BUY or SELL
+    amount: np.ndarray  # uint64
+    logged_out: np.ndarray  # uint64, 0 where the log has no output
+    recomputed_out: np.ndarray  # uint64, 0 where the trade would abort
+    virtual_sui_delta: np.ndarray  # int64
+    virtual_token_delta: np.ndarray  # int64
+    sui_reserves_delta: np.ndarray  # int64
+    divergences: list
+
+
+def _open(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", newline="")
+    return open(path, newline="")
+
+
+def _int_or_none(value):
+    """The integer in ``value``, or None if it is missing or not an integer"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _present(payload, field):
+    """True if ``field`` holds a value (CSV rows carry every column, often empty)"""
+    return payload.get(field) not in (None, "")
+
+
+def normalize_event(row):
+    """
+    Turn a raw event row into a TradeRecord, or None if it is not a trade
+
+    Accepts Sui RPC event objects (``type`` ending in ``BuyResult>`` or
+    ``SellResult>`` with the payload under ``parsedJson.event``, as emitted
+    through events.move's ``Event<T>`` wrapper) as well as flat rows with
+    ``type`` set to ``buy``/``sell`` and either the Move field names or a
+    generic ``amount``/``result`` pair. The kind comes from ``type``; only
+    rows without a recognizable type fall back to which output field is
+    filled in. Missing or non-integer amounts are kept as None for replay()
+    to report.
+    """
+    event_type = str(row.get("type", ""))
+    payload = row.get("parsedJson", row)
+    payload = payload.get("event", payload)
+    timestamp_ms = _int_or_none(row.get("timestampMs", payload.get("timestamp_ms")))
+    bonding_curve_id = payload.get("bonding_curve_id")
+
+    if event_type.endswith("BuyResult>") or event_type.lower() == "buy":
+        kind = BUY
+    elif event_type.endswith("SellResult>") or event_type.lower() == "sell":
+        kind = SELL
+    elif _present(payload, "tokens_minted"):
+        kind = BUY
+    elif _present(payload, "sui_received"):
+        kind = SELL
+    else:
+        return None
+    amount_field, out_field = (
+        ("sui_amount", "tokens_minted")
+        if kind == BUY
+        else ("token_amount", "sui_received")
+    )
+
+    amount = _int_or_none(
+        payload[amount_field]
+        if _present(payload, amount_field)
+        else payload.get("amount")
+    )
+    logged_out = _int_or_none(
+        payload[out_field] if _present(payload, out_field) else payload.get("result")
+    )
+    return TradeRecord(kind, amount, logged_out, bonding_curve_id, timestamp_ms)
+
+
+def read_trade_log(path):
+    """Lazily yield TradeRecords from a JSONL or CSV event dump (optionally .gz)"""
+    is_csv = str(path).removesuffix(".gz").endswith(".csv")
+    with _open(path) as handle:
+        if is_csv:
+            rows = csv.DictReader(handle)
+        else:
+            rows = map(json.loads, filter(str.strip, handle))
+        for row in rows:
+            record = normalize_event(row)
+            if record is not None:
+                yield record
+
+
+def _follow_log(curve, record):
+    """Force the curve onto the logged outcome of a divergent trade"""
+    if record.kind == BUY:
+        curve.total_minted += record.logged_out
+        curve.sui_reserves += record.amount
+        curve.virtual_sui_reserves += record.amount
+        curve.virtual_token_reserves += record.logged_out
+        curve.check_transition()
+    else:
+        curve.total_minted -= record.amount
+        curve.sui_reserves -= record.logged_out
+        curve.virtual_sui_reserves -= record.logged_out
+        curve.virtual_token_reserves -= record.amount
+
+
+def _valid_amount(record):
+    return record.amount is not None and 0 <= record.amount <= U64_MAX
+
+
+def apply_record(curve, record, follow_log=True):
+    """
+    Apply one TradeRecord to ``curve`` the way replay() does
+
+    Returns (out, abort_code, diverged): the recomputed output (None if the
+    trade aborts or has no valid u64 amount), the Move abort code, and whether
+    the record disagrees with the log or could not be applied.
+    """
+    before = curve.snapshot()
+    valid = _valid_amount(record)
+    out, abort_code = None, None
+    if valid:
+        try:
+            if record.kind == BUY:
+                out = curve.buy(record.amount)
+            else:
+                out = curve.sell(record.amount)
+        except MoveAbort as abort:
+            abort_code = abort.code
+
+    diverged = not valid
+    if valid and record.logged_out is not None and out != record.logged_out:
+        diverged = True
+        if follow_log:
+            curve.restore(before)
+            _follow_log(curve, record)
+    return out, abort_code, diverged
+
+
+def replay(
+    records, curve=None, chunk_size=10_000, bonding_curve_id=None, follow_log=True
+):
+    """
+    Apply trade records to a BondingCurve and yield ReplayChunks of state deltas
+
+    ``records`` can be any iterable (typically read_trade_log), and only one
+    chunk of ``chunk_size`` trades is held at a time, so memory is constant in
+    the length of the log. Records for other curves are skipped when
+    ``bonding_curve_id`` is given.
+
+    Every trade with a logged output is checked against the recomputed one.
+    With ``follow_log`` a divergent trade is applied as logged so the replay
+    stays in sync with the chain; otherwise the recomputed result is kept.
+    A record without a valid u64 amount is reported as a divergence with no
+    recomputed output and leaves the curve unchanged.
+    """
+    curve = curve if curve is not None else BondingCurve()
+    index = 0
+
+    def new_buffers():
+        return (
+            np.empty(chunk_size, dtype=np.int8),
+            np.empty(chunk_size, dtype=np.uint64),
+            np.empty(chunk_size, dtype=np.uint64),
+            np.empty(chunk_size, dtype=np.uint64),
+            np.empty(chunk_size, dtype=np.int64),
+            np.empty(chunk_size, dtype=np.int64),
+            np.empty(chunk_size, dtype=np.int64),
+        )
+
+    buffers = new_buffers()
+    kind, amount, logged, recomputed, d_vsui, d_vtokens, d_reserves = buffers
+    divergences = []
+    fill = 0
+
+    for record in records:
+        if bonding_curve_id not in (None, record.bonding_curve_id):
+            continue
+
+        before = curve.snapshot()
+        out, abort_code, diverged = apply_record(curve, record, follow_log)
+        if diverged:
+            divergences.append(
+                Divergence(
+                    index,
+                    record.kind,
+                    record.amount,
+                    record.logged_out,
+                    out,
+                    abort_code,
+                )
+            )
+
+        kind[fill] = record.kind
+        amount[fill] = record.amount if _valid_amount(record) else 0
+        logged[fill] = record.logged_out or 0
+        recomputed[fill] = out or 0
+        d_vsui[fill] = curve.virtual_sui_reserves - before.virtual_sui_reserves
+        d_vtokens[fill] = curve.virtual_token_reserves - before.virtual_token_reserves
+        d_reserves[fill] = curve.sui_reserves - before.sui_reserves
+        fill += 1
+        index += 1
+
+        if fill == chunk_size:
+            yield ReplayChunk(index - fill, *buffers, divergences)
+            buffers = new_buffers()
+            kind, amount, logged, recomputed, d_vsui, d_vtokens, d_reserves = buffers
+            divergences = []
+            fill = 0
+
+    if fill:
+        yield ReplayChunk(index - fill, *(b[:fill] for b in buffers), divergences)
+
+
+def add_arguments(parser):
+    parser.add_argument("log", help="JSONL or CSV event dump, optionally gzipped")
+    parser.add_argument("--curve-id", default=None)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--max-divergences", type=int, default=20)
+
+
+def main(args):
+    curve = BondingCurve()
+    trades = 0
+    divergences = []
+    divergence_count = 0
+    for chunk in replay(
+        read_trade_log(args.log), curve, args.chunk_size, args.curve_id
+    ):
+        trades += len(chunk.kind)
+        divergence_count += len(chunk.divergences)
+        room = args.max_divergences - len(divergences)
+        divergences.extend(chunk.divergences[:room])
+
+    print(
+        json.dumps(
+            {
+                "trades": trades,
+                "divergences": divergence_count,
+                "first_divergences": [d._asdict() for d in divergences],
+                "final_state": curve.get_stats(),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a BuyResult/SellResult dump")
+    add_arguments(parser)
+    main(parser.parse_args())
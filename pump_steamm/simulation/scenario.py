@@ -0,0 +1,558 @@
+import argparse
+import json
+import operator
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
+from typing import NamedTuple
+
+import numpy as np
+
+from move_curve import (
+    U64_MAX,
+    CurveParams,
+    CurveState,
+    EInsufficientLiquidity,
+    EInvalidAmount,
+    ENegativeTokenMinting,
+    ETransitionedToAMM,
+    MoveAbort,
+    _price_array,
+)
+from multi_curve import ARITHMETIC_ABORT, OK, CurveStore
+from replay import BUY, SELL
+from sharding import item_rng
+
+UNITS = {"base": 1, "whole": 10**9}  # Both SUI and the tokens have 9 decimals
+
+# How a step's amount is found
+FIXED = 0  # Given in the scenario (or drawn by a generator) at compile time
+FRACTION = 1  # Sell this fraction of the curve's circulating tokens
+TO_TRANSITION = 2  # Buy exactly the SUI left to the listing threshold
+
+CODES = {
+    "ok": OK,
+    "arithmetic": ARITHMETIC_ABORT,
+    "EInsufficientLiquidity": EInsufficientLiquidity,
+    "ETransitionedToAMM": ETransitionedToAMM,
+    "EInvalidAmount": EInvalidAmount,
+    "ENegativeTokenMinting": ENegativeTokenMinting,
+}
+NO_EXPECTATION = -100
+
+# dtypes of the (kind, mode, amount, fraction, expect) step columns
+COLUMN_DTYPES = (np.int8, np.int8, np.uint64, np.float64, np.int16)
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# Per-path metrics at the end of a run, available to assertions
+METRICS = (
+    "total_minted",  # In scenario units, like every amount below
+    "virtual_sui_reserves",
+    "virtual_token_reserves",
+    "sui_reserves",
+    "transitioned",
+    "price",  # SUI per token
+    "accepted",  # Trades that went through
+    "rejected",  # Trades the Move code aborted
+    "trades_to_transition",  # Steps until the transition, NaN if none
+)
+
+SCENARIO_KEYS = {
+    "name",
+    "units",
+    "params",
+    "state",
+    "paths",
+    "seed",
+    "steps",
+    "assertions",
+}
+RANDOM_KEYS = {
+    "trades",
+    "sell_probability",
+    "buy_median",
+    "buy_sigma",
+    "max_sell_fraction",
+}
+
+
+class ScenarioError(ValueError):
+    """A scenario file that does not validate; the message locates the problem"""
+
+
+class Assertion(NamedTuple):
+    metric: str
+    op: str
+    value: float
+    tolerance: float
+
+
+class Program(NamedTuple):
+    """
+    A validated scenario compiled to (paths x steps) arrays
+
+    Every path starts from ``state`` on its own curve and runs the same step
+    columns; only generator steps differ between paths.
+    """
+
+    name: str
+    params: CurveParams
+    state: CurveState
+    scale: int  # Base units per scenario unit
+    kinds: np.ndarray  # int8, BUY or SELL
+    modes: np.ndarray  # int8, FIXED, FRACTION or TO_TRANSITION
+    amounts: np.ndarray  # uint64 base units, for FIXED steps
+    fractions: np.ndarray  # float64, for FRACTION steps
+    expect: np.ndarray  # int16 code expected of every path, or NO_EXPECTATION
+    assertions: tuple
+
+
+class ScenarioResult(NamedTuple):
+    name: str
+    file: str
+    passed: bool
+    failures: list
+    paths: int
+    steps: int
+    seconds: float
+    metrics: dict  # Mean over paths of each metric
+
+
+def _fail(where, message):
+    raise ScenarioError(f"{where}: {message}")
+
+
+def _check_keys(document, allowed, where):
+    if not isinstance(document, dict):
+        _fail(where, "expected a mapping")
+    unknown = set(document) - allowed
+    if unknown:
+        _fail(where, f"unknown keys {sorted(unknown)}")
+
+
+def _number(value, where, low=0.0, high=None):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        _fail(where, f"expected a number, got {value!r}")
+    if value < low or (high is not None and value > high):
+        _fail(where, f"{value} is out of range")
+    return value
+
+
+def _base_units(value, scale, where):
+    """Scenario amount to u64 base units, without float rounding"""
+    _number(value, where)
+    amount = int(Decimal(str(value)) * scale)
+    if amount > U64_MAX:
+        _fail(where, f"{value} does not fit in a u64")
+    return amount
+
+
+def _compile_step(step, scale, where, out):
+    """Append (kind, mode, amount, fraction, expect) rows for one step to ``out``"""
+    if not isinstance(step, dict):
+        _fail(where, "expected a mapping")
+    if "repeat" in step:
+        _check_keys(step, {"repeat", "steps"}, where)
+        count = _number(step["repeat"], f"{where}.repeat")
+        if not isinstance(count, int):
+            _fail(f"{where}.repeat", "expected an integer")
+        body = []
+        for i, inner in enumerate(step.get("steps") or ()):
+            _compile_step(inner, scale, f"{where}.steps[{i}]", body)
+        out.extend(body * count)
+        return
+
+    actions = {"buy", "sell", "sell_fraction", "buy_to_transition"} & set(step)
+    if len(actions) != 1:
+        _fail(
+            where,
+            "expected exactly one of buy, sell, sell_fraction, "
+            "buy_to_transition or repeat",
+        )
+    _check_keys(step, actions | {"expect"}, where)
+    expect = step.get("expect", None)
+    if expect is None:
+        expect = NO_EXPECTATION
+    elif expect in CODES:
+        expect = CODES[expect]
+    else:
+        _fail(f"{where}.expect", f"expected one of {sorted(CODES)}")
+
+    action = actions.pop()
+    value = step[action]
+    if action == "buy":
+        out.append((BUY, FIXED, _base_units(value, scale, f"{where}.buy"), 0.0, expect))
+    elif action == "sell":
+        out.append(
+            (SELL, FIXED, _base_units(value, scale, f"{where}.sell"), 0.0, expect)
+        )
+    elif action == "sell_fraction":
+        fraction = _number(value, f"{where}.sell_fraction", high=1.0)
+        out.append((SELL, FRACTION, 0, fraction, expect))
+    else:
+        if value is not True:
+            _fail(f"{where}.buy_to_transition", "expected true")
+        out.append((BUY, TO_TRANSITION, 0, 0.0, expect))
+
+
+def _random_columns(spec, scale, paths, seed, where):
+    """
+    (paths x trades) columns of a random trading generator
+
+    Buys are lognormal around ``buy_median`` (scenario units); sells are a
+    uniform fraction up to ``max_sell_fraction`` of the circulating tokens,
+    like the monte_carlo trader model. Each path draws from its own seeded
+    stream.
+    """
+    _check_keys(spec, RANDOM_KEYS, where)
+    trades = spec.get("trades")
+    if not isinstance(trades, int) or trades < 0:
+        _fail(f"{where}.trades", "expected a non-negative integer")
+    sell_probability = _number(
+        spec.get("sell_probability", 0.3), f"{where}.sell_probability", high=1.0
+    )
+    median = _number(spec.get("buy_median", 20 * 10**9 / scale), f"{where}.buy_median")
+    sigma = _number(spec.get("buy_sigma", 1.0), f"{where}.buy_sigma")
+    max_fraction = _number(
+        spec.get("max_sell_fraction", 0.01), f"{where}.max_sell_fraction", high=1.0
+    )
+
+    kinds = np.empty((paths, trades), dtype=np.int8)
+    buys = np.empty((paths, trades))
+    fractions = np.empty((paths, trades))
+    for path in range(paths):
+        rng = item_rng(seed, path)
+        kinds[path] = np.where(rng.random(trades) < sell_probability, SELL, BUY)
+        buys[path] = median * scale * np.exp(sigma * rng.standard_normal(trades))
+        fractions[path] = rng.random(trades) * max_fraction
+    sells = kinds == SELL
+    return (
+        kinds,
+        np.where(sells, FRACTION, FIXED).astype(np.int8),
+        np.where(sells, 0, np.minimum(buys, 2.0**63)).astype(np.uint64),
+        np.where(sells, fractions, 0.0),
+    )
+
+
+def compile_scenario(document):
+    """
+    Validate a scenario document (parsed JSON/YAML) into a Program
+
+    Raises ScenarioError naming the offending field. Amounts are in the
+    scenario's ``units`` ("base" units or "whole" SUI/tokens).
+    """
+    _check_keys(document, SCENARIO_KEYS, "scenario")
+    name = document.get("name", "scenario")
+    units = document.get("units", "base")
+    if units not in UNITS:
+        _fail("units", f"expected one of {sorted(UNITS)}")
+    scale = UNITS[units]
+
+    params = document.get("params", {})
+    _check_keys(params, set(CurveParams.__dataclass_fields__), "params")
+    try:
+        params = CurveParams(**params)
+    except (MoveAbort, TypeError) as error:
+        _fail("params", str(error))
+    state = document.get("state", {})
+    _check_keys(state, set(CurveState._fields), "state")
+    state = dict(state)
+    for field, value in state.items():
+        if field == "transitioned":
+            if not isinstance(value, bool):
+                _fail("state.transitioned", "expected a boolean")
+        else:
+            state[field] = _base_units(value, scale, f"state.{field}")
+    state = CurveState(**{"virtual_sui_reserves": params.initial_virtual_sui, **state})
+
+    paths = document.get("paths", 1)
+    if not isinstance(paths, int) or paths < 1:
+        _fail("paths", "expected a positive integer")
+    seed = document.get("seed", 0)
+    if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+        _fail("seed", "expected a non-negative integer")
+
+    # Columns are collected per step block; fixed steps broadcast over paths
+    blocks = []
+    fixed = []
+
+    def close_fixed():
+        if fixed:
+            columns = [
+                np.array(column, dtype)
+                for column, dtype in zip(zip(*fixed), COLUMN_DTYPES)
+            ]
+            blocks.append(
+                (
+                    *(np.broadcast_to(c, (paths, len(fixed))) for c in columns[:4]),
+                    columns[4],
+                )
+            )
+            fixed.clear()
+
+    steps = document.get("steps")
+    if not isinstance(steps, list) or not steps:
+        _fail("steps", "expected a non-empty list")
+    for i, step in enumerate(steps):
+        where = f"steps[{i}]"
+        if isinstance(step, dict) and "random" in step:
+            _check_keys(step, {"random"}, where)
+            close_fixed()
+            columns = _random_columns(step["random"], scale, paths, seed, where)
+            trades = columns[0].shape[1]
+            blocks.append((*columns, np.full(trades, NO_EXPECTATION)))
+        else:
+            _compile_step(step, scale, where, fixed)
+    close_fixed()
+
+    assertions = []
+    for i, assertion in enumerate(document.get("assertions", ())):
+        where = f"assertions[{i}]"
+        _check_keys(assertion, {"metric", "op", "value", "tolerance"}, where)
+        if assertion.get("metric") not in METRICS:
+            _fail(f"{where}.metric", f"expected one of {list(METRICS)}")
+        if assertion.get("op", "==") not in OPERATORS:
+            _fail(f"{where}.op", f"expected one of {list(OPERATORS)}")
+        value = assertion.get("value")
+        if not isinstance(value, (int, float)):
+            _fail(f"{where}.value", "expected a number or boolean")
+        tolerance = _number(assertion.get("tolerance", 0), f"{where}.tolerance")
+        assertions.append(
+            Assertion(assertion["metric"], assertion.get("op", "=="), value, tolerance)
+        )
+
+    kinds, modes, amounts, fractions, expect = (
+        np.concatenate(columns, axis=-1) for columns in zip(*blocks)
+    )
+    return Program(
+        name,
+        params,
+        state,
+        scale,
+        kinds.astype(np.int8),
+        modes.astype(np.int8),
+        amounts.astype(np.uint64),
+        fractions.astype(np.float64),
+        expect.astype(np.int16),
+        tuple(assertions),
+    )
+
+
+def execute(program):
+    """
+    Run a Program on a CurveStore, one vectorized batch per step column
+
+    Returns (codes, metrics): the (paths x steps) result codes and a dict of
+    per-path METRICS arrays.
+    """
+    paths, steps = program.kinds.shape
+    store = CurveStore(paths, program.params)
+    rows = store.register_many(range(paths), program.state)
+    codes = np.empty((paths, steps), dtype=np.int16)
+    trades_to_transition = np.full(paths, np.nan)
+
+    for step in range(steps):
+        modes = program.modes[:, step]
+        amounts = program.amounts[:, step].copy()
+        fraction = modes == FRACTION
+        if fraction.any():
+            amounts[fraction] = (
+                store.total_minted[rows[fraction]] * program.fractions[fraction, step]
+            ).astype(np.uint64)
+        to_transition = modes == TO_TRANSITION
+        if to_transition.any():
+            vs = store.virtual_sui_reserves[rows[to_transition]]
+            threshold = np.uint64(program.params.listing_threshold)
+            amounts[to_transition] = np.where(vs < threshold, threshold - vs, 0)
+
+        sells = program.kinds[:, step] == SELL
+        codes[~sells, step] = store.buy(rows[~sells], amounts[~sells]).code
+        codes[sells, step] = store.sell(rows[sells], amounts[sells]).code
+        newly = np.isnan(trades_to_transition) & store.transitioned[rows]
+        trades_to_transition[newly] = step + 1
+
+    scale = program.scale
+    metrics = {
+        "total_minted": store.total_minted[rows] / scale,
+        "virtual_sui_reserves": store.virtual_sui_reserves[rows] / scale,
+        "virtual_token_reserves": store.virtual_token_reserves[rows] / scale,
+        "sui_reserves": store.sui_reserves[rows] / scale,
+        "transitioned": store.transitioned[rows].astype(np.float64),
+        "price": _price_array(
+            store.virtual_token_reserves[rows], program.params
+        ).astype(np.float64),
+        "accepted": (codes == OK).sum(axis=1).astype(np.float64),
+        "rejected": (codes != OK).sum(axis=1).astype(np.float64),
+        "trades_to_transition": trades_to_transition,
+    }
+    return codes, metrics
+
+
+def check(program, codes, metrics):
+    """Failure messages for the expectations and assertions of a run"""
+    failures = []
+    for step in np.flatnonzero(program.expect != NO_EXPECTATION):
+        wrong = codes[:, step] != program.expect[step]
+        if wrong.any():
+            expected = _code_name(program.expect[step])
+            actual = _code_name(codes[np.argmax(wrong), step])
+            failures.append(
+                f"step {step}: expected {expected}, got {actual} on "
+                f"{wrong.sum()}/{len(wrong)} paths"
+            )
+    for assertion in program.assertions:
+        values = metrics[assertion.metric]
+        if assertion.op == "==":
+            held = np.abs(values - assertion.value) <= assertion.tolerance
+        elif assertion.op == "!=":
+            held = np.abs(values - assertion.value) > assertion.tolerance
+        else:
+            held = OPERATORS[assertion.op](values, assertion.value)
+        if not held.all():
+            failures.append(
+                f"{assertion.metric} {assertion.op} {assertion.value} fails on "
+                f"{(~held).sum()}/{len(held)} paths (e.g. {values[np.argmin(held)]})"
+            )
+    return failures
+
+
+def _code_name(code):
+    return next(name for name, value in CODES.items() if value == code)
+
+
+def load_scenario(path):
+    """Parse a .json scenario file, or .yaml/.yml if PyYAML is installed"""
+    with open(path) as handle:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as error:
+                raise ImportError("YAML scenarios need PyYAML installed") from error
+            return yaml.safe_load(handle)
+        return json.load(handle)
+
+
+def _failed(path, error, start):
+    """ScenarioResult of a file that could not be loaded, compiled or run"""
+    message = str(error)
+    if not isinstance(error, (ScenarioError, OSError, ImportError)):
+        message = f"{type(error).__name__}: {message}"
+    return ScenarioResult(
+        os.path.basename(path),
+        path,
+        False,
+        [message],
+        0,
+        0,
+        time.perf_counter() - start,
+        {},
+    )
+
+
+def run_file(path):
+    """
+    Load, compile, run and check one scenario file as a ScenarioResult
+
+    Any error, from a missing file to a crash while executing, becomes a
+    failed result for this file rather than stopping the pack.
+    """
+    start = time.perf_counter()
+    try:
+        program = compile_scenario(load_scenario(path))
+        codes, metrics = execute(program)
+        failures = check(program, codes, metrics)
+    except Exception as error:
+        return _failed(path, error, start)
+    paths, steps = codes.shape
+    means = {
+        name: (None if np.isnan(values).all() else float(np.nanmean(values)))
+        for name, values in metrics.items()
+    }
+    return ScenarioResult(
+        program.name,
+        path,
+        not failures,
+        failures,
+        paths,
+        steps,
+        time.perf_counter() - start,
+        means,
+    )
+
+
+def scenario_files(paths):
+    """Scenario files named by ``paths``, expanding directories, in sorted order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith((".json", ".yaml", ".yml"))
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def run_pack(paths, workers=None):
+    """
+    Run every scenario file under ``paths`` across a process pool
+
+    Returns ScenarioResults in file order.
+    """
+    files = scenario_files(paths)
+    workers = min(workers or os.cpu_count() or 1, max(1, len(files)))
+    if workers == 1:
+        return [run_file(path) for path in files]
+
+    start = time.perf_counter()
+    results = [None] * len(files)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_file, path): i for i, path in enumerate(files)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as error:  # e.g. a worker killed mid-run
+                results[i] = _failed(files[i], error, start)
+    return results
+
+
+def add_arguments(parser):
+    parser.add_argument("paths", nargs="+", help="Scenario files or directories")
+    parser.add_argument("--workers", type=int, default=None)
+
+
+def main(args):
+    results = run_pack(args.paths, args.workers)
+    failed = [result for result in results if not result.passed]
+    print(
+        json.dumps(
+            {
+                "scenarios": len(results),
+                "failed": len(failed),
+                "results": [result._asdict() for result in results],
+            },
+            indent=2,
+        )
+    )
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run scenario files as a regression pack"
+    )
+    add_arguments(parser)
+    main(parser.parse_args())
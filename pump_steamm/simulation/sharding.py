@@ -0,0 +1,95 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+def item_rng(base_seed, index):
+    """Independent RNG stream per item, so results do not depend on sharding"""
+    return np.random.default_rng(np.random.SeedSequence(base_seed, spawn_key=(index,)))
+
+
+def shard_plan(n_items, workers=None, shard_size=None):
+    """(workers, shard_size) with the defaults filled in"""
+    workers = workers or os.cpu_count() or 1
+    if shard_size is None:
+        # A few shards per worker keeps the pool busy without pickling overhead
+        shard_size = max(1, -(-n_items // (workers * 4)))
+    return workers, shard_size
+
+
+def _run_shard(simulate, n_metrics, base_seed, start, stop, config):
+    """Worker task: simulate items [start, stop) into one compact array"""
+    results = np.empty((stop - start, n_metrics))
+    for row, index in enumerate(range(start, stop)):
+        results[row] = simulate(item_rng(base_seed, index), config)
+    return start, results
+
+
+def run_sharded(
+    simulate,
+    n_items,
+    n_metrics,
+    config,
+    base_seed=0,
+    workers=None,
+    shard_size=None,
+    finished=None,
+    on_shard=None,
+):
+    """
+    Run ``simulate(rng, config)`` for ``n_items`` seeded items across a process pool
+
+    ``simulate`` must be a module-level function returning ``n_metrics``
+    values. Items are split into contiguous shards; each worker returns one
+    float64 array per shard, which is written into its slot of the result as
+    soon as it completes. Returns an (n_items, n_metrics) array ordered by item.
+
+    ``finished`` maps shard starts to shards computed earlier, which are
+    copied in instead of rerun, and ``on_shard(start, shard)`` is called for
+    every newly completed shard.
+    """
+    workers, shard_size = shard_plan(n_items, workers, shard_size)
+    finished = finished or {}
+
+    results = np.empty((n_items, n_metrics))
+    for start, shard in finished.items():
+        results[start : start + len(shard)] = shard
+    bounds = [
+        (start, min(start + shard_size, n_items))
+        for start in range(0, n_items, shard_size)
+        if start not in finished
+    ]
+
+    def record(start, shard):
+        results[start : start + len(shard)] = shard
+        if on_shard is not None:
+            on_shard(start, shard)
+
+    if workers == 1:
+        for start, stop in bounds:
+            record(*_run_shard(simulate, n_metrics, base_seed, start, stop, config))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_shard, simulate, n_metrics, base_seed, start, stop, config)
+            for start, stop in bounds
+        ]
+        for future in as_completed(futures):
+            record(*future.result())
+    return results
+
+
+def percentile_summary(results, metrics, percentiles=(5, 25, 50, 75, 95)):
+    """Percentiles of every column of ``results`` by metric name, ignoring NaNs"""
+    keys = [f"p{p}" for p in percentiles]
+    summary = {}
+    for column, name in enumerate(metrics):
+        values = results[:, column]
+        values = values[~np.isnan(values)]
+        if values.size:
+            summary[name] = dict(zip(keys, np.percentile(values, percentiles).tolist()))
+        else:
+            summary[name] = dict.fromkeys(keys)
+    return summary
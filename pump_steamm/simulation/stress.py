@@ -0,0 +1,276 @@
+import argparse
+import json
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from ledger import simulate_wallets
+from monte_carlo import SUI
+from move_curve import (
+    DEFAULT_PARAMS,
+    EInsufficientLiquidity,
+    EInvalidAmount,
+    ETransitionedToAMM,
+    _as_u128_array,
+)
+from multi_curve import ARITHMETIC_ABORT, OK
+from precision import EXACT, FLOAT64
+
+LARGEST_FIRST = "largest_first"
+SMALLEST_FIRST = "smallest_first"
+RANDOM = "random"
+ORDERINGS = (LARGEST_FIRST, SMALLEST_FIRST, RANDOM)
+
+METRICS = (
+    "exits",  # Exits that went through before the first failure
+    "code",  # Abort code of the first failed exit, OK if none failed
+    "sui_paid",  # SUI paid out to the exits that went through
+    "sui_left",  # Real SUI reserves left afterwards
+    "tokens_exited",
+    "min_reserve_ratio",  # Lowest reserves / virtual SUI above the floor
+)
+
+
+class SellCurve(NamedTuple):
+    """
+    Exit-by-exit trajectory of a sequence of sells, one row per scenario
+
+    Columns are exits in order. Entries from the first failed exit onwards
+    describe the sells that would have happened had nothing aborted; use
+    ``failed_at`` to cut them off.
+    """
+
+    cumulative_tokens: np.ndarray
+    virtual_sui: np.ndarray  # After each exit
+    sui_out: np.ndarray
+    reserves: np.ndarray  # Real SUI reserves after each exit
+    failed_at: np.ndarray  # Index of the first failed exit, or the exit count
+    code: np.ndarray  # Its abort code, or OK
+
+
+def _values(values, mode):
+    if mode == EXACT:
+        return _as_u128_array(values)
+    if mode == FLOAT64:
+        return np.asarray(values, dtype=np.float64)
+    raise ValueError(f"Unknown stress mode {mode!r}; expected {EXACT} or {FLOAT64}")
+
+
+def sell_curve(state, token_amounts, params=DEFAULT_PARAMS, mode=EXACT):
+    """
+    Sell every row of ``token_amounts`` (scenarios x exits) in order, in closed form
+
+    A successful sell leaves the curve at ``virtual_sui = k // (INITIAL_VIRTUAL
+    _TOKENS - virtual_tokens)``, so after the first j exits the state only
+    depends on the cumulative tokens sold and the whole run follows from one
+    prefix sum: exit j pays ``vs[j-1] - vs[j]`` and the real reserves follow
+    ``sui_reserves - (vs[0] - vs[j])``. Exits fail with the checks of the Move
+    ``sell`` in their order; the first failure ends the run, since every later
+    state would differ from the closed form.
+
+    EXACT matches move_curve.BondingCurve.sell; FLOAT64 is the same formula
+    with true division, for large sweeps where the failure point matters
+    more than the last base unit (it misses sells of a few base units that
+    round to zero SUI, and so abort, in EXACT).
+    """
+    amounts = np.atleast_2d(_values(token_amounts, mode))
+    floor_div = mode == EXACT
+    k, ivt = (
+        (params.k, params.initial_virtual_tokens)
+        if floor_div
+        else (float(params.k), float(params.initial_virtual_tokens))
+    )
+    vs0, vt0, minted0, reserves0 = (
+        _values(value, mode)
+        for value in (
+            state.virtual_sui_reserves,
+            state.virtual_token_reserves,
+            state.total_minted,
+            state.sui_reserves,
+        )
+    )
+
+    cumulative = np.cumsum(amounts, axis=1)
+    before = cumulative - amounts
+    sellable = cumulative <= vt0
+    denominator = ivt - np.where(sellable, vt0 - cumulative, 0)
+    divisible = denominator > 0
+    safe = np.where(divisible, denominator, 1)
+    priced = sellable & divisible
+    vs = np.where(priced, k // safe if floor_div else k / safe, 0)
+    previous = np.concatenate(
+        [np.full((len(amounts), 1), vs0, dtype=vs.dtype), vs[:, :-1]], axis=1
+    )
+    sui_out = np.where(priced & (previous > vs), previous - vs, 0)
+    reserves_before = reserves0 - (vs0 - previous)
+    reserves = reserves_before - sui_out
+
+    # Checks in the order of BondingCurve.sell
+    code = np.full(amounts.shape, OK, dtype=np.int8)
+    failed = np.zeros(amounts.shape, dtype=bool)
+    for mask, abort in (
+        (np.full(amounts.shape, bool(state.transitioned)), ETransitionedToAMM),
+        (sellable & ~divisible, ARITHMETIC_ABORT),
+        (sui_out <= 0, EInvalidAmount),
+        (amounts > minted0 - before, ARITHMETIC_ABORT),
+        (reserves_before < sui_out, EInsufficientLiquidity),
+    ):
+        mask = mask & ~failed
+        code[mask] = abort
+        failed |= mask
+
+    any_failed = failed.any(axis=1)
+    failed_at = np.where(any_failed, failed.argmax(axis=1), amounts.shape[1])
+    rows = np.arange(len(amounts))
+    first_code = np.where(
+        any_failed, code[rows, np.minimum(failed_at, amounts.shape[1] - 1)], OK
+    )
+    return SellCurve(cumulative, vs, sui_out, reserves, failed_at, first_code)
+
+
+def first_insolvency(state, token_amounts, params=DEFAULT_PARAMS):
+    """
+    Index of the first exit of one ordering that the real reserves cannot pay
+
+    Exit j is insolvent exactly when ``vs[j] < vs[0] - sui_reserves`` (the
+    reserves cover everything the virtual SUI can fall to above that floor),
+    and vs falls with every exit, so the answer is a binary search over the
+    closed-form trajectory. Ignores the other aborts; returns the exit count
+    if the reserves cover every exit.
+    """
+    amounts = _as_u128_array(token_amounts)
+    vt = state.virtual_token_reserves - np.cumsum(amounts)
+    if len(vt) and vt[-1] < 0:
+        raise ValueError("The exits sell more tokens than the curve has minted")
+    vs = params.k // (params.initial_virtual_tokens - vt)
+    floor = state.virtual_sui_reserves - state.sui_reserves
+    # vs is non-increasing, so -vs is sorted for searchsorted
+    return int(np.searchsorted(-vs.astype(np.float64), -float(floor), side="right"))
+
+
+def exit_orders(holdings, n_scenarios, ordering=RANDOM, top_k=None, rng=None):
+    """
+    (scenarios x holders) indices into ``holdings`` giving who exits when
+
+    Only holders with a balance take part, limited to the ``top_k`` largest.
+    LARGEST_FIRST and SMALLEST_FIRST repeat one deterministic order; RANDOM
+    draws an independent permutation per scenario.
+    """
+    holdings = np.asarray(holdings)
+    holders = np.flatnonzero(holdings)
+    holders = holders[np.argsort(holdings[holders], kind="stable")[::-1]]
+    if top_k is not None:
+        holders = holders[:top_k]
+    if ordering == LARGEST_FIRST:
+        order = holders
+    elif ordering == SMALLEST_FIRST:
+        order = holders[::-1]
+    elif ordering == RANDOM:
+        rng = rng if rng is not None else np.random.default_rng()
+        keys = rng.random((n_scenarios, len(holders)))
+        return holders[np.argsort(keys, axis=1)]
+    else:
+        raise ValueError(f"Unknown ordering {ordering!r}; expected one of {ORDERINGS}")
+    return np.broadcast_to(order, (n_scenarios, len(holders)))
+
+
+def stress(state, holdings, orders, params=DEFAULT_PARAMS, mode=EXACT):
+    """
+    Bank-run outcome of each exit ordering as a (scenarios x METRICS) array
+
+    ``holdings`` are token balances by holder (e.g. WalletLedger.tokens) and
+    every holder in a row of ``orders`` sells their whole balance in turn.
+    """
+    curve = sell_curve(state, np.asarray(holdings)[orders], params, mode)
+    n, width = curve.sui_out.shape
+    last = np.clip(curve.failed_at - 1, 0, max(width - 1, 0))
+    went_through = np.arange(width) < curve.failed_at[:, None]
+    rows = np.arange(n)
+
+    results = np.zeros((n, len(METRICS)))
+    results[:, 0] = curve.failed_at
+    results[:, 1] = curve.code
+    if width:
+        results[:, 2] = np.where(went_through, curve.sui_out, 0).sum(axis=1)
+        results[:, 4] = np.where(
+            curve.failed_at > 0, curve.cumulative_tokens[rows, last], 0
+        )
+        floor = state.virtual_sui_reserves - state.sui_reserves
+        room = np.maximum(curve.virtual_sui - floor, 1)
+        ratio = np.where(went_through, curve.reserves / room, np.inf).astype(float)
+        results[:, 5] = np.minimum(ratio.min(axis=1), 1.0)
+    else:
+        results[:, 5] = 1.0
+    results[:, 3] = state.sui_reserves - results[:, 2]
+    return results
+
+
+def summarize(results):
+    """Share of runs that hit insolvency and how far they got"""
+    code = results[:, 1]
+    insolvent = code == EInsufficientLiquidity
+    return {
+        "scenarios": len(results),
+        "insolvent_share": float(insolvent.mean()) if len(results) else 0.0,
+        "other_abort_share": (
+            float(((code != OK) & ~insolvent).mean()) if len(results) else 0.0
+        ),
+        "mean_exits_before_failure": (
+            float(results[insolvent, 0].mean()) if insolvent.any() else None
+        ),
+        "min_sui_paid": float(results[:, 2].min()) / SUI if len(results) else 0.0,
+        "max_sui_paid": float(results[:, 2].max()) / SUI if len(results) else 0.0,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument("--wallets", type=int, default=10_000)
+    parser.add_argument("--trades", type=int, default=50_000)
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--ordering", choices=ORDERINGS, default=RANDOM)
+    parser.add_argument("--mode", choices=(EXACT, FLOAT64), default=EXACT)
+    parser.add_argument(
+        "--reserve-shortfall",
+        type=float,
+        default=0.0,
+        help="SUI removed from the real reserves before the run (e.g. a drain)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main(args):
+    ledger, curve = simulate_wallets(
+        args.wallets, args.trades, sell_probability=0.2, seed=args.seed
+    )
+    state = curve.snapshot()._replace(transitioned=False)
+    shortfall = int(args.reserve_shortfall * SUI)
+    state = state._replace(sui_reserves=max(0, state.sui_reserves - shortfall))
+    orders = exit_orders(
+        ledger.tokens,
+        args.scenarios,
+        args.ordering,
+        args.top_k,
+        np.random.default_rng(args.seed),
+    )
+
+    start = time.perf_counter()
+    results = stress(state, ledger.tokens, orders, mode=args.mode)
+    seconds = time.perf_counter() - start
+    summary = summarize(results)
+    summary.update(
+        holders=int((ledger.tokens > 0).sum()),
+        sui_reserves=state.sui_reserves / SUI,
+        seconds=seconds,
+        scenarios_per_second=len(results) / seconds if seconds else 0.0,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bank-run stress test of the curve reserves under exit orderings"
+    )
+    add_arguments(parser)
+    main(parser.parse_args())
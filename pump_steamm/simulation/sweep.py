@@ -0,0 +1,202 @@
+import argparse
+import contextlib
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+
+from move_curve import DEFAULT_PARAMS, BondingCurve, MoveAbort
+
+SUI = 1_000_000_000  # Base units per SUI (and per token)
+
+# Bump when evaluate() changes so stale cache entries are ignored
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".sweep_cache")
+
+PARAMETERS = (
+    "initial_virtual_sui",
+    "initial_virtual_tokens",
+    "k",
+    "listing_threshold",
+)
+METRICS = (
+    "tokens_sold_at_transition",
+    "final_price",
+    "sui_to_transition",
+    "buys_to_transition",
+    "error",
+)
+
+
+def parameter_grid(**axes):
+    """
+    Cartesian product of parameter axes as CurveParams
+
+    Axes are CurveParams field names mapped to lists of values in base units;
+    fields without an axis keep their Move defaults. When ``k`` is not swept it
+    follows ``initial_virtual_sui * initial_virtual_tokens`` like on chain.
+    """
+    unknown = set(axes) - set(PARAMETERS) - {"max_supply"}
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+    names = list(axes)
+    grid = []
+    for values in itertools.product(*(axes[name] for name in names)):
+        fields = dict(zip(names, values))
+        fields.setdefault("k", None)
+        grid.append(replace(DEFAULT_PARAMS, **fields))
+    return grid
+
+
+def evaluate(params, step_sui=None):
+    """
+    Buy a fresh curve up to its listing threshold and report launch metrics
+
+    With ``step_sui`` the threshold is reached through equal buys of that size
+    (in base units); otherwise through the single buy that lands exactly on it.
+    All arithmetic goes through move_curve, so rounding matches the chain.
+    """
+    curve = BondingCurve(params)
+    row = dict.fromkeys(METRICS)
+    try:
+        remaining = params.listing_threshold - curve.virtual_sui_reserves
+        if remaining <= 0:
+            raise ValueError("listing_threshold must exceed initial_virtual_sui")
+        step = step_sui or remaining
+        buys = 0
+        while not curve.transitioned:
+            curve.buy(min(step, params.listing_threshold - curve.virtual_sui_reserves))
+            buys += 1
+    except (MoveAbort, ValueError) as error:
+        row["error"] = str(error)
+        return row
+
+    row.update(
+        tokens_sold_at_transition=curve.total_minted,
+        final_price=curve.calculate_price(),
+        sui_to_transition=curve.sui_reserves,
+        buys_to_transition=buys,
+    )
+    return row
+
+
+def cache_key(params, step_sui):
+    """Stable hash of everything that determines an evaluate() result"""
+    payload = json.dumps(
+        {"version": CACHE_VERSION, "params": asdict(params), "step_sui": step_sui},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], f"{key}.json")
+
+
+def _load_cached(cache_dir, key):
+    try:
+        with open(_cache_path(cache_dir, key)) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(cache_dir, key, row):
+    path = _cache_path(cache_dir, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename, so an interrupted sweep never leaves a torn entry
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(row, handle)
+    os.replace(temporary, path)
+
+
+def _evaluate_cell(args):
+    params, step_sui = args
+    return evaluate(params, step_sui)
+
+
+def sweep(grid, step_sui=None, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+    """
+    Evaluate every CurveParams in ``grid`` and return one row per cell
+
+    Rows combine the parameters and the metrics of evaluate(). Results are
+    memoized on disk under ``cache_dir`` by parameter hash, so re-running a
+    widened grid only evaluates the new cells; pass ``cache_dir=None`` to
+    disable caching. Misses are evaluated in parallel across ``workers``
+    processes.
+    """
+    grid = list(grid)
+    keys = [cache_key(params, step_sui) for params in grid]
+    results = [_load_cached(cache_dir, key) if cache_dir else None for key in keys]
+    missing = [i for i, row in enumerate(results) if row is None]
+
+    if missing:
+        tasks = [(grid[i], step_sui) for i in missing]
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        with contextlib.ExitStack() as stack:
+            if workers > 1:
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+                chunksize = max(1, len(tasks) // (workers * 4))
+                computed = pool.map(_evaluate_cell, tasks, chunksize=chunksize)
+            else:
+                computed = map(_evaluate_cell, tasks)
+            for i, row in zip(missing, computed):
+                results[i] = row
+                if cache_dir:
+                    _store_cached(cache_dir, keys[i], row)
+
+    return [
+        {name: getattr(params, name) for name in PARAMETERS} | row
+        for params, row in zip(grid, results)
+    ]
+
+
+def _whole_units(values):
+    return [int(float(value) * SUI) for value in values]
+
+
+def add_arguments(parser):
+    parser.add_argument("--initial-virtual-sui", nargs="+", help="Whole SUI")
+    parser.add_argument("--initial-virtual-tokens", nargs="+", help="Whole tokens")
+    parser.add_argument("--listing-threshold", nargs="+", help="Whole SUI")
+    parser.add_argument("--k", nargs="+", type=int, help="Base units, exact")
+    parser.add_argument("--step-sui", type=float, help="Reach the threshold in steps")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+
+
+def main(args):
+    axes = {}
+    for name in ("initial_virtual_sui", "initial_virtual_tokens", "listing_threshold"):
+        if getattr(args, name):
+            axes[name] = _whole_units(getattr(args, name))
+    if args.k:
+        axes["k"] = args.k
+
+    rows = sweep(
+        parameter_grid(**axes),
+        step_sui=int(args.step_sui * SUI) if args.step_sui else None,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        workers=args.workers,
+    )
+
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=2)
+        print()
+    else:
+        writer = csv.DictWriter(sys.stdout, fieldnames=PARAMETERS + METRICS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bonding curve parameter sweep")
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -1,9 +1,10 @@
+from typing import NamedTuple
+
 import numpy as np
-import matplotlib.pyplot as plt
-from decimal import Decimal, getcontext
+from decimal import Decimal
 
-# Set high precision for decimal calculations
-getcontext().prec = 40
+from plotting import pyplot
+from precision import decimal_context
 
 # Constants from Move module (adjusted for simulation)
 INITIAL_VIRTUAL_SUI = Decimal("30")  # 30 SUI
@@ -12,6 +13,7 @@ K = INITIAL_VIRTUAL_SUI * INITIAL_VIRTUAL_TOKENS  # Constant product k
 LISTING_THRESHOLD = Decimal("69")  # 69 SUI for transition to AMM
 
 
+@decimal_context
 def calculate_tokens_to_mint(virtual_sui, virtual_tokens, sui_amount):
     """
     Calculate how many tokens will be minted for a given SUI amount
@@ -34,6 +36,7 @@ def calculate_tokens_to_mint(virtual_sui, virtual_tokens, sui_amount):
     return max(Decimal("0"), tokens_to_mint)
 
 
+@decimal_context
 def calculate_sui_to_receive(virtual_sui, virtual_tokens, token_amount):
     """
     Calculate how much SUI will be received for a given token amount
@@ -60,6 +63,7 @@ def calculate_sui_to_receive(virtual_sui, virtual_tokens, token_amount):
     return max(Decimal("0"), sui_to_receive)
 
 
+@decimal_context
 def calculate_price(virtual_tokens):
     """Calculate token price in SUI at current point"""
     denominator = INITIAL_VIRTUAL_TOKENS - virtual_tokens
@@ -71,6 +75,7 @@ def calculate_price(virtual_tokens):
     return price
 
 
+@decimal_context
 def simulate_buy_transaction(virtual_sui, virtual_tokens, sui_amount):
     """Simulate a buy transaction and return new state"""
     tokens_to_mint = calculate_tokens_to_mint(virtual_sui, virtual_tokens, sui_amount)
@@ -90,6 +95,7 @@ def simulate_buy_transaction(virtual_sui, virtual_tokens, sui_amount):
     return new_virtual_sui, new_virtual_tokens, tokens_to_mint
 
 
+@decimal_context
 def simulate_sell_transaction(virtual_sui, virtual_tokens, token_amount):
     """Simulate a sell transaction and return new state"""
     sui_to_receive = calculate_sui_to_receive(virtual_sui, virtual_tokens, token_amount)
@@ -109,13 +115,19 @@ def simulate_sell_transaction(virtual_sui, virtual_tokens, token_amount):
     return new_virtual_sui, new_virtual_tokens, sui_to_receive
 
 
-def plot_bonding_curve():
-    """Plot the bonding curve price function"""
-    # Create a range of SUI values to plot
-    sui_range = np.linspace(0, float(LISTING_THRESHOLD) * 1.5, 1000)
+class CurveArrays(NamedTuple):
+    """Per-point plot data for a cumulative run of purchases along ``sui_range``"""
 
-    # Calculate token price and supply at each point
+    prices: np.ndarray
+    tokens_minted: np.ndarray
+    token_supply: np.ndarray
+
+
+@decimal_context
+def _decimal_curve_arrays(sui_range):
+    """Reference implementation: walk ``sui_range`` one Decimal purchase at a time"""
     prices = []
+    tokens_minted = []
     token_supply = []
 
     virtual_sui = INITIAL_VIRTUAL_SUI
@@ -131,14 +143,72 @@ def plot_bonding_curve():
         virtual_sui += Decimal(str(sui))
         virtual_tokens += tokens
 
-        # Calculate price at this point
-        price = calculate_price(virtual_tokens)
-
         # Store results
-        prices.append(float(price))
+        prices.append(float(calculate_price(virtual_tokens)))
+        tokens_minted.append(float(tokens))
         token_supply.append(float(virtual_tokens))
 
+    return CurveArrays(
+        np.array(prices), np.array(tokens_minted), np.array(token_supply)
+    )
+
+
+def curve_arrays(sui_range, verify=False):
+    """
+    Vectorized equivalent of walking ``sui_range`` through the buy formula
+
+    Every point of ``sui_range`` is a purchase on top of the previous ones, so the
+    virtual SUI after point i is ``INITIAL_VIRTUAL_SUI + cumsum(sui_range)[i]``.
+    Because minting is clamped at zero, the token supply is the running maximum of
+    the closed form ``INITIAL_VIRTUAL_TOKENS - K / x``, which NumPy computes in a
+    single pass.
+
+    With ``verify=True`` the result is checked against the Decimal reference and a
+    ValueError is raised if they disagree.
+    """
+    sui = np.asarray(sui_range, dtype=np.float64)
+    ivt = float(INITIAL_VIRTUAL_TOKENS)
+    k = float(K)
+
+    virtual_sui = float(INITIAL_VIRTUAL_SUI) + np.cumsum(sui)
+    target_supply = ivt - k / virtual_sui
+
+    token_supply = np.maximum.accumulate(np.maximum(target_supply, 0.0))
+    tokens_minted = np.diff(token_supply, prepend=0.0)
+
+    denominator = ivt - token_supply
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prices = np.where(denominator > 0, k / (denominator * denominator), 0.0)
+
+    result = CurveArrays(prices, tokens_minted, token_supply)
+
+    if verify:
+        _verify_curve_arrays(result, _decimal_curve_arrays(sui))
+
+    return result
+
+
+def _verify_curve_arrays(result, reference):
+    """Raise ValueError if vectorized plot data drifts from the Decimal reference"""
+    for name, fast, exact in zip(CurveArrays._fields, result, reference):
+        if not np.allclose(fast, exact, rtol=1e-9, atol=1e-6):
+            deviation = float(np.max(np.abs(fast - exact)))
+            raise ValueError(
+                f"Vectorized {name} deviates from Decimal path by up to {deviation}"
+            )
+
+
+def plot_bonding_curve(sui_range=None, verify=False, path="working_bonding_curve.png"):
+    """Plot the bonding curve price function"""
+    if sui_range is None:
+        # Create a range of SUI values to plot
+        sui_range = np.linspace(0, float(LISTING_THRESHOLD) * 1.5, 1000)
+
+    # Calculate token price and supply at each point
+    prices, _, token_supply = curve_arrays(sui_range, verify=verify)
+
     # Create the plots
+    plt = pyplot()
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 12))
 
     # Price curve
@@ -164,12 +234,13 @@ def plot_bonding_curve():
     ax2.legend()
 
     plt.tight_layout()
-    plt.savefig("working_bonding_curve.png")
+    plt.savefig(path)
     plt.close()
 
-    print("Bonding curve plot saved as working_bonding_curve.png")
+    print(f"Bonding curve plot saved as {path}")
 
 
+@decimal_context
 def run_simulation():
     """Run a simple simulation of the bonding curve"""
     virtual_sui = INITIAL_VIRTUAL_SUI